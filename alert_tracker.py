@@ -0,0 +1,216 @@
+"""
+Alert Tracker for Ticket Monitoring Bot
+Keeps per-ticket alert state so only changed tickets are re-alerted and memory stays bounded
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import threading
+import time
+from collections import OrderedDict
+import config
+
+
+# Alert states of a tracked ticket
+STATE_PENDING = "pending"        # unassigned, first alert not delivered yet
+STATE_SENDING = "sending"        # first alert handed to delivery, outcome not known yet
+STATE_ALERTED = "alerted"        # alerted, reminders still due
+STATE_EXHAUSTED = "exhausted"    # final reminder sent
+STATE_KNOWN = "known"            # logged before this run, never alerted or reminded by the bot
+
+# Evicted ticket numbers remembered, so a ticket that returns is alerted as new
+# even though the bot has logged it meanwhile
+EVICTED_LIMIT = 10000
+
+
+class TicketAlert:
+    """Alert state of one open unassigned ticket"""
+    
+    def __init__(self, number, formatted, important, state=STATE_PENDING, now=None):
+        self.number = number
+        self.formatted = formatted
+        self.important = important
+        self.state = state
+        self.queues = set()
+        self.first_seen = now if now is not None else time.time()
+        self.last_alert = self.first_seen if state != STATE_PENDING else None
+        self.reminder_count = 0
+    
+    def to_dict(self):
+        """Get the alert state as JSON-serialisable values (for the checkpoint)"""
+        return {
+            "number": self.number,
+            "formatted": self.formatted,
+            "important": self.important,
+            "state": self.state,
+            "queues": sorted(self.queues),
+            "first_seen": self.first_seen,
+            "last_alert": self.last_alert,
+            "reminder_count": self.reminder_count,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an alert saved with to_dict"""
+        # A delivery interrupted by a restart may not have arrived - alert it again
+        state = STATE_PENDING if data["state"] == STATE_SENDING else data["state"]
+        alert = cls(data["number"], data["formatted"], data["important"], state, data["first_seen"])
+        alert.queues = set(data["queues"])
+        alert.last_alert = data["last_alert"]
+        alert.reminder_count = data["reminder_count"]
+        return alert
+
+
+class AlertTracker:
+    """Tracks unassigned tickets by number and decides which need an alert or a reminder"""
+    
+    def __init__(self, max_reminders=config.MAX_REMINDER_COUNT, reminder_interval=config.REMINDER_INTERVAL):
+        """
+        Initialize AlertTracker
+        
+        Args:
+            max_reminders: int - reminders per ticket, the last one is the final reminder
+            reminder_interval: int - minimum seconds between alerts for the same ticket
+        """
+        self.max_reminders = max_reminders
+        self.reminder_interval = reminder_interval
+        self.alerts = {}
+        self.evicted = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.alerts)
+    
+    def snapshot(self):
+        """
+        Get all tracked alerts for the checkpoint
+        
+        Returns:
+            list - alert dicts (see TicketAlert.to_dict)
+        """
+        with self.lock:
+            return [alert.to_dict() for alert in self.alerts.values()]
+    
+    def restore(self, alerts):
+        """
+        Replace the tracked alerts with the ones saved in a checkpoint
+        
+        Args:
+            alerts: list - alert dicts from snapshot()
+        """
+        with self.lock:
+            self.alerts = {data["number"]: TicketAlert.from_dict(data) for data in alerts}
+    
+    def sync_queue(self, queue, tickets, now=None, complete=True):
+        """
+        Record the unassigned tickets currently in one queue
+        
+        Tickets this queue reported earlier but no longer lists (assigned or
+        resolved) are evicted once no other queue still reports them.
+        
+        Args:
+            queue: str - queue identifier (URL)
+            tickets: list - dicts with number, formatted, important and logged keys;
+                     logged tickets were seen before this run and are not alerted as new
+            now: float - current time (default time.time())
+            complete: bool - tickets is the whole queue; False after a partial scrape,
+                      which adds and updates tickets but evicts none
+        
+        Returns:
+            list - TicketAlert entries of this queue still waiting for their first alert
+        """
+        now = now if now is not None else time.time()
+        current = {t['number'] for t in tickets}
+        
+        with self.lock:
+            for number, alert in list(self.alerts.items()):
+                if complete and queue in alert.queues and number not in current:
+                    alert.queues.discard(queue)
+                    if not alert.queues:
+                        del self.alerts[number]
+                        self.evicted[number] = True
+                        if len(self.evicted) > EVICTED_LIMIT:
+                            self.evicted.popitem(last=False)
+            
+            pending = []
+            for ticket in tickets:
+                alert = self.alerts.get(ticket['number'])
+                if alert is None:
+                    # Logged by this run (tracked before) is not the same as logged before the run
+                    seen = self.evicted.pop(ticket['number'], False)
+                    state = STATE_KNOWN if ticket.get('logged') and not seen else STATE_PENDING
+                    alert = TicketAlert(ticket['number'], ticket['formatted'], ticket['important'], state, now)
+                    self.alerts[ticket['number']] = alert
+                else:
+                    alert.formatted = ticket['formatted']
+                    alert.important = ticket['important']
+                alert.queues.add(queue)
+                
+                if alert.state == STATE_PENDING:
+                    pending.append(alert)
+            
+            return pending
+    
+    def due_reminders(self, queue=None, now=None):
+        """
+        Get alerted tickets whose next reminder is due
+        
+        Args:
+            queue: str - only consider tickets reported by this queue (default all)
+            now: float - current time (default time.time())
+        
+        Returns:
+            list - TicketAlert entries due for a reminder
+        """
+        now = now if now is not None else time.time()
+        with self.lock:
+            return [a for a in self.alerts.values()
+                    if a.state == STATE_ALERTED
+                    and (queue is None or queue in a.queues)
+                    and now - a.last_alert >= self.reminder_interval]
+    
+    def is_final_reminder(self, alerts):
+        """
+        Check if the next reminder is the last one for every given ticket
+        
+        Args:
+            alerts: list - TicketAlert entries
+        
+        Returns:
+            bool - True if this reminder is final
+        """
+        return all(a.reminder_count + 1 >= self.max_reminders for a in alerts)
+    
+    def mark_sending(self, alerts):
+        """Record that the first alert of the given tickets was handed to delivery"""
+        with self.lock:
+            for alert in alerts:
+                if alert.state == STATE_PENDING:
+                    alert.state = STATE_SENDING
+    
+    def mark_failed(self, alerts):
+        """Return tickets whose first alert could not be delivered to pending (retried next cycle)"""
+        with self.lock:
+            for alert in alerts:
+                if alert.state == STATE_SENDING:
+                    alert.state = STATE_PENDING
+    
+    def mark_alerted(self, alerts, now=None):
+        """Record a delivered first alert for the given tickets"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            for alert in alerts:
+                alert.state = STATE_ALERTED
+                alert.last_alert = now
+                alert.reminder_count = 0
+    
+    def mark_reminded(self, alerts, now=None):
+        """Record a delivered reminder for the given tickets"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            for alert in alerts:
+                alert.reminder_count += 1
+                alert.last_alert = now
+                if alert.reminder_count >= self.max_reminders:
+                    alert.state = STATE_EXHAUSTED
@@ -6,8 +6,9 @@ Developer: Prasob G Nath
 GitHub: github.com/Prasobgnath
 """
 
-import os
+import json
 import time
+from urllib.parse import urlparse, unquote
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -16,17 +17,117 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import (
     NoSuchElementException, TimeoutException, JavascriptException,
-    ElementClickInterceptedException
+    ElementClickInterceptedException, WebDriverException
 )
 import config
+from resource_blocking import ResourceBlocker
+from list_capture import ListCapture
+from metrics import metrics
+from tracing import traced
+from driver_proxy import InstrumentedDriver
+
+try:
+    import psutil
+except ImportError:  # Optional - only needed to clean up this bot's own Chrome processes
+    psutil = None
+
+
+# Polaris wraps classic lists in this path; the rest of the URL is the encoded list URL
+POLARIS_TARGET_PATH = "/now/nav/ui/classic/params/target/"
+
+# Marks the iframe document so a finished reload can be told apart from the old page
+MARK_DOCUMENT_SCRIPT = "window.__monitorStale = true;"
+DOCUMENT_READY_SCRIPT = "return !window.__monitorStale && document.readyState === 'complete';"
+
+# A password field on a loaded page means a login form (ServiceNow login.do, SSO provider)
+LOGIN_FORM_XPATH = "//input[@type='password']"
+
+
+def get_list_target(url):
+    """
+    Get the classic list URL a Polaris navigation URL loads into its iframe
+    
+    Args:
+        url: str - e.g. https://host/now/nav/ui/classic/params/target/incident_list.do%3F...
+    
+    Returns:
+        str - absolute list URL (https://host/incident_list.do?...) or None if not a Polaris list URL
+    """
+    if POLARIS_TARGET_PATH not in url:
+        return None
+    base, target = url.split(POLARIS_TARGET_PATH, 1)
+    return f"{base}/{unquote(target)}"
+
+
+def kill_process_tree(pid):
+    """
+    Kill a process and all of its children
+    
+    Args:
+        pid: int - root process id (e.g. chromedriver)
+    """
+    if psutil is None:
+        return
+    try:
+        parent = psutil.Process(pid)
+        for child in parent.children(recursive=True):
+            child.kill()
+        parent.kill()
+    except psutil.Error:
+        pass
+
+
+def kill_profile_processes(user_data_dir):
+    """
+    Kill leftover Chrome processes that hold the given profile directory
+    
+    Only processes started with this --user-data-dir are touched, so other
+    Chrome windows on the host keep running.
+    
+    Args:
+        user_data_dir: str - Chrome user data directory
+    """
+    if psutil is None:
+        print("psutil not installed - skipping cleanup of stale Chrome processes")
+        return
+    
+    flag = f"--user-data-dir={user_data_dir}".lower()
+    for proc in psutil.process_iter(["name", "cmdline"]):
+        try:
+            name = (proc.info["name"] or "").lower()
+            cmdline = " ".join(proc.info["cmdline"] or []).lower()
+            if name.startswith("chrome") and flag in cmdline:
+                proc.kill()
+        except psutil.Error:
+            continue
 
 
 class BrowserManager:
     """Manages Chrome browser instance and operations"""
     
-    def __init__(self):
+    def __init__(self, user_data_dir=None, debug_port=9222):
         self.driver = None
+        self.instrumented = None
         self.wait = None
+        self.snow_handle = None
+        self.teams_handle = None
+        self.queue_tabs = {}
+        self.user_data_dir = user_data_dir or config.CHROME_USER_DATA
+        self.debug_port = debug_port
+        self.pool = None
+        self.snow_client = None
+        self.watchdog = None
+        
+        # Listeners receive CDP events drained from Chrome's performance log
+        self.performance_listeners = []
+        self.resource_blocker = None
+        if config.RESOURCE_BLOCKING["enabled"]:
+            self.resource_blocker = ResourceBlocker()
+            self.performance_listeners.append(self.resource_blocker.handle_events)
+        self.list_capture = None
+        if config.LIST_CAPTURE["enabled"]:
+            self.list_capture = ListCapture()
+            self.performance_listeners.append(self.list_capture.handle_events)
         
     def setup_chrome_options(self):
         """
@@ -62,11 +163,11 @@ class BrowserManager:
             opt.add_argument("--no-sandbox")
         
         # User data directory - dedicated Selenium profile with copied Chrome profile
-        opt.add_argument(f'--user-data-dir={config.CHROME_USER_DATA}')
+        opt.add_argument(f'--user-data-dir={self.user_data_dir}')
         opt.add_argument('--profile-directory=Default')  # Use the copied Default profile
         
         # Fix for Chrome connection issues
-        opt.add_argument("--remote-debugging-port=9222")
+        opt.add_argument(f"--remote-debugging-port={self.debug_port}")
         opt.add_argument("--disable-dev-shm-usage")
         opt.add_argument("--disable-blink-features=AutomationControlled")
         # Extensions enabled to keep SSO extension
@@ -76,6 +177,10 @@ class BrowserManager:
         opt.add_experimental_option("excludeSwitches", ["enable-automation"])
         opt.add_experimental_option('useAutomationExtension', False)
         
+        # Network events for resource accounting
+        if self.performance_listeners:
+            opt.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        
         return opt
     
     def initialize_browser(self):
@@ -86,8 +191,8 @@ class BrowserManager:
             bool - True if successful, False otherwise
         """
         try:
-            # Kill existing Chrome processes
-            os.system("taskkill /f /im chrome.exe")
+            # Kill leftover Chrome processes of this profile only
+            kill_profile_processes(self.user_data_dir)
             time.sleep(2)
             
             # Setup Chrome options
@@ -101,6 +206,13 @@ class BrowserManager:
             # Setup WebDriverWait
             self.wait = WebDriverWait(self.driver, config.TIMEOUTS["element_wait"])
             
+            # Window handles of a previous session are no longer valid
+            self.snow_handle = self.driver.current_window_handle
+            self.teams_handle = None
+            self.reset_queue_tabs()
+            if self.resource_blocker:
+                self.resource_blocker.reset()
+            
             print("Browser initialized successfully")
             return True
             
@@ -132,18 +244,71 @@ class BrowserManager:
                     return False
         return False
     
-    def switch_to_snow_iframe(self):
+    @traced("snow.refresh_in_place")
+    def refresh_list_in_place(self, url):
+        """
+        Load a list inside the Polaris shell that is already open, without a full page load
+        
+        Only the list iframe is pointed at the list URL, so the shell and its shadow
+        DOM are not bootstrapped again. Needs the shell of the same instance in the
+        current tab (i.e. a previous full navigation).
+        
+        Args:
+            url: str - ServiceNow (Polaris) list URL
+            
+        Returns:
+            bool - True if the list was reloaded in place, False if a full navigation is needed
+        """
+        target = get_list_target(url)
+        if not config.IN_PLACE_REFRESH or target is None:
+            return False
+        
+        try:
+            self.driver.switch_to.default_content()
+            if urlparse(self.driver.current_url).netloc != urlparse(url).netloc:
+                return False
+            
+            # Raises when the shell is not loaded (first visit, tab was used for something else)
+            iframe = self.driver.execute_script(config.SNOW_XPATHS["iframe"])
+            if iframe is None:
+                return False
+            
+            self.driver.switch_to.frame(iframe)
+            self.driver.execute_script(MARK_DOCUMENT_SCRIPT)
+            self.driver.execute_script("window.location.replace(arguments[0]);", target)
+            WebDriverWait(self.driver, config.TIMEOUTS["page_load"],
+                          ignored_exceptions=(JavascriptException,)).until(
+                lambda d: d.execute_script(DOCUMENT_READY_SCRIPT))
+            self.driver.switch_to.default_content()
+            return True
+            
+        except (JavascriptException, TimeoutException, WebDriverException) as e:
+            print(f"In-place list refresh not possible - reloading page ({e.__class__.__name__})")
+            try:
+                self.driver.switch_to.default_content()
+            except WebDriverException:
+                pass
+            return False
+    
+    @traced("snow.switch_iframe")
+    def switch_to_snow_iframe(self, wait_for_shell=True):
         """
         Switch to ServiceNow main iframe using shadow DOM
         
+        Args:
+            wait_for_shell: bool - wait for the shadow root after a full page load
+                            (not needed after refresh_list_in_place)
+        
         Returns:
             bool - True if successful, False otherwise
         """
         try:
             # Wait for shadow root to load
-            time.sleep(3)
+            if wait_for_shell:
+                time.sleep(3)
             
             # Get iframe from shadow DOM
+            self.driver.switch_to.default_content()
             iframe = self.driver.execute_script(config.SNOW_XPATHS["iframe"])
             self.driver.switch_to.frame(iframe)
             return True
@@ -152,6 +317,189 @@ class BrowserManager:
             print(f"Error switching to iframe: {e}")
             return False
     
+    def switch_to_teams(self):
+        """
+        Switch to the persistent Teams tab, opening and loading it on first use
+        
+        Returns:
+            bool - True if the Teams tab is active, False otherwise
+        """
+        try:
+            if self.teams_handle in self.driver.window_handles:
+                self.driver.switch_to.window(self.teams_handle)
+                return True
+            
+            # Open Teams once in its own tab; it stays loaded between alerts
+            self.driver.switch_to.new_window('tab')
+            self.teams_handle = self.driver.current_window_handle
+            self.apply_resource_blocking("teams")
+            self.driver.get(config.TEAMS_URL)
+            time.sleep(config.TIMEOUTS["teams_load"])
+            return True
+        except Exception as e:
+            print(f"Error switching to Teams tab: {e}")
+            return False
+    
+    def switch_to_snow(self):
+        """
+        Switch back to the ServiceNow tab
+        
+        Returns:
+            bool - True if successful, False otherwise
+        """
+        try:
+            if self.snow_handle not in self.driver.window_handles:
+                # ServiceNow tab was closed - adopt any tab that is not Teams or a queue tab
+                taken = {self.teams_handle} | {tab["handle"] for tab in self.queue_tabs.values()}
+                self.snow_handle = next(
+                    (h for h in self.driver.window_handles if h not in taken), None)
+                if self.snow_handle is None:
+                    self.driver.switch_to.new_window('tab')
+                    self.snow_handle = self.driver.current_window_handle
+            
+            if self.driver.current_window_handle != self.snow_handle:
+                self.driver.switch_to.window(self.snow_handle)
+            self.apply_resource_blocking("servicenow")
+            return True
+        except Exception as e:
+            print(f"Error switching to ServiceNow tab: {e}")
+            return False
+    
+    def open_queue_tabs(self, urls):
+        """
+        Open one tab per queue and load its list once (tab-per-queue mode)
+        
+        Later visits switch to the queue's tab and refresh its list in place, so
+        the page load and shell bootstrap are paid once per session.
+        
+        Args:
+            urls: list - ServiceNow queue URLs that get their own tab
+        """
+        for url in urls:
+            tab = self.queue_tabs.get(url)
+            if tab and tab["handle"] in self.driver.window_handles:
+                continue
+            try:
+                self.driver.switch_to.new_window('tab')
+                self.queue_tabs[url] = {"handle": self.driver.current_window_handle, "ready": False}
+                self.apply_resource_blocking("servicenow")
+                self.driver.get(url)
+                WebDriverWait(self.driver, config.TIMEOUTS["page_load"],
+                              ignored_exceptions=(JavascriptException,)).until(
+                    lambda d: d.execute_script(config.SNOW_XPATHS["shadow_root"]))
+                self.queue_tabs[url]["ready"] = True
+            except TimeoutException:
+                print("Queue tab did not finish loading - it is reloaded on first visit")
+            except WebDriverException as e:
+                print(f"Error opening queue tab: {e}")
+        self.switch_to_snow()
+    
+    def switch_to_queue(self, url):
+        """
+        Switch to the tab of a queue, reopening it if it was closed
+        
+        Args:
+            url: str - ServiceNow queue URL
+            
+        Returns:
+            dict - the queue's tab ({"handle": ..., "ready": ...}) or None if the
+                   queue has no tab of its own (use the ServiceNow tab)
+        """
+        tab = self.queue_tabs.get(url)
+        if tab is None:
+            return None
+        
+        try:
+            if tab["handle"] in self.driver.window_handles:
+                if self.driver.current_window_handle != tab["handle"]:
+                    self.driver.switch_to.window(tab["handle"])
+            else:
+                self.driver.switch_to.new_window('tab')
+                tab["handle"] = self.driver.current_window_handle
+                tab["ready"] = False
+            self.apply_resource_blocking("servicenow")
+            return tab
+        except WebDriverException as e:
+            print(f"Error switching to queue tab: {e}")
+            return None
+    
+    def reset_queue_tabs(self):
+        """Forget the window handles of queue tabs (after the browser session was replaced)"""
+        for tab in self.queue_tabs.values():
+            tab["handle"] = None
+            tab["ready"] = False
+    
+    def export_session(self, host):
+        """
+        Export the ServiceNow login of an instance for use outside the browser
+        
+        Cookies are read through CDP, so no tab has to show the instance. The
+        session token (g_ck) is read from a tab that currently shows the instance.
+        
+        Args:
+            host: str - instance host name (e.g. everest.service-now.com)
+            
+        Returns:
+            dict - {"cookies": list of CDP cookie dicts, "token": str or None}
+        """
+        login = {"cookies": [], "token": None}
+        try:
+            login["cookies"] = self.driver.execute_cdp_cmd(
+                "Network.getCookies", {"urls": [f"https://{host}/"]}).get("cookies", [])
+            
+            current = self.driver.current_window_handle
+            handles = [tab["handle"] for u, tab in self.queue_tabs.items() if urlparse(u).netloc == host]
+            for handle in [current, self.snow_handle] + handles:
+                if handle not in self.driver.window_handles:
+                    continue
+                self.driver.switch_to.window(handle)
+                self.driver.switch_to.default_content()
+                if urlparse(self.driver.current_url).netloc == host:
+                    login["token"] = self.driver.execute_script("return window.g_ck || null;")
+                    if login["token"]:
+                        break
+            self.driver.switch_to.window(current)
+        except WebDriverException as e:
+            print(f"Error exporting ServiceNow session for {host}: {e}")
+        return login
+    
+    def apply_resource_blocking(self, target):
+        """
+        Apply the resource blocking profile of a target to the current tab
+        
+        Args:
+            target: str - "servicenow" or "teams"
+        """
+        if self.resource_blocker:
+            self.resource_blocker.apply(self.driver, target)
+    
+    def poll_performance_log(self):
+        """Drain Chrome's performance log and hand the CDP events to the registered listeners"""
+        if not self.performance_listeners or not self.driver:
+            return
+        
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            print(f"Error reading performance log: {e}")
+            return
+        
+        events = []
+        for entry in entries:
+            try:
+                events.append(json.loads(entry["message"])["message"])
+            except (KeyError, ValueError):
+                continue
+        
+        for listener in self.performance_listeners:
+            listener(events)
+    
+    def report_resource_savings(self):
+        """Print requests and bytes saved by resource blocking since the last report"""
+        if self.resource_blocker:
+            self.poll_performance_log()
+            self.resource_blocker.report()
+    
     def refresh_page(self):
         """Refresh the current page"""
         try:
@@ -173,10 +521,19 @@ class BrowserManager:
         """
         Get the WebDriver instance
         
+        With DRIVER_STATS enabled the driver is handed out wrapped, so every
+        round trip is counted per calling function.
+        
         Returns:
-            WebDriver - Selenium WebDriver instance
+            WebDriver - Selenium WebDriver instance (or InstrumentedDriver)
         """
-        return self.driver
+        if self.driver is None or not config.DRIVER_STATS["enabled"]:
+            return self.driver
+        
+        # Wrap each new session once (restart, promotion or recycle)
+        if self.instrumented is None or self.instrumented.driver is not self.driver:
+            self.instrumented = InstrumentedDriver(self.driver)
+        return self.instrumented
     
     def get_wait(self):
         """
@@ -205,22 +562,155 @@ class BrowserManager:
             print(f"Session validation failed: {e}")
             return False
     
+    def discard_session(self):
+        """Quit the current session and kill its chromedriver/Chrome process tree"""
+        if not self.driver:
+            return
+        
+        pid = None
+        try:
+            pid = self.driver.service.process.pid
+        except Exception:
+            pass
+        
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        
+        if pid:
+            kill_process_tree(pid)
+        self.driver = None
+        self.wait = None
+    
+    def adopt(self, other):
+        """
+        Take over the live session of another BrowserManager (standby promotion)
+        
+        Args:
+            other: BrowserManager - manager whose session is taken over
+        """
+        self.driver = other.driver
+        self.wait = other.wait
+        self.snow_handle = other.snow_handle
+        self.teams_handle = other.teams_handle
+        self.reset_queue_tabs()
+        self.user_data_dir = other.user_data_dir
+        self.debug_port = other.debug_port
+        other.driver = None
+        other.wait = None
+        if self.resource_blocker:
+            self.resource_blocker.reset()
+    
+    def is_signed_in(self):
+        """
+        Check that the current page is not a login or SSO page
+        
+        Returns:
+            bool - True if the page loaded signed in, False otherwise
+        """
+        try:
+            current = urlparse(self.driver.current_url)
+            if current.hostname in config.BROWSER_POOL["login_hosts"] or "login" in current.path.lower():
+                return False
+            return not self.driver.find_elements(By.XPATH, LOGIN_FORM_XPATH)
+        except Exception as e:
+            print(f"Login check failed: {e}")
+            return False
+    
+    def warm_up(self, urls):
+        """
+        Load pages once so the session is authenticated before it is needed
+        
+        Args:
+            urls: list - URLs to visit (ServiceNow instances, Teams)
+        
+        Returns:
+            list - URLs that did not load signed in (login or SSO page, or load error)
+        """
+        signed_out = []
+        for url in urls:
+            try:
+                if url == config.TEAMS_URL and config.TEAMS_PERSISTENT_TAB:
+                    signed_in = self.switch_to_teams() and self.is_signed_in()
+                    self.switch_to_snow()
+                else:
+                    signed_in = self.navigate_to_url(url, retry_count=1) and self.is_signed_in()
+            except Exception as e:
+                print(f"Warm-up of {url} failed: {e}")
+                signed_in = False
+            if not signed_in:
+                signed_out.append(url)
+        return signed_out
+    
+    def recycle(self):
+        """
+        Replace a live but unhealthy browser session on purpose (between queue visits)
+        
+        Promotes the standby browser when a pool is attached, otherwise restarts
+        Chrome. Queue tabs and the persistent Teams tab are reopened, so the
+        next visits find the same state.
+        
+        Returns:
+            bool - True if a new session is running, False otherwise
+        """
+        queue_urls = list(self.queue_tabs)
+        had_teams = self.teams_handle is not None
+        metrics.inc("bot_browser_recoveries_total", kind="recycle")
+        
+        if not (self.pool and self.pool.promote()):
+            self.discard_session()
+            if not self.initialize_browser():
+                return False
+        
+        if queue_urls:
+            self.open_queue_tabs(queue_urls)
+        if had_teams and config.TEAMS_PERSISTENT_TAB:
+            self.switch_to_teams()
+            self.switch_to_snow()
+        return True
+    
+    def recycle_if_unhealthy(self):
+        """
+        Recycle the browser if the watchdog reported it over a limit
+        
+        Returns:
+            bool - True if the browser was recycled (callers must refresh driver references)
+        """
+        if not self.watchdog:
+            return False
+        
+        reason = self.watchdog.needs_recycle()
+        if not reason:
+            return False
+        
+        print(f"Recycling browser ({reason})...")
+        if self.recycle():
+            print("Browser recycled")
+        else:
+            print("Browser recycle failed - next visit will attempt recovery")
+        return True
+    
     def recover_session(self):
         """
         Attempt to recover browser session if it's invalid
         
+        Promotes the warm standby browser when a pool is attached, otherwise
+        cold-starts a new browser.
+        
         Returns:
             bool - True if recovery successful, False otherwise
         """
         print("Attempting to recover browser session...")
+        metrics.inc("bot_browser_recoveries_total", kind="crash")
         
         try:
+            if self.pool and self.pool.promote():
+                print("Standby browser promoted")
+                return True
+            
             # Close any existing broken session
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception:
-                    pass
+            self.discard_session()
             
             # Reinitialize browser
             return self.initialize_browser()
@@ -0,0 +1,130 @@
+"""
+Browser Pool for Ticket Monitoring Bot
+Keeps a pre-launched, authenticated standby browser for near-instant session recovery
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import os
+import shutil
+import threading
+import time
+import config
+from browser_manager import BrowserManager
+from queue_registry import get_registry
+
+
+# Files of the running primary profile that are not copied to a new standby profile:
+# process locks, caches, and live databases (cookies) that cannot be copied
+# consistently while Chrome writes to them
+PROFILE_COPY_IGNORE = ("Singleton*", "lockfile", "LOCK", "*Cache*", "Cookies", "Cookies-*",
+                       "*-journal", "*-wal", "*-shm")
+
+
+def get_warm_up_urls():
+    """
+    Get the pages a standby browser loads to authenticate
+    
+    Returns:
+        list - one base URL per monitored ServiceNow instance, then Teams
+    """
+    urls = [f"https://{host}/" for host in get_registry().instance_hosts()]
+    urls.append(config.TEAMS_URL)
+    return urls
+
+
+class BrowserPool:
+    """Maintains a warm standby browser and promotes it when the primary session dies"""
+    
+    def __init__(self, primary):
+        """
+        Initialize BrowserPool
+        
+        Args:
+            primary: BrowserManager - the manager used by the monitors
+        """
+        self.primary = primary
+        self.slots = [
+            (primary.user_data_dir, primary.debug_port),
+            (config.BROWSER_POOL["standby_user_data"], config.BROWSER_POOL["standby_debug_port"]),
+        ]
+        self.standby = None
+        self.builder = None
+        self.lock = threading.Lock()
+        primary.pool = self
+    
+    def start_standby(self):
+        """Build a new standby browser in the background on the profile the primary is not using"""
+        if self.builder and self.builder.is_alive():
+            return
+        
+        user_data_dir, debug_port = next(
+            slot for slot in self.slots if slot[0] != self.primary.user_data_dir)
+        self.builder = threading.Thread(target=self._build_standby, args=(user_data_dir, debug_port),
+                                        name="standby-browser", daemon=True)
+        self.builder.start()
+    
+    def _build_standby(self, user_data_dir, debug_port):
+        """Launch and authenticate a standby browser (runs on the builder thread)"""
+        # Chrome locks a profile per process - the standby needs its own copy
+        if not os.path.isdir(user_data_dir):
+            print(f"Creating standby Chrome profile at {user_data_dir}")
+            try:
+                shutil.copytree(self.primary.user_data_dir, user_data_dir,
+                                ignore=shutil.ignore_patterns(*PROFILE_COPY_IGNORE))
+            except (shutil.Error, OSError) as e:
+                print(f"Standby profile copied with errors: {e}")
+        
+        standby = BrowserManager(user_data_dir, debug_port)
+        if not standby.initialize_browser():
+            print("Failed to start standby browser")
+            return
+        
+        # Only a signed-in standby is promoted - the profile copy has no cookies
+        signed_out = get_warm_up_urls()
+        for check in range(config.BROWSER_POOL["login_checks"]):
+            if check:
+                time.sleep(config.BROWSER_POOL["login_retry_seconds"])
+            signed_out = standby.warm_up(signed_out)
+            if not signed_out:
+                break
+        if signed_out:
+            print(f"Standby browser not signed in to {', '.join(signed_out)} - not used "
+                  f"(sign in once in {user_data_dir})")
+            standby.discard_session()
+            return
+        
+        with self.lock:
+            self.standby = standby
+        print("Standby browser ready")
+    
+    def promote(self):
+        """
+        Replace the primary session with the standby one
+        
+        Returns:
+            bool - True if a healthy standby was promoted, False otherwise
+        """
+        with self.lock:
+            standby, self.standby = self.standby, None
+        
+        if standby is None or not standby.is_session_valid():
+            if standby:
+                standby.discard_session()
+            print("No healthy standby browser available")
+            self.start_standby()
+            return False
+        
+        # The crashed session's profile becomes free for the next standby
+        self.primary.discard_session()
+        self.primary.adopt(standby)
+        self.start_standby()
+        return True
+    
+    def close(self):
+        """Shut down the standby browser"""
+        with self.lock:
+            standby, self.standby = self.standby, None
+        if standby:
+            standby.discard_session()
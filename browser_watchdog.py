@@ -0,0 +1,181 @@
+"""
+Browser Watchdog for Ticket Monitoring Bot
+Samples Chrome memory, CPU and DOM size and requests a planned browser recycle before limits are hit
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import threading
+import time
+import config
+
+try:
+    import psutil
+except ImportError:  # Optional - without it only the DOM size is watched
+    psutil = None
+
+
+class BrowserWatchdog:
+    """Watches the browser's process tree in the background; the recycle itself runs between queue visits"""
+    
+    def __init__(self, browser_manager, limits=None):
+        """
+        Initialize BrowserWatchdog
+        
+        Args:
+            browser_manager: BrowserManager - browser to watch
+            limits: dict - sampling interval and limits (default config.BROWSER_WATCHDOG)
+        """
+        self.browser = browser_manager
+        self.limits = limits or config.BROWSER_WATCHDOG
+        self.stats = {"rss_mb": 0, "cpu_percent": 0, "processes": 0, "dom_nodes": 0}
+        self.over_limit = {}
+        self.recycle_reason = None
+        self.pid = None
+        self.session_started = time.time()
+        self.processes = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        browser_manager.watchdog = self
+    
+    def start(self):
+        """Start sampling the browser process tree in the background"""
+        if psutil is None:
+            print("psutil not installed - browser memory/CPU watchdog disabled")
+            return
+        self.thread = threading.Thread(target=self._run, name="browser-watchdog", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Sampling loop (runs on the watchdog thread)"""
+        while not self.stop_event.wait(self.limits["sample_interval"]):
+            try:
+                self.sample_processes()
+            except Exception as e:
+                print(f"Browser watchdog sample failed: {e}")
+    
+    def get_browser_pid(self):
+        """
+        Get the chromedriver process id of the current session
+        
+        Returns:
+            int - process id or None if no session is running
+        """
+        try:
+            return self.browser.driver.service.process.pid
+        except AttributeError:
+            return None
+    
+    def sample_processes(self):
+        """Sample RSS and CPU of chromedriver and all Chrome processes it started"""
+        pid = self.get_browser_pid()
+        if pid is None:
+            return
+        
+        with self.lock:
+            if pid != self.pid:
+                # New session (restart, promotion or recycle) - start counting again
+                self.pid = pid
+                self.processes = {}
+                self.over_limit = {}
+                self.session_started = time.time()
+        
+        try:
+            root = psutil.Process(pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            # Ignore the old process of a session that was replaced meanwhile
+            if self.get_browser_pid() == pid:
+                self.request_recycle("browser process exited")
+            return
+        
+        rss = 0
+        cpu = 0.0
+        processes = {}
+        for proc in tree:
+            # Reuse Process objects - cpu_percent() measures since the previous call
+            proc = self.processes.get(proc.pid, proc)
+            try:
+                rss += proc.memory_info().rss
+                cpu += proc.cpu_percent(None)
+                processes[proc.pid] = proc
+            except psutil.Error:
+                continue
+        
+        with self.lock:
+            self.processes = processes
+            self.stats["rss_mb"] = rss // (1024 * 1024)
+            self.stats["cpu_percent"] = round(cpu)
+            self.stats["processes"] = len(processes)
+        
+        self.check_limit("rss_mb", self.stats["rss_mb"], self.limits["max_rss_mb"])
+        self.check_limit("cpu_percent", self.stats["cpu_percent"], self.limits["max_cpu_percent"])
+        
+        max_age = self.limits["max_session_hours"] * 3600
+        if max_age and time.time() - self.session_started > max_age:
+            self.request_recycle(f"session older than {self.limits['max_session_hours']} h")
+    
+    def sample_dom(self):
+        """Sample the DOM node count of the current tab's renderer (main thread only - uses the driver)"""
+        try:
+            counters = self.browser.driver.execute_cdp_cmd("Memory.getDOMCounters", {})
+        except Exception:
+            return
+        self.stats["dom_nodes"] = counters.get("nodes", 0)
+        self.check_limit("dom_nodes", self.stats["dom_nodes"], self.limits["max_dom_nodes"])
+    
+    def check_limit(self, name, value, limit):
+        """
+        Count consecutive samples over a limit and request a recycle once it is sustained
+        
+        Args:
+            name: str - statistic name
+            value: int - sampled value
+            limit: int - configured limit (0 = not checked)
+        """
+        with self.lock:
+            if not limit or value <= limit:
+                self.over_limit[name] = 0
+                return
+            self.over_limit[name] = self.over_limit.get(name, 0) + 1
+            sustained = self.over_limit[name] >= self.limits["sustained_samples"]
+        if sustained:
+            self.request_recycle(f"{name} {value} over limit {limit}")
+    
+    def request_recycle(self, reason):
+        """Mark the browser for a recycle at the next queue boundary"""
+        with self.lock:
+            if self.recycle_reason is None:
+                self.recycle_reason = reason
+    
+    def needs_recycle(self):
+        """
+        Check if the browser should be recycled now (call between queue visits)
+        
+        Returns:
+            str - reason for the recycle, or None if the browser is healthy
+        """
+        self.sample_dom()
+        with self.lock:
+            reason, self.recycle_reason = self.recycle_reason, None
+            if reason:
+                self.over_limit = {}
+        return reason
+    
+    def get_stats(self):
+        """
+        Get the latest samples
+        
+        Returns:
+            dict - rss_mb, cpu_percent, processes and dom_nodes
+        """
+        with self.lock:
+            return dict(self.stats)
+    
+    def stop(self):
+        """Stop the sampling thread"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(5)
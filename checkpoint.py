@@ -0,0 +1,157 @@
+"""
+Checkpoint for Ticket Monitoring Bot
+Saves alert state and queue scan state atomically after every cycle and resumes from it on restart
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import json
+import os
+import tempfile
+import time
+import config
+
+
+CHECKPOINT_VERSION = 1
+
+
+def write_atomic(path, data):
+    """
+    Write JSON so the file is either the old or the new version, never a partial one
+    
+    Args:
+        path: str - destination file
+        data: dict - JSON-serialisable content
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".checkpoint-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class Checkpoint:
+    """Monitor state that survives a restart: alert trackers per team and scan state per queue"""
+    
+    def __init__(self, settings=None):
+        """
+        Initialize Checkpoint
+        
+        Args:
+            settings: dict - checkpoint settings (default config.CHECKPOINT)
+        """
+        self.settings = settings or config.CHECKPOINT
+        self.path = self.settings["file"]
+        self.mtime = None
+    
+    def save(self, team_manager, cycle):
+        """
+        Save the state after a completed cycle
+        
+        Args:
+            team_manager: TeamManager - teams (alert trackers) and queue registry
+            cycle: int - number of the last completed cycle
+        
+        Returns:
+            bool - True if saved, False otherwise
+        """
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "saved": time.time(),
+            "cycle": cycle,
+            "teams": {team.name: team.messenger.alert_tracker.snapshot() for team in team_manager.teams},
+            "queues": {entry.url: {
+                "last_scan": entry.last_scan,
+                "fingerprint": entry.fingerprint,
+                "ticket_count": entry.ticket_count,
+            } for entry in team_manager.registry.entries if entry.last_scan is not None},
+        }
+        try:
+            write_atomic(self.path, state)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving checkpoint: {e}")
+            return False
+    
+    def load(self):
+        """
+        Read the checkpoint if it is usable
+        
+        Returns:
+            dict - saved state, or None if missing, unreadable, from another version or too old
+        """
+        try:
+            self.mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        
+        if state.get("version") != CHECKPOINT_VERSION:
+            print("Ignoring checkpoint from another bot version")
+            return None
+        
+        age_hours = (time.time() - state["saved"]) / 3600
+        if age_hours > self.settings["max_age_hours"]:
+            print(f"Ignoring checkpoint saved {age_hours:.1f} h ago (max_age_hours)")
+            return None
+        return state
+    
+    def changed(self):
+        """
+        Check if the checkpoint was rewritten since it was last loaded (by the leader)
+        
+        Returns:
+            bool - True if a newer checkpoint exists
+        """
+        try:
+            return os.path.getmtime(self.path) != self.mtime
+        except OSError:
+            return False
+    
+    def restore(self, team_manager):
+        """
+        Resume alert trackers and queue scan state from the checkpoint
+        
+        Args:
+            team_manager: TeamManager - teams and queue registry to restore into
+        
+        Returns:
+            int - number of the last completed cycle, or None if nothing was restored
+        """
+        state = self.load()
+        if state is None:
+            return None
+        
+        tracked = 0
+        for team in team_manager.teams:
+            alerts = state["teams"].get(team.name)
+            if alerts is not None:
+                team.messenger.alert_tracker.restore(alerts)
+                tracked += len(alerts)
+        
+        for url, queue_state in state["queues"].items():
+            entry = team_manager.registry.get(url)
+            if entry is not None:
+                entry.last_scan = queue_state["last_scan"]
+                entry.fingerprint = queue_state["fingerprint"]
+                entry.ticket_count = queue_state["ticket_count"]
+        
+        minutes = (time.time() - state["saved"]) / 60
+        print(f"Resumed from checkpoint of cycle #{state['cycle']} saved {minutes:.0f} min ago "
+              f"({tracked} tracked tickets, {len(state['queues'])} queues)")
+        return state["cycle"]
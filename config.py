@@ -43,6 +43,85 @@ ENABLE_CTASK_MONITORING = True      # Set to False to skip Change Task monitorin
 TEAMS_SENT_ID = "'Monitoring Bot Channel'"
 # TEAMS_SENT_ID = "'Your Channel Name'"  # Alternative sent id for testing
 
+# Keep Teams loaded in its own browser tab and only switch to it when sending
+# (False reloads Teams in the ServiceNow tab after every queue, as before)
+TEAMS_PERSISTENT_TAB = True
+
+# How alerts are composed in the Teams web app (TEAMS_DELIVERY_MODE = "ui"):
+#   "oneshot" - build the whole message once and insert it into the compose box
+#   "typed"   - type each ticket line with send_keys (slow for large queues)
+TEAMS_COMPOSE_MODE = "oneshot"
+
+# How alerts are delivered to Teams:
+#   "ui"      - type into the Teams web app through Selenium (TEAMS_SENT_ID)
+#   "webhook" - post one card to an incoming webhook (TEAMS_WEBHOOK_URL)
+#   "graph"   - post one message to a chat through Microsoft Graph (GRAPH_CHAT_ID)
+TEAMS_DELIVERY_MODE = "ui"
+TEAMS_WEBHOOK_URL = ""
+GRAPH_API_URL = "https://graph.microsoft.com/v1.0"
+GRAPH_CHAT_ID = ""
+GRAPH_ACCESS_TOKEN = ""
+
+# HTTP delivery settings (webhook/graph modes)
+HTTP_SENDER_SETTINGS = {
+    "timeout": 10,        # seconds per request
+    "max_retries": 3,     # retries on network errors, HTTP 429 and 5xx
+    "backoff_factor": 1,  # seconds, doubled on every retry
+    "pool_size": 4,       # pooled keep-alive connections
+}
+
+# Every alert and reminder goes to all sinks below at the same time. The "teams" sink is
+# the Teams chat above (UI typing runs on the scraping thread, HTTP modes in the
+# background); the others run on their own threads and never hold up scraping or each
+# other. Primary sinks decide whether a ticket counts as alerted - the caller waits for
+# them up to their timeout; the rest are best effort. A team can list its own "sinks".
+# Try email locally with an SMTP stand-in: python -m aiosmtpd -n -l localhost:1025
+NOTIFIER_TIMEOUT = 30  # default seconds per sink
+NOTIFIER_SINKS = [
+    {"type": "teams", "primary": True, "timeout": 120},
+    {"type": "sound"},
+    {
+        "type": "email",
+        "enabled": False,
+        "host": "localhost",
+        "port": 1025,
+        "starttls": False,
+        "username": "",
+        "password": "",
+        "sender": "ticket-bot@example.com",
+        "recipients": ["noc@example.com"],
+        "timeout": 15,
+    },
+    {
+        "type": "webhook",
+        "enabled": False,
+        "url": "https://...",     # receives {"event", "text", "sections"} as JSON
+        "timeout": 10,
+        "max_retries": 1,
+    },
+]
+
+# Serve several teams from one process (one browser, one login, one scrape per queue).
+# Each team names the QUEUES it watches and has its own Teams destination, alert
+# state and digest; a queue watched by several teams is scraped once and its alerts
+# go to every one of them. Keys not given fall back to the global settings above.
+# Empty list = single team using the settings above and all QUEUES.
+TEAM_CONFIGS = []
+# TEAM_CONFIGS = [
+#     {
+#         "name": "Network",
+#         "sent_id": "'Network Bot Channel'",
+#         "delivery_mode": "ui",            # "ui", "webhook" or "graph"
+#         "queues": ["Open incidents", "Incidents in progress", "Open changes"],
+#     },
+#     {
+#         "name": "Security",
+#         "delivery_mode": "webhook",
+#         "webhook_url": "https://...",
+#         "queues": ["Open incidents", "Overdue change tasks"],
+#     },
+# ]
+
 # =====================================================================
 # CHROME OPTIONS
 # =====================================================================
@@ -57,6 +136,274 @@ CHROME_OPTIONS = {
     "no_sandbox": True,
 }
 
+# =====================================================================
+# BROWSER POOL
+# =====================================================================
+# Keep a second, already-authenticated Chrome running so a crashed session is
+# replaced immediately instead of cold-starting Chrome (costs one extra browser).
+# The standby uses its own profile; it is copied from CHROME_USER_DATA on first use
+# without locks, journals and cookies (a running Chrome holds them open), so it has to
+# sign in itself: through SSO while warming up, or once by hand in the standby profile.
+# The standby is only promoted after every instance and Teams loaded without a login page.
+# Off by default: enable it only where the extra Chrome fits in memory.
+BROWSER_POOL = {
+    "enabled": False,
+    "standby_user_data": r"C:\selenium_chrome_profile_standby",
+    "standby_debug_port": 9223,
+    "login_checks": 3,              # warm-up rounds until signed in, else the standby is dropped
+    "login_retry_seconds": 30,      # wait between rounds (SSO completing in the background)
+    # Identity provider hosts - landing on one of them means not signed in
+    "login_hosts": ["login.microsoftonline.com", "login.live.com", "login.windows.net"],
+}
+
+# =====================================================================
+# BROWSER WATCHDOG
+# =====================================================================
+# Sample memory and CPU of chromedriver and its Chrome processes in the background
+# (requires psutil) and the DOM node count of the current tab after every queue
+# visit. When a limit is exceeded for sustained_samples samples in a row, the
+# browser is recycled between two queue visits (standby promoted or Chrome
+# restarted; queue tabs and Teams tab reopened). A limit of 0 disables that check.
+BROWSER_WATCHDOG = {
+    "enabled": True,
+    "sample_interval": 30,     # seconds between process samples
+    "max_rss_mb": 3072,        # total RSS of the browser process tree
+    "max_cpu_percent": 90,     # CPU of the browser process tree (100 = one core)
+    "max_dom_nodes": 150000,   # DOM nodes in the current tab's renderer
+    "sustained_samples": 3,    # consecutive samples over a limit before recycling
+    "max_session_hours": 24,   # recycle older sessions regardless of usage
+}
+
+# =====================================================================
+# RESOURCE BLOCKING
+# =====================================================================
+# Block non-essential requests through Chrome DevTools Protocol, per target tab.
+# resource_types: any of "Image", "Font", "Media" (matched by file extension)
+# url_patterns:   Network.setBlockedURLs patterns ("*" is a wildcard)
+# Requests blocked and estimated bytes saved are printed after every queue visit.
+RESOURCE_BLOCKING = {
+    "enabled": True,
+    "profiles": {
+        "servicenow": {
+            "resource_types": ["Image", "Font", "Media"],
+            "url_patterns": [
+                "*google-analytics.com*",
+                "*googletagmanager.com*",
+                "*/api/now/ui/user/avatar*",
+                "*/api/now/ui/presence*",
+                "*/api/now/analytics*",
+                # Add Polaris UI chrome bundles here once verified not to break the list view, e.g.
+                # "*/uxasset/externals/now-avatar*",
+            ],
+        },
+        "teams": {
+            "resource_types": ["Media"],
+            "url_patterns": [
+                "*browser.events.data.microsoft.com*",
+                "*statics.teams.cdn.office.net/evergreen-assets/illustrations*",
+            ],
+        },
+    },
+}
+
+# =====================================================================
+# LIST CAPTURE
+# =====================================================================
+# Decode tickets from the list response captured in Chrome's performance log
+# instead of switching into the iframe and reading table cells. Falls back to
+# DOM scraping when nothing is captured or the list spans more than one page.
+LIST_CAPTURE = {
+    "enabled": True,
+    # Response URLs that carry list data (HTML list documents or Table API JSON)
+    "url_patterns": ["_list.do", "/api/now/table/"],
+    # Ticket key -> record field for JSON payloads
+    "json_fields": {
+        "number": "number",
+        "short_description": "short_description",
+        "affected_user": "caller_id",
+        "priority": "priority",
+        "state": "state",
+        "assignment_group": "assignment_group",
+        "assigned_to": "assigned_to",
+        "type": "category",
+        "updated": "sys_updated_on",
+    },
+}
+
+# =====================================================================
+# IN-PLACE LIST REFRESH
+# =====================================================================
+# After the first full load of an instance, load its lists by pointing the list
+# iframe at the list URL instead of reloading the whole Polaris page (no shell
+# bootstrap, no shadow root retries). Falls back to a full page load when the
+# shell is not open in the tab or the list does not load within page_load seconds.
+IN_PLACE_REFRESH = True
+
+# Give every steady-state queue (QUEUES with phase "always" or "subsequent")
+# its own tab, opened and loaded at startup. Each visit switches to the queue's tab
+# and refreshes its list in place. First-scan URLs keep using the ServiceNow tab.
+# Costs one Chrome tab (renderer memory) per queue.
+TAB_PER_QUEUE = True
+
+# =====================================================================
+# SERVICENOW HTTP CLIENT
+# =====================================================================
+# Pooled HTTP client that reuses the browser's ServiceNow login: cookies and the
+# session token (g_ck) are exported from Chrome per instance, again after every
+# browser restart and whenever an API call returns HTTP 401.
+# fetch_lists: read queues through the Table API instead of rendering the list
+# (needs REST API access for your role; falls back to the browser on failure).
+# The client - and the login export - only runs when fetch_lists is on.
+SNOW_CLIENT = {
+    "fetch_lists": False,
+    "timeout": 15,              # seconds per request
+    "pool_size": 4,             # keep-alive connections per instance
+    "max_records": 1000,        # records per list fetch
+    "token_page": "/navpage.do",  # page the session token is read from if no tab shows the instance
+}
+
+# =====================================================================
+# METRICS
+# =====================================================================
+# Prometheus-style metrics and health probes on an embedded HTTP endpoint:
+#   /metrics  cycle/queue timings, pages, rows, new tickets, scope cache, log and
+#             Teams latency, browser recoveries, time since the last good cycle
+#   /healthz  200 while the main loop makes progress (liveness)
+#   /readyz   200 once a cycle completed within stall_seconds (readiness)
+# stall_seconds must exceed sleep_between_scans plus the longest cycle.
+METRICS = {
+    "enabled": True,
+    "host": "127.0.0.1",        # "0.0.0.0" to allow scrapes from other machines
+    "port": 9464,
+    "stall_seconds": 900,
+}
+
+# =====================================================================
+# TRACING
+# =====================================================================
+# Time each phase of a cycle (page loads, iframe switch, pages, rows, scope
+# detection, Excel logging, Teams steps) and write one JSON file per cycle.
+# Summarise with: python trace_report.py -n 20
+TRACING = {
+    "enabled": False,
+    "directory": "traces",
+    "keep_cycles": 200,         # newest trace files kept (0 = keep all)
+}
+
+# =====================================================================
+# WEBDRIVER ROUND-TRIP COUNTING
+# =====================================================================
+# Count and time every WebDriver command (find_element(s), .text, execute_script,
+# click, send_keys, ...) grouped by the bot function that issued it. A summary of
+# the slowest callers is logged after each cycle as a debug-level driver.summary
+# event; totals are also exported as bot_webdriver_* metrics. Off by default -
+# every command walks the call stack to find its caller.
+DRIVER_STATS = {
+    "enabled": False,
+    "summary_top": 10,          # callers listed in the cycle summary
+}
+
+# =====================================================================
+# ON-DEMAND PROFILING
+# =====================================================================
+# Profile the next cycles of a running bot, requested by any of:
+#   - creating control_file (empty, or JSON like {"cycles": 3, "mode": "sample", "memory": true})
+#   - SIGUSR1 (Linux/macOS) or Ctrl+Break in the bot's console window (Windows)
+#   - curl -X POST "http://127.0.0.1:9464/profile?cycles=3&mode=cprofile&memory=1"
+# mode "cprofile" records every call (slower cycles); "sample" samples the stack
+# every sample_interval seconds (collapsed stacks for flame graphs).
+# memory: tracemalloc snapshot diffs between profiled cycles (growth by line).
+PROFILING = {
+    "enabled": True,
+    "directory": "profiles",
+    "control_file": "profile.request",
+    "cycles": 1,                # cycles profiled per request (default)
+    "mode": "cprofile",         # default mode: "cprofile" or "sample"
+    "memory": True,             # default: also diff tracemalloc snapshots
+    "sample_interval": 0.01,    # seconds between stack samples
+    "tracemalloc_frames": 10,   # stack depth stored per allocation
+    "top": 40,                  # functions / allocation sites per report
+}
+
+# =====================================================================
+# EVENT LOG
+# =====================================================================
+# Cycle output (queue headers, one event per ticket, summaries, errors) is written
+# as JSON lines to a rotating file by a background listener thread; the monitoring
+# loop only puts events on a queue and never waits for the console or disk.
+# console: also render events on the console (False = file only, fastest)
+EVENT_LOG = {
+    "enabled": True,
+    "file": "logs/bot_events.jsonl",
+    "max_bytes": 10 * 1024 * 1024,  # rotate at 10 MB
+    "backup_count": 5,              # rotated files kept
+    "level": "INFO",                # "DEBUG", "INFO", "WARNING", "ERROR"
+    "console": True,
+    "console_level": "INFO",
+}
+
+# =====================================================================
+# CHECKPOINT
+# =====================================================================
+# After every cycle the alert trackers and each queue's last scan time and content
+# fingerprint are written atomically to a small JSON file. On startup the bot resumes
+# from it: tickets already alerted are not alerted again, first-scan queues are not
+# repeated and queues keep their scan intervals.
+CHECKPOINT = {
+    "enabled": True,
+    "file": "state/checkpoint.json",
+    "max_age_hours": 12,        # older checkpoints are ignored (start fresh)
+}
+
+# =====================================================================
+# COORDINATION
+# =====================================================================
+# Several bots with the same QUEUES can split the queues between them. Each queue is
+# leased from a shared SQLite file; a node scans only the queues it holds, at most
+# its share (queues / live nodes), and renews the leases in the background. When a
+# node stops or hangs its leases expire and the other nodes take its queues over.
+# lease_seconds must exceed a monitoring cycle plus sleep_between_scans and the clock skew between hosts.
+COORDINATION = {
+    "enabled": False,
+    "database": r"\\fileserver\ticket_bot\leases.db",  # shared by all nodes
+    "node_id": None,            # None = "<hostname>-<pid>"
+    "lease_seconds": 600,
+    "renew_seconds": 60,
+}
+
+# =====================================================================
+# HIGH AVAILABILITY
+# =====================================================================
+# Run two bots as an active/standby pair. The bot holding the leader lease scans the
+# queues and is the only one that sends to Teams; each send is fenced by checking the
+# lease's token in the store first. The standby keeps its browser, Teams and queue tabs
+# loaded and follows the leader's checkpoint, so it takes over within about
+# lease_seconds when the leader stops or stalls. For bots on two hosts put the database
+# and CHECKPOINT["file"] on a shared drive; on one host local paths are enough.
+HIGH_AVAILABILITY = {
+    "enabled": False,
+    "database": "state/leader.db",
+    "group": "ticket_bot",      # bots with the same group elect one leader
+    "node_id": None,            # None = "<hostname>-<pid>"
+    "lease_seconds": 15,        # failover time after the leader dies
+    "renew_seconds": 3,
+    "standby_poll_seconds": 5,  # how often the standby checks leadership and the checkpoint
+}
+
+# =====================================================================
+# PIPELINE
+# =====================================================================
+# Extracted tickets stream through normalise -> scope -> log -> aggregate stages, each
+# on its own thread(s) and connected by bounded queues, while the main thread keeps
+# reading rows. A full queue makes the upstream stage wait (backpressure). Items,
+# busy and blocked seconds per stage are exported as bot_pipeline_* metrics.
+# enabled: False = run the stages inline on the main thread
+PIPELINE = {
+    "enabled": True,
+    "queue_size": 50,           # items buffered between two stages
+    "scope_workers": 2,         # threads for fuzzy scope matching (the log writer stays single)
+}
+
 # =====================================================================
 # COLUMN MAPPINGS FOR INCIDENT TABLE
 # =====================================================================
@@ -88,31 +435,98 @@ CHANGE_COLUMNS = {
 }
 
 # =====================================================================
-# SERVICENOW URLS
+# SERVICENOW INSTANCES
 # =====================================================================
-# URL configurations for different ticket types and instances
-
-INCIDENT_URLS_FIRST_SCAN = [
-    "https://everest.service-now.com/now/nav/ui/classic/params/target/incident_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate!%253D7%255Estate!%253D8%255Eresolved_atONToday%40javascript%3Ags.beginningOfToday()%40javascript%3Ags.endOfToday()%26sysparm_first_row%3D1%26sysparm_view%3D",
-    "https://everest.service-now.com/now/nav/ui/classic/params/target/incident_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate!%253D6%255Estate!%253D7%255Estate!%253D8%26sysparm_first_row%3D1%26sysparm_view%3D",
-    "https://alaska.service-now.com/now/nav/ui/classic/params/target/incident_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate!%253D6%255Estate!%253D7%255Estate!%253D8%26sysparm_first_row%3D1%26sysparm_view%3D"
-]
-
-INCIDENT_URLS_SUBSEQUENT = [
-    "https://everest.service-now.com/now/nav/ui/classic/params/target/incident_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate%253D4%26sysparm_first_row%3D1%26sysparm_view%3D",
-    "https://alaska.service-now.com/now/nav/ui/classic/params/target/incident_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate%253D4%26sysparm_first_row%3D1%26sysparm_view%3D"
-]
+# key -> host, display name and monitoring toggle. The key selects the greeting
+# in MESSAGE_TEMPLATES (e.g. "incident_instance1").
+SNOW_INSTANCES = {
+    "instance1": {
+        "host": "everest.service-now.com",
+        "name": "SNOW Instance 1",
+        "enabled": ENABLE_SNOW_INSTANCE_1_MONITORING,
+    },
+    "instance2": {
+        "host": "alaska.service-now.com",
+        "name": "SNOW Instance 2",
+        "enabled": ENABLE_SNOW_INSTANCE_2_MONITORING,
+    },
+}
 
-CHANGE_URLS = [
-    "https://everest.service-now.com/now/nav/ui/classic/params/target/change_request_list.do%3Fsysparm_query%3Dassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate!%253D3%255Estate!%253D4%26sysparm_first_row%3D1%26sysparm_view%3D",
-    "https://alaska.service-now.com/now/nav/ui/classic/params/target/change_request_list.do%3Fsysparm_query%3Dassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255EORassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253Daf1282dc2b43d2d8828af1c3d891bf9e%255Estate!%253D3%255Estate!%253D4%26sysparm_first_row%3D1%26sysparm_view%3D"
-]
+# Assignment group sys_ids watched by the queues
+ASSIGNMENT_GROUPS = {
+    "group_a": "8e4ce63b879b11d0e70832a80cbb3511",
+    "group_b": "1d687f0087984e9cfd79db173cbb3596",
+    "group_c": "459f0c6e2bc51a5445e2f831ce91bfd7",
+    "group_d": "af1282dc2b43d2d8828af1c3d891bf9e",
+}
 
-CTASK_URLS = [
-    "https://everest.service-now.com/now/nav/ui/classic/params/target/change_task_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255Estate!%253D4%255Estate!%253D3%255Eplanned_start_date%253Cjavascript%3Ags.beginningOfCurrentMinute()%26sysparm_first_row%3D1%26sysparm_view%3D",
-    "https://alaska.service-now.com/now/nav/ui/classic/params/target/change_task_list.do%3Fsysparm_query%3Dassignment_group%253D8e4ce63b879b11d0e70832a80cbb3511%255EORassignment_group%253D1d687f0087984e9cfd79db173cbb3596%255EORassignment_group%253D459f0c6e2bc51a5445e2f831ce91bfd7%255Estate!%253D4%255Estate!%253D3%255Eplanned_start_date%253Cjavascript%3Ags.beginningOfCurrentMinute()%26sysparm_first_row%3D1%26sysparm_view%3D"
+# =====================================================================
+# MONITORED QUEUES
+# =====================================================================
+# One entry per queue; the list URL of every listed instance is built from it.
+#   table:      incident, change_request or change_task (see TICKET_TABLES)
+#   instances:  SNOW_INSTANCES keys the queue is monitored on
+#   groups:     ASSIGNMENT_GROUPS keys (matched with OR)
+#   conditions: further encoded-query conditions (ANDed)
+#   phase:      "first_scan" (first cycle only), "subsequent" (later cycles) or "always"
+#   priority:   scan order within its table (lower first)
+#   interval:   minimum seconds between scans (0 = every cycle)
+#   columns:    optional column mapping overriding the table's
+QUEUES = [
+    {
+        "name": "Incidents resolved today",
+        "table": "incident",
+        "instances": ["instance1"],
+        "groups": ["group_a", "group_b", "group_c", "group_d"],
+        "conditions": ["state!=7", "state!=8",
+                       "resolved_atONToday@javascript:gs.beginningOfToday()@javascript:gs.endOfToday()"],
+        "phase": "first_scan",
+        "priority": 1,
+        "interval": 0,
+    },
+    {
+        "name": "Open incidents",
+        "table": "incident",
+        "instances": ["instance1", "instance2"],
+        "groups": ["group_a", "group_b", "group_c", "group_d"],
+        "conditions": ["state!=6", "state!=7", "state!=8"],
+        "phase": "first_scan",
+        "priority": 2,
+        "interval": 0,
+    },
+    {
+        "name": "Incidents in progress",
+        "table": "incident",
+        "instances": ["instance1", "instance2"],
+        "groups": ["group_a", "group_b", "group_c", "group_d"],
+        "conditions": ["state=4"],
+        "phase": "subsequent",
+        "priority": 1,
+        "interval": 0,
+    },
+    {
+        "name": "Open changes",
+        "table": "change_request",
+        "instances": ["instance1", "instance2"],
+        "groups": ["group_c", "group_a", "group_b", "group_d"],
+        "conditions": ["state!=3", "state!=4"],
+        "phase": "always",
+        "priority": 1,
+        "interval": 0,
+    },
+    {
+        "name": "Overdue change tasks",
+        "table": "change_task",
+        "instances": ["instance1", "instance2"],
+        "groups": ["group_a", "group_b", "group_c"],
+        "conditions": ["state!=4", "state!=3", "planned_start_date<javascript:gs.beginningOfCurrentMinute()"],
+        "phase": "always",
+        "priority": 1,
+        "interval": 0,
+    },
 ]
 
+# Other URLs
 TEAMS_URL = "https://teams.microsoft.com/v2/"
 ALASKA_LOGIN_URL = "https://alaska.service-now.com/login.do"  #Remove the login.do if alaska SSO works
 
@@ -180,11 +594,27 @@ TIMEOUTS = {
     "login_wait": 5,
 }
 
+# =====================================================================
+# TICKET TABLES
+# =====================================================================
+# table -> MESSAGE_TEMPLATES prefix, default column mapping and monitoring toggle
+TICKET_TABLES = {
+    "incident": {"template": "incident", "columns": INCIDENT_COLUMNS, "enabled": ENABLE_INCIDENT_MONITORING},
+    "change_request": {"template": "change", "columns": CHANGE_COLUMNS, "enabled": ENABLE_CHANGE_MONITORING},
+    "change_task": {"template": "ctask", "columns": CHANGE_COLUMNS, "enabled": ENABLE_CTASK_MONITORING},
+}
+
 # =====================================================================
 # MONITORING SETTINGS
 # =====================================================================
-MAX_REMINDER_COUNT = 5
+MAX_REMINDER_COUNT = 5         # reminders per unassigned ticket, the last one is the final reminder
+REMINDER_INTERVAL = 0          # minimum seconds between reminders for a ticket (0 = every cycle)
+
+# Collect new unassigned tickets from every queue and instance during a cycle and
+# send them as one digest at the end of the cycle (False sends one alert per queue)
+COALESCE_ALERTS = True
 FUZZY_MATCH_THRESHOLD = 90
+SCOPE_CACHE_SIZE = 10000       # remembered description -> scope matches (least recently used evicted)
 
 # =====================================================================
 # SCOPE CONFIGURATION
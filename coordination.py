@@ -0,0 +1,287 @@
+"""
+Coordination for Ticket Monitoring Bot
+Spreads queues over several bot nodes through time-bounded leases in a shared store
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import abc
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import config
+from metrics import metrics
+from event_log import log_event
+
+
+def default_node_id():
+    """
+    Get an id that is unique per running bot
+    
+    Returns:
+        str - "host-pid"
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseStore(abc.ABC):
+    """
+    Shared store of named leases
+    
+    A lease has one owner until it expires. Every change of owner increments the
+    lease's fencing token, so work started under an older token can be recognised
+    as stale. Subclass this to coordinate through another backend.
+    """
+    
+    @abc.abstractmethod
+    def acquire(self, key, owner, seconds):
+        """
+        Take a free or expired lease, or extend one already held
+        
+        Args:
+            key: str - lease name (e.g. "queue:<url>")
+            owner: str - node id
+            seconds: float - lease duration from now
+        
+        Returns:
+            int - fencing token of the lease, or None if another node holds it
+        """
+    
+    @abc.abstractmethod
+    def renew(self, key, owner, seconds):
+        """
+        Extend a lease that is still held
+        
+        Returns:
+            bool - True if renewed, False if the lease expired or changed owner
+        """
+    
+    @abc.abstractmethod
+    def release(self, key, owner):
+        """Give up a lease so another node can take it immediately"""
+    
+    @abc.abstractmethod
+    def holders(self, prefix):
+        """
+        Get the unexpired leases whose name starts with prefix
+        
+        Args:
+            prefix: str - lease name prefix (e.g. "node:")
+        
+        Returns:
+            dict - lease name -> owner
+        """
+    
+    def close(self):
+        """Release backend resources"""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Leases in a SQLite file; on a shared drive it coordinates bots on several hosts"""
+    
+    def __init__(self, path):
+        """
+        Initialize SQLiteLeaseStore
+        
+        Args:
+            path: str - database file (created if missing)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("CREATE TABLE IF NOT EXISTS leases ("
+                        "key TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+                        "expires REAL NOT NULL, token INTEGER NOT NULL)")
+    
+    @contextmanager
+    def transaction(self):
+        """Run statements in one write transaction (other nodes wait on the database lock)"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+    
+    def acquire(self, key, owner, seconds):
+        now = time.time()
+        with self.transaction() as db:
+            row = db.execute("SELECT owner, expires, token FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                db.execute("INSERT INTO leases VALUES (?, ?, ?, 1)", (key, owner, now + seconds))
+                return 1
+            current_owner, expires, token = row
+            if current_owner == owner and expires > now:
+                db.execute("UPDATE leases SET expires = ? WHERE key = ?", (now + seconds, key))
+                return token
+            if expires > now:
+                return None
+            db.execute("UPDATE leases SET owner = ?, expires = ?, token = ? WHERE key = ?",
+                       (owner, now + seconds, token + 1, key))
+            return token + 1
+    
+    def renew(self, key, owner, seconds):
+        now = time.time()
+        with self.transaction() as db:
+            cursor = db.execute("UPDATE leases SET expires = ? WHERE key = ? AND owner = ? AND expires > ?",
+                                (now + seconds, key, owner, now))
+            return cursor.rowcount == 1
+    
+    def release(self, key, owner):
+        with self.transaction() as db:
+            # Expire instead of delete, so the fencing token keeps counting up
+            db.execute("UPDATE leases SET expires = 0 WHERE key = ? AND owner = ?", (key, owner))
+    
+    def holders(self, prefix):
+        with self.lock:
+            rows = self.db.execute("SELECT key, owner FROM leases WHERE substr(key, 1, ?) = ? AND expires > ?",
+                                   (len(prefix), prefix, time.time())).fetchall()
+        return dict(rows)
+    
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class QueueCoordinator:
+    """Claims this node's share of the queues and keeps its leases alive"""
+    
+    def __init__(self, store, queue_urls, settings=None):
+        """
+        Initialize QueueCoordinator
+        
+        Args:
+            store: LeaseStore - shared lease store
+            queue_urls: list - URLs of the queues the nodes share in every cycle
+            settings: dict - coordination settings (default config.COORDINATION)
+        """
+        self.store = store
+        self.queue_urls = list(queue_urls)
+        self.shared = {f"queue:{url}" for url in self.queue_urls}
+        self.settings = settings or config.COORDINATION
+        self.node_id = self.settings["node_id"] or default_node_id()
+        self.lease_seconds = self.settings["lease_seconds"]
+        self.held = {}
+        self.last_claim = time.time()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Announce this node and keep its leases renewed in the background"""
+        self.store.acquire(f"node:{self.node_id}", self.node_id, self.lease_seconds)
+        self.thread = threading.Thread(target=self._run, name="lease-renewal", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Renewal loop (runs on the lease-renewal thread)"""
+        while not self.stop_event.wait(self.settings["renew_seconds"]):
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"Lease renewal failed: {e}")
+    
+    def renew(self):
+        """Renew the node lease and, while the monitoring loop is alive, the queue leases"""
+        self.store.acquire(f"node:{self.node_id}", self.node_id, self.lease_seconds)
+        # A stuck loop stops renewing, so other nodes take over its queues
+        if time.time() - self.last_claim > self.lease_seconds:
+            return
+        with self.lock:
+            keys = list(self.held)
+        for key in keys:
+            if not self.store.renew(key, self.node_id, self.lease_seconds):
+                self.drop(key)
+    
+    def drop(self, key):
+        """Forget a lease that another node has taken over"""
+        with self.lock:
+            self.held.pop(key, None)
+        log_event("lease.lost", f"Lease lost: {key}", lease=key, node=self.node_id)
+        metrics.set("bot_queue_leases_held", len(self.held))
+    
+    def share(self):
+        """
+        Get the number of queues this node should hold
+        
+        Returns:
+            int - queues divided evenly over the live nodes, rounded up
+        """
+        nodes = max(len(self.store.holders("node:")), 1)
+        return math.ceil(len(self.queue_urls) / nodes)
+    
+    def claim(self, entries):
+        """
+        Keep the queues this node can lease, up to its share
+        
+        Queues outside the shared ones (first-scan-only queues) are leased
+        without counting against the share and released by the next rebalance().
+        
+        Args:
+            entries: list - QueueEntry objects due in this cycle
+        
+        Returns:
+            list - entries leased by this node, in the given order
+        """
+        self.last_claim = time.time()
+        share = self.share()
+        claimed = []
+        for entry in entries:
+            key = f"queue:{entry.url}"
+            held = key in self.held
+            if not held and key in self.shared and len(self.held.keys() & self.shared) >= share:
+                continue
+            token = self.store.acquire(key, self.node_id, self.lease_seconds)
+            if token is None:
+                if held:
+                    self.drop(key)
+                continue
+            if not held:
+                log_event("lease.acquired", f"Leased {entry.name} ({entry.instance_name}) - token {token}",
+                          lease=key, node=self.node_id, token=token)
+            with self.lock:
+                self.held[key] = token
+            claimed.append(entry)
+        metrics.set("bot_queue_leases_held", len(self.held))
+        return claimed
+    
+    def rebalance(self):
+        """Release past first-scan queues, and queues beyond this node's share after other nodes joined"""
+        share = self.share()
+        with self.lock:
+            released = [key for key in self.held if key not in self.shared]
+            shared = [key for key in self.held if key in self.shared]
+            surplus = len(shared) - share
+            if surplus > 0:
+                released += shared[-surplus:]
+            for key in released:
+                del self.held[key]
+        if not released:
+            return
+        for key in released:
+            self.store.release(key, self.node_id)
+            log_event("lease.released", f"Released {key} to another node", lease=key, node=self.node_id)
+        metrics.set("bot_queue_leases_held", len(self.held))
+    
+    def stop(self):
+        """Stop renewing and release all leases so other nodes take over at once"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(5)
+        with self.lock:
+            keys, self.held = list(self.held), {}
+        try:
+            for key in keys + [f"node:{self.node_id}"]:
+                self.store.release(key, self.node_id)
+        except Exception as e:
+            print(f"Error releasing leases: {e}")
+        self.store.close()
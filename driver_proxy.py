@@ -0,0 +1,152 @@
+"""
+Driver Proxy for Ticket Monitoring Bot
+Counts and times every WebDriver round trip, grouped by the bot function that caused it
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import selenium
+import config
+from metrics import metrics
+from event_log import log_event
+
+
+# Frames in these files are skipped when looking for the calling bot function
+SKIPPED_PATHS = (
+    os.path.dirname(selenium.__file__),
+    os.path.dirname(os.__file__),  # standard library (contextlib, functools)
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracing.py"),
+)
+
+# co_filename -> (skipped, module name), so paths are resolved once per file
+_files = {}
+
+
+def get_caller():
+    """
+    Find the bot function that issued the current WebDriver command
+    
+    Selenium internals, WebDriverWait conditions and wrappers are skipped, so
+    commands are attributed to e.g. ticket_monitor.read_row.
+    
+    Returns:
+        str - "module.function" or "unknown"
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in _files:
+            path = os.path.abspath(filename)
+            _files[filename] = (path.startswith(SKIPPED_PATHS),
+                                os.path.splitext(os.path.basename(path))[0])
+        skipped, module = _files[filename]
+        if not skipped:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class DriverStats:
+    """WebDriver command counts and time per (caller, command), reset every cycle"""
+    
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+    
+    def record(self, caller, command, seconds):
+        """Record one WebDriver command"""
+        key = (caller, command)
+        with self.lock:
+            entry = self.calls.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        metrics.inc("bot_webdriver_commands_total", caller=caller, command=command)
+        metrics.inc("bot_webdriver_seconds_total", seconds, caller=caller, command=command)
+    
+    def reset(self):
+        """
+        Take and clear the counts of the finished cycle
+        
+        Returns:
+            dict - (caller, command) -> [count, seconds]
+        """
+        with self.lock:
+            calls, self.calls = self.calls, {}
+        return calls
+    
+    def log_summary(self, top=None):
+        """
+        Log the cycle's round trips per calling function (debug level) and start a new cycle
+        
+        Args:
+            top: int - callers to show (default config.DRIVER_STATS["summary_top"])
+        """
+        top = top or config.DRIVER_STATS["summary_top"]
+        calls = self.reset()
+        if not calls:
+            return
+        
+        callers = {}
+        for (caller, command), (count, seconds) in calls.items():
+            entry = callers.setdefault(caller, {"count": 0, "seconds": 0.0, "commands": {}})
+            entry["count"] += count
+            entry["seconds"] += seconds
+            entry["commands"][command] = count
+        
+        total_count = sum(c["count"] for c in callers.values())
+        total_seconds = sum(c["seconds"] for c in callers.values())
+        lines = [f"\nWebDriver round trips this cycle: {total_count} ({total_seconds:.1f} s)"]
+        ranked = sorted(callers.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]
+        for caller, entry in ranked:
+            commands = ", ".join(f"{name} {count}" for name, count in
+                                 sorted(entry["commands"].items(), key=lambda c: c[1], reverse=True)[:3])
+            lines.append(f"  {caller:<45} {entry['count']:>6} calls {entry['seconds']:>8.2f} s  ({commands})")
+        log_event("driver.summary", "\n".join(lines), logging.DEBUG,
+                  commands=total_count, seconds=round(total_seconds, 2),
+                  callers={caller: entry["count"] for caller, entry in ranked})
+
+
+# Shared counters - every instrumented driver records here, main logs them per cycle
+driver_stats = DriverStats()
+
+
+class InstrumentedDriver:
+    """
+    WebDriver wrapper that times every command sent to chromedriver
+    
+    The raw driver's execute() is routed through the wrapper, so commands issued
+    by elements (.text, click, send_keys), WebDriverWait conditions and code that
+    still holds the raw driver are counted as well. Everything else is delegated.
+    """
+    
+    def __init__(self, driver, stats=None):
+        """
+        Initialize InstrumentedDriver
+        
+        Args:
+            driver: WebDriver - raw Selenium driver
+            stats: DriverStats - counters to record into (default driver_stats)
+        """
+        self.driver = driver
+        self.stats = stats or driver_stats
+        self.raw_execute = driver.execute
+        driver.execute = self.execute
+    
+    def execute(self, driver_command, params=None):
+        """Send one command to chromedriver and record its round trip"""
+        started = time.perf_counter()
+        try:
+            return self.raw_execute(driver_command, params)
+        finally:
+            command = driver_command if isinstance(driver_command, str) else "bidi"
+            self.stats.record(get_caller(), command, time.perf_counter() - started)
+    
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
@@ -0,0 +1,102 @@
+"""
+Event Log for Ticket Monitoring Bot
+Structured JSON events written by a background listener - the monitoring loop never waits on file or console I/O
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import config
+
+
+logger = logging.getLogger("ticket_bot")
+
+# Set by setup_event_log, stopped (and drained) by stop_event_log
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, event, message and the event's fields"""
+    
+    def format(self, record):
+        event = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "event": getattr(record, "event", "message"),
+            "message": record.getMessage(),
+        }
+        event.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+def setup_event_log(settings=None):
+    """
+    Route the bot's events through a queue to the rotating JSON file and optional console
+    
+    Args:
+        settings: dict - event log settings (default config.EVENT_LOG)
+    """
+    global _listener
+    settings = settings or config.EVENT_LOG
+    if _listener:
+        return
+    
+    handlers = []
+    directory = os.path.dirname(settings["file"])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = RotatingFileHandler(settings["file"], maxBytes=settings["max_bytes"],
+                                       backupCount=settings["backup_count"], encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    handlers.append(file_handler)
+    
+    if settings["console"]:
+        console_handler = logging.StreamHandler(sys.stdout)
+        # Message only, so the console looks like the bot's usual output
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        console_handler.setLevel(settings["console_level"])
+        handlers.append(console_handler)
+    
+    # Unbounded queue - put_nowait never blocks the monitoring loop
+    event_queue = queue.Queue(-1)
+    logger.setLevel(settings["level"])
+    logger.addHandler(QueueHandler(event_queue))
+    logger.propagate = False
+    
+    _listener = QueueListener(event_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_event_log():
+    """Write out queued events and stop the listener thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def log_event(event, message="", level=logging.INFO, **fields):
+    """
+    Record a structured event
+    
+    Before setup_event_log (or with EVENT_LOG disabled) events are printed.
+    
+    Args:
+        event: str - event name (e.g. "ticket", "queue.summary")
+        message: str - human-readable line shown on the console
+        level: int - logging level
+        **fields: values stored with the event (ticket number, queue, counts, ...)
+    """
+    if not logger.handlers:
+        print(message)
+        return
+    logger.log(level, message, extra={"event": event, "fields": fields})
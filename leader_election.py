@@ -0,0 +1,145 @@
+"""
+Leader Election for Ticket Monitoring Bot
+Active/standby pair: only the bot holding the leader lease scans queues and sends to Teams
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import threading
+import time
+import config
+from coordination import default_node_id
+from metrics import metrics
+from event_log import log_event
+
+
+class LeaderElection:
+    """
+    Holds or waits for the leader lease of a bot group
+    
+    The lease's fencing token increases with every new leader. Before sending,
+    the leader confirms in the store that its token is still the current one,
+    so a leader that stalled past its lease cannot send after a failover.
+    """
+    
+    def __init__(self, store, settings=None):
+        """
+        Initialize LeaderElection
+        
+        Args:
+            store: LeaseStore - lease store shared by the bots of the group
+            settings: dict - election settings (default config.HIGH_AVAILABILITY)
+        """
+        self.store = store
+        self.settings = settings or config.HIGH_AVAILABILITY
+        self.node_id = self.settings["node_id"] or default_node_id()
+        self.key = f"leader:{self.settings['group']}"
+        self.lease_seconds = self.settings["lease_seconds"]
+        self.token = None
+        self.expires = 0
+        self.lock = threading.Lock()
+        self.elected = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Campaign once now, then keep campaigning / renewing in the background"""
+        self.campaign()
+        self.thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Election loop (runs on the leader-election thread)"""
+        while not self.stop_event.wait(self.settings["renew_seconds"]):
+            try:
+                self.campaign()
+            except Exception as e:
+                # Leadership runs out with the local lease expiry (see is_leader)
+                print(f"Leader election failed: {e}")
+                if not self.is_leader():
+                    self.elected.clear()
+    
+    def campaign(self):
+        """Take the leader lease if it is free, or renew it while this bot is healthy"""
+        # A bot whose monitoring loop stalled neither leads nor takes over
+        if not metrics.is_alive(config.METRICS["stall_seconds"]):
+            self.step_down("monitoring loop stalled")
+            return
+        
+        requested = time.time()
+        token = self.store.acquire(self.key, self.node_id, self.lease_seconds)
+        with self.lock:
+            previous, self.token = self.token, token
+            self.expires = requested + self.lease_seconds if token is not None else 0
+        
+        if token is not None and previous != token:
+            log_event("ha.elected", f"Elected leader of {self.settings['group']} (fencing token {token})",
+                      node=self.node_id, token=token)
+            self.elected.set()
+        elif token is None and previous is not None:
+            log_event("ha.demoted", "Leader lease taken over by another bot - now standby", node=self.node_id)
+            self.elected.clear()
+    
+    def step_down(self, reason):
+        """
+        Give up the leader lease so the standby takes over
+        
+        Args:
+            reason: str - logged reason
+        """
+        with self.lock:
+            token, self.token, self.expires = self.token, None, 0
+        self.elected.clear()
+        if token is not None:
+            self.store.release(self.key, self.node_id)
+            log_event("ha.stepped_down", f"Stepped down as leader: {reason}", node=self.node_id, token=token)
+    
+    def is_leader(self):
+        """
+        Check leadership without a store round trip
+        
+        Returns:
+            bool - True while this bot holds an unexpired leader lease
+        """
+        with self.lock:
+            return self.token is not None and time.time() < self.expires
+    
+    def confirm(self):
+        """
+        Fence a send: confirm in the store that this bot is still the current leader
+        
+        Returns:
+            bool - True if the stored lease still carries this bot's token
+        """
+        if not self.is_leader():
+            return False
+        try:
+            return self.store.acquire(self.key, self.node_id, self.lease_seconds) == self.token
+        except Exception as e:
+            print(f"Leader check failed: {e}")
+            return False
+    
+    def wait_for_leadership(self, timeout):
+        """
+        Block until elected or the timeout passes
+        
+        Args:
+            timeout: float - seconds to wait
+        
+        Returns:
+            bool - True if this bot is the leader
+        """
+        self.elected.wait(timeout)
+        return self.is_leader()
+    
+    def stop(self):
+        """Stop campaigning and hand the lease to the standby at once"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(5)
+        try:
+            self.step_down("shutting down")
+        except Exception as e:
+            print(f"Error releasing leader lease: {e}")
+        self.store.close()
@@ -0,0 +1,245 @@
+"""
+List Capture for Ticket Monitoring Bot
+Decodes ServiceNow list data from captured network responses instead of scraping the DOM
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import base64
+import json
+from html.parser import HTMLParser
+import config
+
+
+def extract_ticket(cells, column_config):
+    """
+    Build a ticket dict from the cell texts of one list row
+    
+    Args:
+        cells: list - cell texts in column order
+        column_config: dict - column mappings (INCIDENT_COLUMNS or CHANGE_COLUMNS)
+    
+    Returns:
+        dict - ticket data
+    
+    Raises:
+        IndexError - if the row has fewer cells than the column mapping needs
+    """
+    number_column = column_config['chg_number'] if 'chg_number' in column_config else column_config['inc_number']
+    return {
+        'number': cells[number_column].strip(),
+        'short_description': cells[column_config['short_description']].strip(),
+        'affected_user': cells[column_config['affected_user']].strip(),
+        'priority': cells[column_config['priority']].strip(),
+        'state': cells[column_config['state']].strip(),
+        'assignment_group': cells[column_config['assignment_group']].strip(),
+        'assigned_to': cells[column_config['assigned_to']].strip(),
+        'type': cells[column_config['type']].strip(),
+        'updated': cells[column_config['updated']].strip(),
+    }
+
+
+class ListHTMLParser(HTMLParser):
+    """Collects the cell texts of the list2_body rows and the total row count"""
+    
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.total_count = None
+        self.tbody_depth = 0
+        self.row = None
+        self.cell = None
+        self.total_depth = 0
+        self.total_text = []
+        self.skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "style"):
+            self.skip_depth += 1
+        elif tag == "tbody" and "list2_body" in (attrs.get("class") or ""):
+            self.tbody_depth += 1
+        elif tag == "tr" and self.tbody_depth:
+            self.row = []
+        elif tag == "td" and self.row is not None:
+            self.cell = []
+        
+        if self.total_depth:
+            self.total_depth += 1
+        elif (attrs.get("id") or "").endswith("_total_rows"):
+            self.total_depth = 1
+            self.total_text = []
+    
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "td" and self.cell is not None:
+            self.row.append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self.rows.append(self.row)
+            self.row = None
+        elif tag == "tbody" and self.tbody_depth:
+            self.tbody_depth -= 1
+        
+        if self.total_depth:
+            self.total_depth -= 1
+            if not self.total_depth:
+                self.total_count = "".join(self.total_text).strip()
+    
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.cell is not None:
+            self.cell.append(data)
+        if self.total_depth:
+            self.total_text.append(data)
+
+
+def decode_list_html(html_text, column_config):
+    """
+    Decode tickets from a classic list page (e.g. incident_list.do)
+    
+    Args:
+        html_text: str - response body of the list document
+        column_config: dict - column mappings
+    
+    Returns:
+        tuple - (total_count, tickets) or None if the page holds no list
+    """
+    parser = ListHTMLParser()
+    parser.feed(html_text)
+    parser.close()
+    
+    if parser.total_count is None and not parser.rows:
+        return None
+    
+    tickets = []
+    for cells in parser.rows:
+        try:
+            tickets.append(extract_ticket(cells, column_config))
+        except IndexError:
+            # Group headers and the empty-state row have fewer cells
+            continue
+    return parser.total_count or str(len(tickets)), tickets
+
+
+def display_value(value):
+    """
+    Get the display text of a Table API field value
+    
+    Args:
+        value: str or dict - raw value or {"display_value": ..., "value": ...}
+    
+    Returns:
+        str - display text
+    """
+    if isinstance(value, dict):
+        value = value.get("display_value", value.get("value", ""))
+    return "" if value is None else str(value)
+
+
+def decode_list_json(payload, field_map=None, total_count=None):
+    """
+    Decode tickets from a Table API style JSON payload ({"result": [...]})
+    
+    Args:
+        payload: dict - parsed JSON response
+        field_map: dict - ticket key -> record field (default config.LIST_CAPTURE["json_fields"])
+        total_count: str - X-Total-Count header of a paged response (default: records in the payload)
+    
+    Returns:
+        tuple - (total_count, tickets) or None if the payload holds no records
+    """
+    field_map = field_map or config.LIST_CAPTURE["json_fields"]
+    records = payload.get("result") if isinstance(payload, dict) else None
+    if not isinstance(records, list):
+        return None
+    
+    tickets = []
+    for record in records:
+        ticket = {key: display_value(record.get(field, "")).strip() for key, field in field_map.items()}
+        # Match the list view, which shows empty references as "(empty)"
+        if not ticket['assigned_to']:
+            ticket['assigned_to'] = "(empty)"
+        tickets.append(ticket)
+    return total_count or str(len(tickets)), tickets
+
+
+class ListCapture:
+    """Watches the performance log for list responses and decodes tickets from their bodies"""
+    
+    def __init__(self, url_patterns=None):
+        """
+        Initialize ListCapture
+        
+        Args:
+            url_patterns: list - substrings identifying list responses (default config)
+        """
+        self.url_patterns = url_patterns or config.LIST_CAPTURE["url_patterns"]
+        self.responses = {}
+        self.finished = []
+    
+    def reset(self):
+        """Forget captured responses (call before loading a new list)"""
+        self.responses = {}
+        self.finished = []
+    
+    def handle_events(self, events):
+        """
+        Track list responses from performance log events
+        
+        Args:
+            events: list - CDP events (dicts with method and params keys)
+        """
+        for event in events:
+            method = event.get("method")
+            params = event.get("params", {})
+            
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                url = response.get("url", "")
+                if any(pattern in url for pattern in self.url_patterns):
+                    # Paged Table API responses carry the full count in a header
+                    headers = {name.lower(): value for name, value in response.get("headers", {}).items()}
+                    self.responses[params.get("requestId")] = (url, response.get("mimeType", ""),
+                                                               headers.get("x-total-count"))
+            
+            elif method == "Network.loadingFinished" and params.get("requestId") in self.responses:
+                self.finished.append((params["requestId"],) + self.responses.pop(params["requestId"]))
+    
+    def collect(self, driver, column_config):
+        """
+        Decode tickets from the most recent captured list response
+        
+        Args:
+            driver: WebDriver - Selenium WebDriver instance (for Network.getResponseBody)
+            column_config: dict - column mappings for HTML lists
+        
+        Returns:
+            tuple - (total_count, tickets) or None if nothing usable was captured
+        """
+        for request_id, url, mime_type, total_count in reversed(self.finished):
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception as e:
+                print(f"Could not read captured response {url}: {e}")
+                continue
+            
+            text = body.get("body", "")
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8", errors="replace")
+            
+            try:
+                if "json" in mime_type:
+                    decoded = decode_list_json(json.loads(text), total_count=total_count)
+                else:
+                    decoded = decode_list_html(text, column_config)
+            except ValueError as e:
+                print(f"Could not decode captured response {url}: {e}")
+                continue
+            
+            if decoded:
+                return decoded
+        return None
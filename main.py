@@ -8,146 +8,335 @@ GitHub: github.com/Prasobgnath
 
 
 import time
+from concurrent.futures import ThreadPoolExecutor
 import config
 from browser_manager import BrowserManager
+from browser_pool import BrowserPool
+from browser_watchdog import BrowserWatchdog
+from snow_client import ServiceNowClient
 from utils import LogManager, ScopeDetector, SoundNotifier, load_inventory_data
-from teams_messenger import TeamsMessenger
+from team_manager import TeamManager
 from ticket_monitor import monitor_incident, monitor_change
+from metrics import metrics, start_metrics_server
+from tracing import tracer
+from driver_proxy import driver_stats
+from profiling import Profiler
+from event_log import setup_event_log, stop_event_log, log_event
+from checkpoint import Checkpoint
+from coordination import QueueCoordinator, SQLiteLeaseStore
+from leader_election import LeaderElection
 
 
-def main():
-    """Main function to run the monitoring bot"""
+def recycle_browser_if_unhealthy(browser_manager, team_manager):
+    """
+    Recycle the browser between queue visits if the watchdog asks for it
     
-    print("=" * 70)
-    print("TICKET MONITORING BOT - Starting Up")
-    print("=" * 70)
+    Args:
+        browser_manager: BrowserManager instance
+        team_manager: TeamManager instance (messengers are pointed at the current session)
+    """
+    browser_manager.recycle_if_unhealthy()
     
-    # Initialize components
-    print("\n[1/6] Initializing Browser Manager...")
-    browser_manager = BrowserManager()
-    if not browser_manager.initialize_browser():
-        print("Failed to initialize browser. Exiting.")
-        return
+    # Also picks up a session recovered by one team's messenger for all the others
+    team_manager.refresh_drivers()
+
+
+def select_queues(team_manager, coordinator, table, first_scan):
+    """
+    Get the queues of a table this bot scans in this cycle
     
-    print("[2/6] Loading Inventory Data...")
-    scope_data = load_inventory_data(config.INVENTORY_EXCEL)
+    Args:
+        team_manager: TeamManager instance
+        coordinator: QueueCoordinator - shares queues with other nodes (None = scan all)
+        table: str - table name
+        first_scan: bool - True in the first monitoring cycle
+    
+    Returns:
+        list - QueueEntry objects in scan order
+    """
+    queues = team_manager.select(table, first_scan=first_scan)
+    return coordinator.claim(queues) if coordinator else queues
+
+
+def run_standby(election, checkpoint, team_manager):
+    """
+    Wait as the standby bot until elected, keeping the alert state in step with the leader
+    
+    The browser, Teams and queue tabs stay loaded, so taking over costs one
+    lease expiry instead of a cold start.
+    
+    Args:
+        election: LeaderElection instance
+        checkpoint: Checkpoint - the leader's checkpoint (None = no state sync)
+        team_manager: TeamManager instance
+    
+    Returns:
+        int - last cycle completed by the leader, or None if unknown
+    """
+    log_event("ha.standby", f"\n>>> Standby - waiting for the leader lease ({election.node_id})")
+    resumed_cycle = None
+    while not election.wait_for_leadership(config.HIGH_AVAILABILITY["standby_poll_seconds"]):
+        metrics.heartbeat()
+        if checkpoint and checkpoint.changed():
+            resumed_cycle = checkpoint.restore(team_manager) or resumed_cycle
+    
+    # Pick up the leader's last cycle before taking over
+    if checkpoint and checkpoint.changed():
+        resumed_cycle = checkpoint.restore(team_manager) or resumed_cycle
+    return resumed_cycle
+
+
+def timed_phase(phases, name, func, *args):
+    """
+    Run one startup phase and record its duration
     
-    print("[3/6] Initializing Log Manager...")
-    log_manager = LogManager(config.LOG_EXCEL)
+    Args:
+        phases: dict - phase name -> seconds (updated)
+        name: str - phase name
+        func: callable - phase to run
+        *args: arguments for func
     
-    print("[4/6] Initializing Scope Detector...")
-    scope_detector = ScopeDetector(scope_data)
+    Returns:
+        Result of func
+    """
+    started = time.time()
+    try:
+        return func(*args)
+    finally:
+        phases[name] = time.time() - started
+        metrics.set("bot_startup_seconds", round(phases[name], 3), phase=name)
+
+
+def build_scope_detector():
+    """
+    Load the inventory and build the scope detector (runs in the background at startup)
     
-    print("[5/6] Initializing Sound Notifier...")
-    sound_notifier = SoundNotifier(config.SOUND_FILE)
-    sound_notifier.play()
+    Returns:
+        ScopeDetector instance
+    """
+    scope_data = load_inventory_data(config.INVENTORY_EXCEL)
+    return ScopeDetector(scope_data)
+
+
+def main():
+    """Main function to run the monitoring bot"""
     
-    print("[6/6] Initializing Teams Messenger...")
-    teams_messenger = TeamsMessenger(browser_manager, sound_notifier)
+    # Cycle output goes through a background listener to the JSON event log (and console)
+    if config.EVENT_LOG["enabled"]:
+        setup_event_log()
     
-    print("\n" + "=" * 70)
-    print("Initialization Complete - Starting Monitoring Loop")
-    print(f"Teams Messaging: {'ENABLED' if config.ENABLE_TEAMS_MESSAGING else 'DISABLED'}")
-    print(f"SNOW Instance 1 Monitoring: {'ENABLED' if config.ENABLE_SNOW_INSTANCE_1_MONITORING else 'DISABLED'}")
-    print(f"SNOW Instance 2 Monitoring: {'ENABLED' if config.ENABLE_SNOW_INSTANCE_2_MONITORING else 'DISABLED'}")
-    print(f"Incident Monitoring: {'ENABLED' if config.ENABLE_INCIDENT_MONITORING else 'DISABLED'}")
-    print(f"Change Monitoring: {'ENABLED' if config.ENABLE_CHANGE_MONITORING else 'DISABLED'}")
-    print(f"CTASK Monitoring: {'ENABLED' if config.ENABLE_CTASK_MONITORING else 'DISABLED'}")
-    print("=" * 70 + "\n")
+    print("=" * 70)
+    print("TICKET MONITORING BOT - Starting Up")
+    print("=" * 70)
+    
+    # Serve metrics and health probes from the start (not ready until the first cycle completes)
+    metrics_server = start_metrics_server() if config.METRICS["enabled"] else None
     
+    # Profiling on request (control file, signal or POST /profile) without a restart
+    profiler = None
+    if config.PROFILING["enabled"]:
+        profiler = Profiler()
+        profiler.install()
+    
+    # Set as each component starts, so the cleanup below stops only what was started
+    browser_manager = browser_pool = browser_watchdog = snow_client = None
+    team_manager = checkpoint = coordinator = election = None
     url_counter = 1
     
     try:
+        startup_started = time.time()
+        phases = {}
+        
+        # Initialize components - the inventory index and the log index don't need the
+        # browser, so they load (and import pandas/fuzzywuzzy) while Chrome starts
+        print("\n[1/5] Loading Inventory Data and Log Index in the background...")
+        log_manager = LogManager(config.LOG_EXCEL)
+        startup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        scope_future = startup_executor.submit(timed_phase, phases, "inventory", build_scope_detector)
+        log_future = startup_executor.submit(timed_phase, phases, "log_index", log_manager.warm_up)
+        startup_executor.shutdown(wait=False)
+        
+        print("[2/5] Initializing Browser Manager...")
+        browser_manager = BrowserManager()
+        if not timed_phase(phases, "browser", browser_manager.initialize_browser):
+            print("Failed to initialize browser. Exiting.")
+            return
+        
+        if config.BROWSER_POOL["enabled"]:
+            print("      Starting standby browser in the background...")
+            browser_pool = BrowserPool(browser_manager)
+            browser_pool.start_standby()
+        
+        if config.BROWSER_WATCHDOG["enabled"]:
+            browser_watchdog = BrowserWatchdog(browser_manager)
+            browser_watchdog.start()
+        
+        snow_client = ServiceNowClient(browser_manager) if config.SNOW_CLIENT["fetch_lists"] else None
+        
+        print("[3/5] Initializing Sound Notifier...")
+        sound_notifier = SoundNotifier(config.SOUND_FILE)
+        sound_notifier.play()
+        
+        print("[4/5] Initializing Teams Messenger...")
+        # One messenger, alert tracker and digest per team; queues and instance routing
+        # come from the queue registry and are shared by all teams
+        team_manager = timed_phase(phases, "teams", TeamManager, browser_manager, sound_notifier)
+        
+        # Resume alert state and queue scan times, so a restart neither re-alerts
+        # tickets nor repeats the first-scan queues
+        checkpoint = Checkpoint() if config.CHECKPOINT["enabled"] else None
+        resumed_cycle = checkpoint.restore(team_manager) if checkpoint else None
+        url_counter = resumed_cycle + 1 if resumed_cycle else 1
+        
+        if config.TAB_PER_QUEUE:
+            queue_urls = team_manager.steady_state_urls()
+            print(f"      Opening {len(queue_urls)} queue tabs...")
+            timed_phase(phases, "queue_tabs", browser_manager.open_queue_tabs, queue_urls)
+        
+        print("[5/5] Waiting for Inventory Data and Log Index...")
+        waited = time.time()
+        scope_detector = scope_future.result()
+        log_future.result()
+        phases["background_wait"] = time.time() - waited
+        metrics.set("bot_startup_seconds", round(phases["background_wait"], 3), phase="background_wait")
+        
+        print(f"\nStartup completed in {time.time() - startup_started:.1f} s "
+              f"({', '.join(f'{name} {seconds:.1f} s' for name, seconds in phases.items())})")
+        
+        print("\n" + "=" * 70)
+        print("Initialization Complete - Starting Monitoring Loop")
+        print(f"Teams Messaging: {'ENABLED' if config.ENABLE_TEAMS_MESSAGING else 'DISABLED'}")
+        print(f"Teams Delivery Mode: {config.TEAMS_DELIVERY_MODE}")
+        print(f"Teams Served: {', '.join(team.name for team in team_manager.teams)}")
+        print(f"Alert Coalescing: {'ENABLED' if config.COALESCE_ALERTS else 'DISABLED'}")
+        print(f"SNOW Instance 1 Monitoring: {'ENABLED' if config.ENABLE_SNOW_INSTANCE_1_MONITORING else 'DISABLED'}")
+        print(f"SNOW Instance 2 Monitoring: {'ENABLED' if config.ENABLE_SNOW_INSTANCE_2_MONITORING else 'DISABLED'}")
+        print(f"Incident Monitoring: {'ENABLED' if config.ENABLE_INCIDENT_MONITORING else 'DISABLED'}")
+        print(f"Change Monitoring: {'ENABLED' if config.ENABLE_CHANGE_MONITORING else 'DISABLED'}")
+        print(f"CTASK Monitoring: {'ENABLED' if config.ENABLE_CTASK_MONITORING else 'DISABLED'}")
+        print("=" * 70 + "\n")
+        
+        # Queues are leased from a shared store when several nodes split the work
+        if config.COORDINATION["enabled"]:
+            # First-scan-only queues are leased for the first cycle only and not part of the shares
+            queue_urls = team_manager.steady_state_urls()
+            coordinator = QueueCoordinator(SQLiteLeaseStore(config.COORDINATION["database"]), queue_urls)
+            coordinator.start()
+            print(f"Queue coordination: node {coordinator.node_id}, {len(queue_urls)} shared queues")
+        
+        # Active/standby pair: only the leader scans and sends
+        if config.HIGH_AVAILABILITY["enabled"]:
+            election = LeaderElection(SQLiteLeaseStore(config.HIGH_AVAILABILITY["database"]))
+            election.start()
+            team_manager.set_leader(election)
+        
         while True:
-            print(f"\n{'='*70}")
-            print(f"MONITORING CYCLE #{url_counter}")
-            print(f"{'='*70}\n")
+            if election and not election.is_leader():
+                resumed_cycle = run_standby(election, checkpoint, team_manager)
+                if resumed_cycle:
+                    url_counter = resumed_cycle + 1
+                log_event("ha.active", f"\n>>> Leader (fencing token {election.token}) - monitoring",
+                          token=election.token)
+            
+            log_event("cycle.start", f"\n{'='*70}\nMONITORING CYCLE #{url_counter}\n{'='*70}\n",
+                      cycle=url_counter)
+            cycle_started = time.time()
+            tracer.start_cycle(url_counter)
+            if profiler:
+                profiler.start_cycle(url_counter)
+            if coordinator:
+                coordinator.rebalance()
             
             # ========== INCIDENT MONITORING ==========
             if config.ENABLE_INCIDENT_MONITORING:
-                print(">>> Scanning for Incidents...")
-                print("-" * 70)
+                log_event("scan.start", ">>> Scanning for Incidents...\n" + "-" * 70, table="incident")
                 
-                # Determine which incident URLs to use
+                # Determine which incident queues to use
                 if url_counter == 1:
-                    incident_urls = config.INCIDENT_URLS_FIRST_SCAN
-                    print("First scan - checking today's resolved incidents and active tickets")
+                    log_event("scan.phase", "First scan - checking today's resolved incidents and active tickets")
                 else:
-                    incident_urls = config.INCIDENT_URLS_SUBSEQUENT
-                    print("Subsequent scan - checking assigned tickets")
+                    log_event("scan.phase", "Subsequent scan - checking assigned tickets")
                 
-                # Filter URLs based on instance monitoring settings
-                filtered_incident_urls = [
-                    url for url in incident_urls
-                    if (config.ENABLE_SNOW_INSTANCE_1_MONITORING and "instance1" in url) or
-                       (config.ENABLE_SNOW_INSTANCE_2_MONITORING and "instance2" in url)
-                ]
+                # Enabled instances and watched queues only, in priority order
+                incident_queues = select_queues(team_manager, coordinator, "incident", url_counter == 1)
                 
-                for idx, url in enumerate(filtered_incident_urls, 1):
-                    instance = "SNOW Instance 1" if "instance1" in url else "SNOW Instance 2"
-                    print(f"\n[Incident {idx}/{len(filtered_incident_urls)}] Monitoring {instance}...")
+                for idx, queue in enumerate(incident_queues, 1):
+                    log_event("queue.start", f"\n[Incident {idx}/{len(incident_queues)}] Monitoring {queue.instance_name} - {queue.name}...",
+                              queue=queue.name, instance=queue.instance_name)
                     monitor_incident(browser_manager, log_manager, scope_detector, 
-                                   teams_messenger, url)
+                                   team_manager.teams_for(queue.url), queue.url)
+                    queue.mark_scanned()
+                    recycle_browser_if_unhealthy(browser_manager, team_manager)
             else:
-                print(">>> Incident monitoring disabled - skipping")
+                log_event("scan.skipped", ">>> Incident monitoring disabled - skipping", table="incident")
             
             time.sleep(5)
             
             # ========== CHANGE REQUEST MONITORING ==========
             if config.ENABLE_CHANGE_MONITORING:
-                print("\n>>> Scanning for Change Requests...")
-                print("-" * 70)
+                log_event("scan.start", "\n>>> Scanning for Change Requests...\n" + "-" * 70, table="change_request")
                 
-                # Filter URLs based on instance monitoring settings
-                filtered_change_urls = [
-                    url for url in config.CHANGE_URLS
-                    if (config.ENABLE_SNOW_INSTANCE_1_MONITORING and "instance1" in url) or
-                       (config.ENABLE_SNOW_INSTANCE_2_MONITORING and "instance2" in url)
-                ]
+                # Enabled instances and watched queues only, in priority order
+                change_queues = select_queues(team_manager, coordinator, "change_request", url_counter == 1)
                 
-                for idx, url in enumerate(filtered_change_urls, 1):
-                    instance = "SNOW Instance 1" if "instance1" in url else "SNOW Instance 2"
-                    print(f"\n[Change {idx}/{len(filtered_change_urls)}] Monitoring {instance}...")
+                for idx, queue in enumerate(change_queues, 1):
+                    log_event("queue.start", f"\n[Change {idx}/{len(change_queues)}] Monitoring {queue.instance_name} - {queue.name}...",
+                              queue=queue.name, instance=queue.instance_name)
                     monitor_change(browser_manager, log_manager, scope_detector, 
-                                 teams_messenger, url)
+                                 team_manager.teams_for(queue.url), queue.url)
+                    queue.mark_scanned()
+                    recycle_browser_if_unhealthy(browser_manager, team_manager)
             else:
-                print("\n>>> Change Request monitoring disabled - skipping")
+                log_event("scan.skipped", "\n>>> Change Request monitoring disabled - skipping", table="change_request")
             
             time.sleep(5)
             
             # ========== CHANGE TASK MONITORING ==========
             if config.ENABLE_CTASK_MONITORING:
-                print("\n>>> Scanning for Change Tasks (CTASKs)...")
-                print("-" * 70)
+                log_event("scan.start", "\n>>> Scanning for Change Tasks (CTASKs)...\n" + "-" * 70, table="change_task")
                 
-                # Filter URLs based on instance monitoring settings
-                filtered_ctask_urls = [
-                    url for url in config.CTASK_URLS
-                    if (config.ENABLE_SNOW_INSTANCE_1_MONITORING and "instance1" in url) or
-                       (config.ENABLE_SNOW_INSTANCE_2_MONITORING and "instance2" in url)
-                ]
+                # Enabled instances and watched queues only, in priority order
+                ctask_queues = select_queues(team_manager, coordinator, "change_task", url_counter == 1)
                 
-                for idx, url in enumerate(filtered_ctask_urls, 1):
-                    instance = "SNOW Instance 1" if "instance1" in url else "SNOW Instance 2"
-                    print(f"\n[CTASK {idx}/{len(filtered_ctask_urls)}] Monitoring {instance}...")
+                for idx, queue in enumerate(ctask_queues, 1):
+                    log_event("queue.start", f"\n[CTASK {idx}/{len(ctask_queues)}] Monitoring {queue.instance_name} - {queue.name}...",
+                              queue=queue.name, instance=queue.instance_name)
                     monitor_change(browser_manager, log_manager, scope_detector, 
-                                 teams_messenger, url)
+                                 team_manager.teams_for(queue.url), queue.url)
+                    queue.mark_scanned()
+                    recycle_browser_if_unhealthy(browser_manager, team_manager)
             else:
-                print("\n>>> Change Task monitoring disabled - skipping")
+                log_event("scan.skipped", "\n>>> Change Task monitoring disabled - skipping", table="change_task")
+            
+            # ========== CYCLE DIGEST ==========
+            if team_manager.flush():
+                log_event("digest.flushed", "\n>>> Cycle digest handed to Teams delivery")
             
             # ========== TEAMS AUTH HANDLING ==========
-            if config.ENABLE_TEAMS_MESSAGING:
-                print("\n>>> Returning to Teams...")
-                teams_messenger.navigate_to_teams()
-                teams_messenger.handle_auth_banner()
+            browser_messenger = team_manager.browser_messenger()
+            if config.ENABLE_TEAMS_MESSAGING and browser_messenger:
+                log_event("teams.return", "\n>>> Returning to Teams...")
+                browser_messenger.navigate_to_teams()
+                browser_messenger.handle_auth_banner()
             else:
-                print("\n>>> Teams messaging disabled - skipping Teams navigation")
+                log_event("teams.skipped", "\n>>> Teams messaging disabled - skipping Teams navigation")
+            
+            cycle_seconds = time.time() - cycle_started
+            metrics.observe("bot_cycle_duration_seconds", cycle_seconds)
+            metrics.mark_success()
+            tracer.end_cycle()
+            if profiler:
+                profiler.end_cycle(url_counter)
+            if config.DRIVER_STATS["enabled"]:
+                driver_stats.log_summary()
+            if checkpoint and (not election or election.is_leader()):
+                checkpoint.save(team_manager, url_counter)
             
             # ========== SLEEP BETWEEN CYCLES ==========
-            print(f"\n{'='*70}")
-            print(f"Monitoring cycle #{url_counter} completed")
-            print(f"Waiting {config.TIMEOUTS['sleep_between_scans']} seconds before next cycle...")
-            print(f"{'='*70}\n")
+            log_event("cycle.end",
+                      f"\n{'='*70}\nMonitoring cycle #{url_counter} completed\n"
+                      f"Waiting {config.TIMEOUTS['sleep_between_scans']} seconds before next cycle...\n{'='*70}\n",
+                      cycle=url_counter, seconds=round(cycle_seconds, 3))
             
             url_counter += 1
             time.sleep(config.TIMEOUTS['sleep_between_scans'])
@@ -160,7 +349,25 @@ def main():
     
     finally:
         print("\nCleaning up...")
-        browser_manager.close_browser()
+        if checkpoint and (not election or election.is_leader()):
+            checkpoint.save(team_manager, url_counter - 1)
+        if election:
+            election.stop()
+        if coordinator:
+            coordinator.stop()
+        if browser_watchdog:
+            browser_watchdog.stop()
+        if team_manager:
+            team_manager.close()
+        if snow_client:
+            snow_client.close()
+        if browser_manager:
+            browser_manager.close_browser()
+        if browser_pool:
+            browser_pool.close()
+        if metrics_server:
+            metrics_server.shutdown()
+        stop_event_log()
         print("Bot shutdown complete")
 
 
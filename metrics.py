@@ -0,0 +1,268 @@
+"""
+Metrics for Ticket Monitoring Bot
+Prometheus-style metrics and liveness/readiness probes served by an embedded HTTP endpoint
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+import config
+
+
+# Histogram buckets in seconds (page loads and Teams sends take seconds, cycles minutes)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# name -> (type, help text)
+METRIC_DEFINITIONS = {
+    "bot_cycles_total": ("counter", "Monitoring cycles completed"),
+    "bot_cycle_duration_seconds": ("histogram", "Duration of a monitoring cycle"),
+    "bot_queue_scrape_seconds": ("histogram", "Time to read one queue (load, parse, alert)"),
+    "bot_queue_pages": ("gauge", "List pages read in the last visit of a queue"),
+    "bot_queue_tickets": ("gauge", "Tickets found in the last visit of a queue"),
+    "bot_queue_unassigned": ("gauge", "Unassigned tickets found in the last visit of a queue"),
+    "bot_scrape_errors_total": ("counter", "Queue visits that ended with an error"),
+    "bot_rows_parsed_total": ("counter", "List rows parsed into tickets"),
+    "bot_new_tickets_total": ("counter", "Unassigned tickets seen for the first time"),
+    "bot_scope_cache_requests_total": ("counter", "Scope lookups by cache result"),
+    "bot_scope_cache_hit_ratio": ("gauge", "Share of scope lookups answered from the cache"),
+    "bot_log_write_seconds": ("histogram", "Time to append one ticket to the Excel log"),
+    "bot_teams_send_seconds": ("histogram", "Time to deliver one Teams message"),
+    "bot_teams_send_failures_total": ("counter", "Teams messages that could not be delivered"),
+    "bot_notifier_seconds": ("histogram", "Time to deliver one message through a notifier sink"),
+    "bot_notifier_sends_total": ("counter", "Messages sent through a notifier sink, by result"),
+    "bot_browser_recoveries_total": ("counter", "Browser sessions replaced (crash or planned recycle)"),
+    "bot_queue_leases_held": ("gauge", "Queue leases held by this node (coordination)"),
+    "bot_pipeline_items_total": ("counter", "Items processed by a pipeline stage"),
+    "bot_pipeline_dropped_total": ("counter", "Items dropped or failed in a pipeline stage"),
+    "bot_pipeline_busy_seconds_total": ("counter", "Time a pipeline stage spent processing"),
+    "bot_pipeline_blocked_seconds_total": ("counter", "Time a pipeline stage waited on a full downstream queue"),
+    "bot_webdriver_commands_total": ("counter", "WebDriver commands sent, by calling function"),
+    "bot_webdriver_seconds_total": ("counter", "Time spent in WebDriver round trips, by calling function"),
+    "bot_last_success_timestamp_seconds": ("gauge", "Unix time of the last completed cycle"),
+    "bot_seconds_since_last_success": ("gauge", "Seconds since the last completed cycle"),
+    "bot_uptime_seconds": ("gauge", "Seconds since the bot started"),
+    "bot_startup_seconds": ("gauge", "Duration of each startup phase"),
+}
+
+
+def format_labels(labels):
+    """
+    Format a label tuple in Prometheus text syntax
+    
+    Args:
+        labels: tuple - sorted (name, value) pairs
+    
+    Returns:
+        str - e.g. {queue="Open incidents",instance="SNOW Instance 1"} or "" without labels
+    """
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metrics:
+    """Thread-safe in-process metrics store rendered in the Prometheus text format"""
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.values = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.last_heartbeat = self.started
+        self.last_success = None
+    
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+    
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = value
+    
+    def observe(self, name, value, **labels):
+        """Record one histogram observation (seconds)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of a with-block"""
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - started, **labels)
+    
+    def heartbeat(self):
+        """Record that the main loop is making progress"""
+        self.last_heartbeat = time.time()
+    
+    def mark_success(self):
+        """Record a completed monitoring cycle"""
+        self.last_success = time.time()
+        self.last_heartbeat = self.last_success
+        self.inc("bot_cycles_total")
+    
+    def is_alive(self, stall_seconds):
+        """
+        Liveness - the main loop made progress recently
+        
+        Args:
+            stall_seconds: int - allowed time without progress
+        
+        Returns:
+            bool - True if alive
+        """
+        return time.time() - self.last_heartbeat < stall_seconds
+    
+    def is_ready(self, stall_seconds):
+        """
+        Readiness - a cycle completed and the last one is recent
+        
+        Args:
+            stall_seconds: int - allowed time since the last completed cycle
+        
+        Returns:
+            bool - True if ready
+        """
+        return self.last_success is not None and time.time() - self.last_success < stall_seconds
+    
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format
+        
+        Returns:
+            str - metrics page
+        """
+        now = time.time()
+        self.set("bot_uptime_seconds", round(now - self.started, 3))
+        if self.last_success is not None:
+            self.set("bot_last_success_timestamp_seconds", round(self.last_success, 3))
+            self.set("bot_seconds_since_last_success", round(now - self.last_success, 3))
+        
+        with self.lock:
+            values = dict(self.values)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self.histograms.items()}
+        
+        lines = []
+        for name, (metric_type, help_text) in METRIC_DEFINITIONS.items():
+            samples = [(k[1], v) for k, v in values.items() if k[0] == name]
+            series = [(k[1], v) for k, v in histograms.items() if k[0] == name]
+            if not samples and not series:
+                continue
+            
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+            for labels, (counts, total, count) in series:
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {bucket_count}")
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {round(total, 6)}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared store - modules record into it, the HTTP endpoint reads from it
+metrics = Metrics()
+
+# POST path -> handler(params) returning (status, text); registered by runtime controls (profiling)
+CONTROL_HANDLERS = {}
+
+
+def register_control(path, handler):
+    """
+    Expose a runtime control as POST <path> on the metrics endpoint
+    
+    Args:
+        path: str - URL path (e.g. "/profile")
+        handler: function - called with the query parameters (dict), returns (status, text)
+    """
+    CONTROL_HANDLERS[path] = handler
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics, /healthz (liveness), /readyz (readiness) and POST runtime controls"""
+    
+    def do_GET(self):
+        stall_seconds = config.METRICS["stall_seconds"]
+        path = self.path.split("?", 1)[0]
+        
+        if path == "/metrics":
+            self.respond(200, metrics.render(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/healthz":
+            alive = metrics.is_alive(stall_seconds)
+            self.respond(200 if alive else 503, "ok\n" if alive else "stalled\n")
+        elif path == "/readyz":
+            ready = metrics.is_ready(stall_seconds)
+            self.respond(200 if ready else 503, "ready\n" if ready else "not ready\n")
+        else:
+            self.respond(404, "not found\n")
+    
+    def do_POST(self):
+        url = urlparse(self.path)
+        handler = CONTROL_HANDLERS.get(url.path)
+        if handler is None:
+            self.respond(404, "not found\n")
+            return
+        status, text = handler(dict(parse_qsl(url.query)))
+        self.respond(status, text)
+    
+    def respond(self, status, body, content_type="text/plain; charset=utf-8"):
+        """Send a plain response"""
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the bot's own console output
+        pass
+
+
+def start_metrics_server(host=None, port=None):
+    """
+    Start the metrics endpoint on a daemon thread
+    
+    Args:
+        host: str - bind address (default config.METRICS["host"])
+        port: int - port (default config.METRICS["port"])
+    
+    Returns:
+        ThreadingHTTPServer - running server (call shutdown() to stop), or None if it could not start
+    """
+    host = host or config.METRICS["host"]
+    port = port or config.METRICS["port"]
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+    
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,122 @@
+"""
+Notification Queue for Ticket Monitoring Bot
+Coalesces the alerts of a monitoring cycle into one digest and delivers it off the scraping path
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import queue
+import threading
+from utils import get_instance_name, get_ticket_type, get_greeting_message
+from queue_registry import get_registry
+
+
+class NotificationQueue:
+    """Collects unassigned tickets from every queue in a cycle and sends them as one digest"""
+    
+    def __init__(self, teams_messenger):
+        self.messenger = teams_messenger
+        self.pending = {}
+        self.outbox = queue.Queue()
+        self.worker = None
+        
+        # HTTP delivery does not touch the browser, so it can run beside scraping.
+        # UI delivery shares the WebDriver and is drained on the main thread instead.
+        if not teams_messenger.uses_browser():
+            self.worker = threading.Thread(target=self._run, name="notification-worker", daemon=True)
+            self.worker.start()
+    
+    def add(self, url, alerts, total_count):
+        """
+        Add the tickets of one queue awaiting their first alert to the cycle's digest
+        
+        Args:
+            url: str - ServiceNow queue URL (used for instance/type grouping)
+            alerts: list - TicketAlert entries from the alert tracker
+            total_count: str - total tickets in the queue
+        """
+        key = (get_instance_name(url), get_ticket_type(url))
+        section = self.pending.setdefault(key, {
+            "greeting": get_greeting_message(url),
+            "alerts": [],
+            "counts": {},
+        })
+        
+        # A ticket can be listed by more than one queue - alert it once per cycle
+        queued = {a.number for s in self.pending.values() for a in s["alerts"]}
+        for alert in alerts:
+            if alert.number not in queued:
+                section["alerts"].append(alert)
+                queued.add(alert.number)
+        
+        # Overlapping queues list the same tickets, so their totals are shown per queue
+        entry = get_registry().get(url)
+        section["counts"][entry.name if entry else url] = str(total_count)
+    
+    def flush(self):
+        """
+        Close the current cycle and hand its digest (or due reminders) to delivery
+        
+        Returns:
+            int - number of digest sections handed over
+        """
+        sections = [s for s in self.pending.values() if s["alerts"]]
+        self.pending = {}
+        for section in sections:
+            counts = section.pop("counts")
+            section["total_count"] = (next(iter(counts.values())) if len(counts) == 1 else
+                                      ", ".join(f"{count} ({name})" for name, count in counts.items()))
+        
+        # Queued tickets are not handed over again by the next cycle while delivery runs
+        self.messenger.alert_tracker.mark_sending([a for s in sections for a in s["alerts"]])
+        if self.worker:
+            self.outbox.put(sections)
+        else:
+            self.deliver(sections)
+        return len(sections)
+    
+    def deliver(self, sections):
+        """
+        Send the digest of new tickets, or a reminder for tickets that are still unassigned
+        
+        Args:
+            sections: list - digest sections collected in one cycle
+        """
+        if sections:
+            try:
+                # Records the outcome itself, also when delivery finishes late
+                self.messenger.alert_new_tickets(sections)
+            except Exception:
+                self.messenger.alert_tracker.mark_failed([a for s in sections for a in s["alerts"]])
+                raise
+            return
+        
+        due = self.messenger.alert_tracker.due_reminders()
+        if due:
+            self.messenger.send_reminder(due)
+    
+    def _run(self):
+        """Worker loop - deliver queued digests until closed"""
+        while True:
+            sections = self.outbox.get()
+            try:
+                if sections is None:
+                    return
+                self.deliver(sections)
+            except Exception as e:
+                print(f"Error delivering notification: {e}")
+            finally:
+                self.outbox.task_done()
+    
+    def close(self, timeout=30):
+        """
+        Deliver anything still pending and stop the worker
+        
+        Args:
+            timeout: int - seconds to wait for the worker to finish
+        """
+        self.flush()
+        if self.worker:
+            self.outbox.put(None)
+            self.worker.join(timeout)
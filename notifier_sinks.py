@@ -0,0 +1,339 @@
+"""
+Notifier Sinks for Ticket Monitoring Bot
+Sends every alert to all configured sinks (Teams, email, webhook, sound) at once, each with its own timeout
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import abc
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from email.message import EmailMessage
+import config
+from teams_sender import HttpSender, format_alert_markdown, format_digest_html
+from metrics import metrics
+
+
+# Sink type name -> sink class (see register_sink)
+SINK_TYPES = {}
+
+
+def register_sink(kind):
+    """
+    Class decorator that makes a sink available as a NOTIFIER_SINKS "type"
+    
+    Args:
+        kind: str - type name used in the configuration
+    
+    Returns:
+        function - decorator
+    """
+    def decorator(cls):
+        cls.kind = kind
+        SINK_TYPES[kind] = cls
+        return cls
+    return decorator
+
+
+def format_digest_text(sections):
+    """
+    Build the plain text of a digest (email body, webhook text)
+    
+    Args:
+        sections: list - dicts with greeting, important, normal and total_count keys
+    
+    Returns:
+        str - markdown text
+    """
+    return "\n\n".join(format_alert_markdown(s["greeting"], s["important"], s["normal"], s["total_count"])
+                       for s in sections)
+
+
+class NotifierSink(abc.ABC):
+    """Interface of a notification destination"""
+    
+    kind = None
+    # True for sinks that must run on the dispatching thread (the WebDriver thread)
+    caller_thread = False
+    
+    def __init__(self, settings, messenger):
+        """
+        Initialize NotifierSink
+        
+        Args:
+            settings: dict - one NOTIFIER_SINKS entry
+            messenger: TeamsMessenger - messenger of the team this sink belongs to
+        """
+        self.settings = settings
+        self.name = settings.get("name", self.kind)
+        self.timeout = settings.get("timeout", config.NOTIFIER_TIMEOUT)
+        # Primary sinks decide whether a ticket counts as alerted (and is not retried)
+        self.primary = settings.get("primary", False)
+    
+    @abc.abstractmethod
+    def send_digest(self, sections):
+        """
+        Send the alert sections of a cycle
+        
+        Args:
+            sections: list - dicts with greeting, important, normal and total_count keys
+        
+        Returns:
+            bool - True if delivered, False otherwise
+        """
+    
+    @abc.abstractmethod
+    def send_text(self, message):
+        """
+        Send a plain text message (reminders)
+        
+        Returns:
+            bool - True if delivered, False otherwise
+        """
+    
+    def close(self):
+        """Release any held resources"""
+        pass
+
+
+@register_sink("teams")
+class TeamsSink(NotifierSink):
+    """The team's Teams chat - through the web app on the caller's thread, or its HTTP sender"""
+    
+    def __init__(self, settings, messenger):
+        super().__init__(settings, messenger)
+        self.messenger = messenger
+        self.caller_thread = messenger.uses_browser()
+        self.primary = settings.get("primary", True)
+    
+    def send_digest(self, sections):
+        return self.messenger.deliver_digest(sections, self.timeout)
+    
+    def send_text(self, message):
+        return self.messenger.deliver_text(message, self.timeout)
+
+
+@register_sink("sound")
+class SoundSink(NotifierSink):
+    """Local notification sound"""
+    
+    def __init__(self, settings, messenger):
+        super().__init__(settings, messenger)
+        self.sound_notifier = messenger.sound_notifier
+    
+    def send_digest(self, sections):
+        self.sound_notifier.play()
+        return True
+    
+    def send_text(self, message):
+        self.sound_notifier.play()
+        return True
+
+
+@register_sink("email")
+class EmailSink(NotifierSink):
+    """Email through an SMTP server"""
+    
+    def send(self, subject, text, html_body=None):
+        """
+        Send one email to the configured recipients
+        
+        Args:
+            subject: str - subject line
+            text: str - plain text body
+            html_body: str - optional HTML alternative
+        
+        Returns:
+            bool - True if the server accepted the message, False otherwise
+        """
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.settings["sender"]
+        message["To"] = ", ".join(self.settings["recipients"])
+        message.set_content(text)
+        if html_body:
+            message.add_alternative(html_body, subtype="html")
+        
+        try:
+            with smtplib.SMTP(self.settings["host"], self.settings["port"], timeout=self.timeout) as smtp:
+                if self.settings.get("starttls"):
+                    smtp.starttls()
+                if self.settings.get("username"):
+                    smtp.login(self.settings["username"], self.settings["password"])
+                smtp.send_message(message)
+            return True
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"Email sink {self.name} failed: {e}")
+            return False
+    
+    def send_digest(self, sections):
+        return self.send(sections[0]["greeting"], format_digest_text(sections), format_digest_html(sections))
+    
+    def send_text(self, message):
+        return self.send(message, message)
+
+
+class JsonWebhookSender(HttpSender):
+    """Posts alerts as plain JSON events ({"event", "text", "sections"})"""
+    
+    def send_digest(self, sections):
+        return self.post({"event": "ticket_alert", "text": format_digest_text(sections), "sections": sections})
+    
+    def send_text(self, message):
+        return self.post({"event": "reminder", "text": message})
+
+
+@register_sink("webhook")
+class WebhookSink(NotifierSink):
+    """Generic JSON webhook (chat tools, incident tooling, automation)"""
+    
+    def __init__(self, settings, messenger):
+        super().__init__(settings, messenger)
+        http_settings = dict(config.HTTP_SENDER_SETTINGS, timeout=self.timeout,
+                             max_retries=settings.get("max_retries", 1))
+        self.sender = JsonWebhookSender(settings["url"], http_settings)
+    
+    def send_digest(self, sections):
+        return self.sender.send_digest(sections)
+    
+    def send_text(self, message):
+        return self.sender.send_text(message)
+    
+    def close(self):
+        self.sender.close()
+
+
+class NotifierDispatcher:
+    """
+    Sends each message to every sink concurrently
+    
+    Every background sink has its own worker thread, so a slow or hanging sink
+    only delays its own later messages. Sinks that need the WebDriver run on
+    the caller's thread and bound their own waits by their timeout. The caller
+    waits only for primary sinks, and for each one no longer than its timeout
+    from submission. A primary sink still sending after that is not counted as
+    failed - its outcome is reported when it finishes, so the message is not
+    sent twice.
+    """
+    
+    def __init__(self, sinks):
+        """
+        Initialize NotifierDispatcher
+        
+        Args:
+            sinks: list - NotifierSink objects
+        """
+        self.sinks = sinks
+        self.executors = {sink: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{sink.name}")
+                          for sink in sinks if not sink.caller_thread}
+    
+    def dispatch(self, method, *args, on_late=None):
+        """
+        Send one message to all sinks
+        
+        Args:
+            method: str - "send_digest" or "send_text"
+            *args: message arguments
+            on_late: function - called with the outcome (bool) once primary sinks that
+                     passed their timeout finish; without it they count as failed
+        
+        Returns:
+            bool - True if every primary sink delivered (True when there is none),
+                   None if the others delivered and a late primary sink reports to on_late
+        """
+        futures = {sink: (executor.submit(self.run, sink, method, args), time.time())
+                   for sink, executor in self.executors.items()}
+        
+        results = [self.run(sink, method, args) for sink in self.sinks if sink.caller_thread and sink.primary]
+        for sink in self.sinks:
+            if sink.caller_thread and not sink.primary:
+                self.run(sink, method, args)
+        
+        late = []
+        for sink, (future, submitted) in futures.items():
+            if not sink.primary:
+                continue
+            try:
+                results.append(future.result(timeout=max(sink.timeout - (time.time() - submitted), 0)))
+            except FutureTimeout:
+                print(f"Notifier sink {sink.name} did not finish within {sink.timeout} s")
+                late.append(future)
+        
+        if not all(results) or (late and on_late is None):
+            return False
+        if not late:
+            return True
+        self.report_late(late, on_late)
+        return None
+    
+    def report_late(self, futures, callback):
+        """
+        Call back with the combined outcome once every late send has finished
+        
+        Args:
+            futures: list - futures of primary sinks that passed their timeout
+            callback: function - receives True if all of them delivered
+        """
+        lock = threading.Lock()
+        remaining = len(futures)
+        
+        def finished(_):
+            nonlocal remaining
+            with lock:
+                remaining -= 1
+                if remaining:
+                    return
+            callback(all(future.result() for future in futures))
+        
+        for future in futures:
+            future.add_done_callback(finished)
+    
+    def run(self, sink, method, args):
+        """
+        Send through one sink and record the outcome
+        
+        Returns:
+            bool - True if delivered
+        """
+        started = time.time()
+        try:
+            delivered = bool(getattr(sink, method)(*args))
+        except Exception as e:
+            print(f"Notifier sink {sink.name} failed: {e}")
+            delivered = False
+        metrics.observe("bot_notifier_seconds", time.time() - started, sink=sink.name)
+        metrics.inc("bot_notifier_sends_total", sink=sink.name, result="delivered" if delivered else "failed")
+        return delivered
+    
+    def close(self):
+        """Finish queued messages and close the sinks"""
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+        for sink in self.sinks:
+            sink.close()
+
+
+def create_dispatcher(messenger, team=None):
+    """
+    Create the sinks of a team and their dispatcher
+    
+    Args:
+        messenger: TeamsMessenger - the team's messenger (Teams delivery and sound)
+        team: dict - team definition from TEAM_CONFIGS whose "sinks" override NOTIFIER_SINKS
+    
+    Returns:
+        NotifierDispatcher - dispatcher over the enabled sinks
+    """
+    sinks = []
+    for settings in (team or {}).get("sinks", config.NOTIFIER_SINKS):
+        if not settings.get("enabled", True):
+            continue
+        sink_class = SINK_TYPES.get(settings["type"])
+        if sink_class is None:
+            print(f"Unknown notifier sink type '{settings['type']}' - ignored")
+            continue
+        sinks.append(sink_class(settings, messenger))
+    return NotifierDispatcher(sinks)
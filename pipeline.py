@@ -0,0 +1,201 @@
+"""
+Pipeline for Ticket Monitoring Bot
+Streams items through processing stages connected by bounded queues, one or more threads per stage
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import logging
+import queue
+import threading
+import time
+import config
+from metrics import metrics
+from event_log import log_event
+
+
+# Sent once per worker thread to shut a stage down
+_DONE = object()
+
+
+class Stage:
+    """One processing step; its function returns the item for the next stage, or None to drop it"""
+    
+    def __init__(self, name, func, workers=1):
+        """
+        Initialize Stage
+        
+        Args:
+            name: str - stage name (metrics label)
+            func: function - takes an item, returns the processed item or None
+            workers: int - threads running this stage (1 keeps the stage single-threaded)
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(int(workers), 1)
+        self.inbox = None
+        self.threads = []
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+    
+    def handle(self, item):
+        """
+        Run the stage function on one item and count it
+        
+        Args:
+            item: any - item from the previous stage
+        
+        Returns:
+            any - processed item, or None if dropped or failed
+        """
+        started = time.perf_counter()
+        try:
+            result = self.func(item)
+        except Exception as e:
+            log_event("error", f"Error in {self.name} stage: {e}", logging.WARNING, step=self.name)
+            result = None
+        with self.lock:
+            self.processed += 1
+            self.busy += time.perf_counter() - started
+            if result is None:
+                self.dropped += 1
+        return result
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues
+    
+    The caller is the source: it put()s items on its own thread (the WebDriver
+    thread), and a full queue blocks it until the stages catch up. close()
+    drains the stages and returns the results in the order they were put.
+    """
+    
+    def __init__(self, name, stages, settings=None):
+        """
+        Initialize Pipeline
+        
+        Args:
+            name: str - pipeline name (thread names and metrics label)
+            stages: list - Stage objects in processing order
+            settings: dict - pipeline settings (default config.PIPELINE)
+        """
+        self.name = name
+        self.stages = stages
+        self.settings = settings or config.PIPELINE
+        self.threaded = self.settings["enabled"]
+        self.results = []
+        self.lock = threading.Lock()
+        self.count = 0
+        self.blocked = 0.0
+    
+    def start(self):
+        """
+        Start the stage threads (no threads when PIPELINE is disabled - stages run inline)
+        
+        Returns:
+            Pipeline - self
+        """
+        if not self.threaded:
+            return self
+        for stage in self.stages:
+            stage.inbox = queue.Queue(self.settings["queue_size"])
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), daemon=True,
+                                          name=f"{self.name}-{stage.name}-{worker + 1}")
+                stage.threads.append(thread)
+                thread.start()
+        return self
+    
+    def put(self, item):
+        """
+        Feed one item from the source
+        
+        Args:
+            item: any - item for the first stage
+        """
+        entry = (self.count, item)
+        self.count += 1
+        if self.threaded:
+            self.blocked += self.forward(self.stages[0], entry)
+            return
+        for stage in self.stages:
+            item = stage.handle(item)
+            if item is None:
+                return
+        self.results.append((entry[0], item))
+    
+    def forward(self, stage, entry):
+        """
+        Put an entry on a stage's queue, waiting while the queue is full
+        
+        Returns:
+            float - seconds spent waiting (backpressure)
+        """
+        started = time.perf_counter()
+        stage.inbox.put(entry)
+        return time.perf_counter() - started
+    
+    def _work(self, index):
+        """Worker loop of one stage (runs on a stage thread)"""
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            entry = stage.inbox.get()
+            if entry is _DONE:
+                return
+            sequence, item = entry
+            result = stage.handle(item)
+            if result is None:
+                continue
+            if downstream is None:
+                with self.lock:
+                    self.results.append((sequence, result))
+                continue
+            waited = self.forward(downstream, (sequence, result))
+            with stage.lock:
+                stage.blocked += waited
+    
+    def close(self):
+        """
+        Wait until every stage has processed everything, stop the threads and record the counters
+        
+        Returns:
+            list - results of the last stage in source order
+        """
+        if self.threaded:
+            # Stages finish in order, so a stage is only told to stop once its input is complete
+            for stage in self.stages:
+                for _ in stage.threads:
+                    stage.inbox.put(_DONE)
+                for thread in stage.threads:
+                    thread.join()
+                stage.threads = []
+        self.record_metrics()
+        return [item for _, item in sorted(self.results, key=lambda entry: entry[0])]
+    
+    def record_metrics(self):
+        """Add the stage counters to the metrics"""
+        metrics.inc("bot_pipeline_blocked_seconds_total", self.blocked, pipeline=self.name, stage="source")
+        for stage in self.stages:
+            labels = {"pipeline": self.name, "stage": stage.name}
+            metrics.inc("bot_pipeline_items_total", stage.processed, **labels)
+            metrics.inc("bot_pipeline_dropped_total", stage.dropped, **labels)
+            metrics.inc("bot_pipeline_busy_seconds_total", stage.busy, **labels)
+            metrics.inc("bot_pipeline_blocked_seconds_total", stage.blocked, **labels)
+    
+    def stats(self):
+        """
+        Get the per-stage counters
+        
+        Returns:
+            dict - stage name -> processed, dropped, busy and blocked seconds
+        """
+        return {stage.name: {"processed": stage.processed, "dropped": stage.dropped,
+                             "busy": round(stage.busy, 3), "blocked": round(stage.blocked, 3)}
+                for stage in self.stages}
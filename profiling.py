@@ -0,0 +1,294 @@
+"""
+Profiling for Ticket Monitoring Bot
+On-demand cProfile / stack sampling and tracemalloc diffs for the next N cycles of a running bot
+
+Profiling is requested without a restart by:
+    - creating the control file (PROFILING["control_file"]), optionally holding JSON
+      such as {"cycles": 3, "mode": "sample", "memory": true}
+    - sending SIGUSR1 (Linux/macOS) or pressing Ctrl+Break in the bot's console (Windows)
+    - POST http://127.0.0.1:9464/profile?cycles=3&mode=sample&memory=1 on the metrics endpoint
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+import config
+from metrics import register_control
+
+
+class StackSampler:
+    """Samples the main thread's stack at a fixed interval (low overhead, safe on a live bot)"""
+    
+    def __init__(self, thread_id, interval):
+        """
+        Initialize StackSampler
+        
+        Args:
+            thread_id: int - ident of the thread to sample
+            interval: float - seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Start sampling on a background thread"""
+        self.thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Sampling loop (runs on the sampler thread)"""
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+                stack.append(f"{module}.{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+    
+    def stop(self):
+        """Stop sampling"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(5)
+    
+    def report(self, top):
+        """
+        Summarise the samples
+        
+        Args:
+            top: int - functions to list
+        
+        Returns:
+            str - top functions by own (leaf) and inclusive samples
+        """
+        total = sum(self.stacks.values())
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            functions = stack.split(";")
+            own[functions[-1]] += count
+            for function in set(functions):
+                inclusive[function] += count
+        
+        lines = [f"{total} samples every {self.interval * 1000:.0f} ms", "", "Own samples:"]
+        for function, count in own.most_common(top):
+            lines.append(f"  {count / total * 100:6.1f}%  {count:>7}  {function}")
+        lines += ["", "Inclusive samples:"]
+        for function, count in inclusive.most_common(top):
+            lines.append(f"  {count / total * 100:6.1f}%  {count:>7}  {function}")
+        return "\n".join(lines) + "\n"
+    
+    def collapsed(self):
+        """
+        Get the samples in collapsed-stack format (flamegraph.pl, speedscope)
+        
+        Returns:
+            str - one "frame;frame;frame count" line per distinct stack
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Runs the requested profiler around whole monitoring cycles and writes the reports"""
+    
+    def __init__(self, settings=None):
+        """
+        Initialize Profiler
+        
+        Args:
+            settings: dict - profiling settings (default config.PROFILING)
+        """
+        self.settings = settings or config.PROFILING
+        self.directory = self.settings["directory"]
+        self.lock = threading.Lock()
+        self.pending = None
+        self.signalled = False
+        self.active = None
+        self.remaining = 0
+        self.profile = None
+        self.sampler = None
+        self.snapshot = None
+    
+    def install(self):
+        """Register the signal handler and the /profile control on the metrics endpoint"""
+        signum = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+        if signum is not None:
+            try:
+                signal.signal(signum, self.handle_signal)
+            except ValueError:  # not on the main thread
+                pass
+        register_control("/profile", self.handle_control)
+    
+    def handle_signal(self, signum, frame):
+        """Request profiling with the default settings (no locking - runs inside the main thread)"""
+        self.signalled = True
+    
+    def request(self, cycles=None, mode=None, memory=None):
+        """
+        Request profiling of the next cycles (safe from other threads)
+        
+        Args:
+            cycles: int - cycles to profile (default settings cycles)
+            mode: str - "cprofile" (deterministic) or "sample" (stack sampling)
+            memory: bool - also diff tracemalloc snapshots between cycles
+        
+        Returns:
+            dict - the accepted request
+        """
+        request = {
+            "cycles": max(int(cycles or self.settings["cycles"]), 1),
+            "mode": mode or self.settings["mode"],
+            "memory": self.settings["memory"] if memory is None else bool(memory),
+        }
+        if request["mode"] not in ("cprofile", "sample"):
+            raise ValueError(f"unknown profiling mode {request['mode']}")
+        with self.lock:
+            self.pending = request
+        return request
+    
+    def handle_control(self, params):
+        """
+        Handle POST /profile on the metrics endpoint
+        
+        Args:
+            params: dict - query parameters (cycles, mode, memory)
+        
+        Returns:
+            tuple - (HTTP status, response text)
+        """
+        try:
+            memory = params.get("memory")
+            request = self.request(params.get("cycles"), params.get("mode"),
+                                   None if memory is None else memory in ("1", "true", "yes"))
+        except ValueError as e:
+            return 400, f"{e}\n"
+        return 202, f"profiling requested: {json.dumps(request)}\n"
+    
+    def check_control_file(self):
+        """Turn an existing control file into a request and remove it"""
+        path = self.settings["control_file"]
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read().strip()
+            os.remove(path)
+            options = json.loads(content) if content else {}
+            self.request(options.get("cycles"), options.get("mode"), options.get("memory"))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ignoring profiling control file {path}: {e}")
+    
+    def start_cycle(self, number):
+        """
+        Start profiling this cycle if requested (call at the start of a cycle, main thread)
+        
+        Args:
+            number: int - cycle number
+        """
+        if not self.active:
+            self.check_control_file()
+            if self.signalled:
+                self.signalled = False
+                self.request()
+            with self.lock:
+                request, self.pending = self.pending, None
+            if not request:
+                return
+            self.active = request
+            self.remaining = request["cycles"]
+            os.makedirs(self.directory, exist_ok=True)
+            print(f"Profiling {request['cycles']} cycle(s) ({request['mode']}"
+                  f"{', memory' if request['memory'] else ''}) - reports in {self.directory}")
+            if request["memory"]:
+                tracemalloc.start(self.settings["tracemalloc_frames"])
+                self.snapshot = tracemalloc.take_snapshot()
+        
+        if self.active["mode"] == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident(), self.settings["sample_interval"])
+            self.sampler.start()
+    
+    def end_cycle(self, number):
+        """
+        Write the reports of a profiled cycle (call at the end of the cycle, main thread)
+        
+        Args:
+            number: int - cycle number
+        """
+        if not self.active:
+            return
+        
+        prefix = os.path.join(self.directory, f"cycle_{number:06d}_{time.strftime('%Y%m%d_%H%M%S')}")
+        top = self.settings["top"]
+        try:
+            if self.profile:
+                self.profile.disable()
+                self.profile.dump_stats(f"{prefix}.prof")
+                report = io.StringIO()
+                pstats.Stats(self.profile, stream=report).sort_stats("cumulative").print_stats(top)
+                self.write(f"{prefix}_cprofile.txt", report.getvalue())
+            if self.sampler:
+                self.sampler.stop()
+                self.write(f"{prefix}_samples.txt", self.sampler.report(top))
+                self.write(f"{prefix}.collapsed", self.sampler.collapsed())
+            if self.snapshot:
+                snapshot = tracemalloc.take_snapshot()
+                self.write(f"{prefix}_memory.txt", self.memory_report(snapshot, top))
+                self.snapshot = snapshot
+        finally:
+            self.profile = None
+            self.sampler = None
+        print(f"Profile of cycle #{number} written to {prefix}*")
+        
+        self.remaining -= 1
+        if self.remaining <= 0:
+            if self.snapshot:
+                tracemalloc.stop()
+                self.snapshot = None
+            self.active = None
+            print("Profiling finished")
+    
+    def memory_report(self, snapshot, top):
+        """
+        Compare a tracemalloc snapshot with the previous cycle's
+        
+        Args:
+            snapshot: Snapshot - snapshot at the end of this cycle
+            top: int - allocation sites to list
+        
+        Returns:
+            str - current traced memory and the top growth by line
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced memory: {current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)",
+                 "", "Growth since previous snapshot:"]
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = snapshot.filter_traces(ignore).compare_to(self.snapshot.filter_traces(ignore), "lineno")
+        lines += [f"  {stat}" for stat in stats[:top]]
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path, text):
+        """Write one report file"""
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            print(f"Error writing profile report {path}: {e}")
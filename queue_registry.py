@@ -0,0 +1,240 @@
+"""
+Queue Registry for Ticket Monitoring Bot
+Builds the monitored ServiceNow queues from config.QUEUES once, with instance routing precomputed
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import hashlib
+import time
+from urllib.parse import quote, urlparse
+import config
+
+
+# Polaris URL that shows a classic list inside its iframe
+POLARIS_LIST_URL = "https://{host}/now/nav/ui/classic/params/target/{target}"
+
+
+def build_query(groups, conditions):
+    """
+    Build an encoded query from assignment groups (ORed) and conditions (ANDed)
+    
+    Args:
+        groups: list - assignment group sys_ids
+        conditions: list - encoded-query conditions (e.g. "state!=7")
+    
+    Returns:
+        str - encoded query (sysparm_query)
+    """
+    parts = []
+    if groups:
+        parts.append("^OR".join(f"assignment_group={group}" for group in groups))
+    parts.extend(conditions)
+    return "^".join(parts)
+
+
+def build_list_url(host, table, query):
+    """
+    Build the Polaris URL of a classic list view
+    
+    Args:
+        host: str - instance host name
+        table: str - table name
+        query: str - encoded query
+    
+    Returns:
+        str - list URL
+    """
+    target = f"{table}_list.do?sysparm_query={quote(query, safe='!():@')}&sysparm_first_row=1&sysparm_view="
+    return POLARIS_LIST_URL.format(host=host, target=quote(target, safe="!()"))
+
+
+def fingerprint_tickets(tickets):
+    """
+    Fingerprint the contents of a queue, independent of row order
+    
+    Args:
+        tickets: iterable - dicts with number, state, priority, assignment_group and assigned_to keys
+    
+    Returns:
+        str - short hex digest, equal for two scans that saw the same tickets
+    """
+    rows = sorted(f"{t['number']}|{t['state']}|{t['priority']}|{t['assignment_group']}|{t['assigned_to']}"
+                  for t in tickets)
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()[:16]
+
+
+class QueueEntry:
+    """One queue on one instance, with everything the monitors need precomputed"""
+    
+    def __init__(self, name, instance_key, table, query, columns, phase="always", priority=1, interval=0):
+        instance = config.SNOW_INSTANCES[instance_key]
+        table_config = config.TICKET_TABLES[table]
+        
+        self.name = name
+        self.names = {name}
+        self.instance_key = instance_key
+        self.instance_name = instance["name"]
+        self.host = instance["host"]
+        self.table = table
+        self.query = query
+        self.columns = columns or table_config["columns"]
+        self.phase = phase
+        self.priority = priority
+        self.interval = interval
+        self.enabled = instance["enabled"] and table_config["enabled"]
+        self.url = build_list_url(self.host, table, query)
+        
+        template_key = f"{table_config['template']}_{instance_key}"
+        self.greeting = config.MESSAGE_TEMPLATES.get(
+            template_key, f"Hi Team, We Have Unassigned Tickets in {self.instance_name} Queue")
+        self.last_scan = None
+        self.fingerprint = None
+        self.ticket_count = None
+    
+    def is_due(self, now=None):
+        """
+        Check if the queue's scan interval has passed
+        
+        Args:
+            now: float - current time (default time.time())
+        
+        Returns:
+            bool - True if the queue should be scanned
+        """
+        now = now if now is not None else time.time()
+        return self.last_scan is None or now - self.last_scan >= self.interval
+    
+    def mark_scanned(self, now=None):
+        """Record a completed scan"""
+        self.last_scan = now if now is not None else time.time()
+    
+    def record_contents(self, fingerprint, ticket_count):
+        """
+        Record what a scan found (kept in the checkpoint)
+        
+        Args:
+            fingerprint: str - fingerprint_tickets() of the scanned tickets
+            ticket_count: int - tickets in the queue
+        
+        Returns:
+            bool - True if the queue changed since the previous scan
+        """
+        changed = fingerprint != self.fingerprint
+        self.fingerprint = fingerprint
+        self.ticket_count = ticket_count
+        return changed
+
+
+class QueueRegistry:
+    """All monitored queues, indexed by URL"""
+    
+    def __init__(self, queues=None):
+        """
+        Initialize QueueRegistry
+        
+        Args:
+            queues: list - queue definitions (default config.QUEUES)
+        """
+        self.entries = []
+        self.by_url = {}
+        for queue in (queues if queues is not None else config.QUEUES):
+            groups = [config.ASSIGNMENT_GROUPS.get(g, g) for g in queue.get("groups", [])]
+            query = build_query(groups, queue.get("conditions", []))
+            for instance_key in queue["instances"]:
+                entry = QueueEntry(
+                    queue["name"], instance_key, queue["table"], query, queue.get("columns"),
+                    queue.get("phase", "always"), queue.get("priority", 1), queue.get("interval", 0))
+                
+                # The same query defined twice (e.g. by two teams) is scraped once
+                existing = self.by_url.get(entry.url)
+                if existing:
+                    existing.names.add(entry.name)
+                    continue
+                self.entries.append(entry)
+                self.by_url[entry.url] = entry
+        
+        self.by_host = {instance["host"]: key for key, instance in config.SNOW_INSTANCES.items()}
+    
+    def get(self, url):
+        """
+        Get the registry entry of a URL
+        
+        Args:
+            url: str - queue URL
+        
+        Returns:
+            QueueEntry - entry or None if the URL is not a registered queue
+        """
+        return self.by_url.get(url)
+    
+    def get_instance_key(self, url):
+        """
+        Get the SNOW_INSTANCES key of any URL on a configured instance
+        
+        Args:
+            url: str - ServiceNow URL
+        
+        Returns:
+            str - instance key or None if the host is not configured
+        """
+        entry = self.by_url.get(url)
+        if entry:
+            return entry.instance_key
+        return self.by_host.get(urlparse(url).netloc)
+    
+    def select(self, table, first_scan=False, now=None):
+        """
+        Get the enabled queues of a table that are due in this cycle, in scan order
+        
+        Args:
+            table: str - table name
+            first_scan: bool - True in the first monitoring cycle
+            now: float - current time (default time.time())
+        
+        Returns:
+            list - QueueEntry objects sorted by priority
+        """
+        phases = ("always", "first_scan" if first_scan else "subsequent")
+        selected = [e for e in self.entries
+                    if e.table == table and e.enabled and e.phase in phases and e.is_due(now)]
+        return sorted(selected, key=lambda e: e.priority)
+    
+    def steady_state_urls(self):
+        """
+        Get the URLs of enabled queues scanned after the first cycle
+        
+        Returns:
+            list - queue URLs
+        """
+        return [e.url for e in self.entries if e.enabled and e.phase != "first_scan"]
+    
+    def instance_hosts(self):
+        """
+        Get the hosts of instances that have enabled queues
+        
+        Returns:
+            list - host names in configuration order
+        """
+        hosts = []
+        for entry in self.entries:
+            if entry.enabled and entry.host not in hosts:
+                hosts.append(entry.host)
+        return hosts
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    Get the queue registry, building it on first use
+    
+    Returns:
+        QueueRegistry - shared registry
+    """
+    global _registry
+    if _registry is None:
+        _registry = QueueRegistry()
+    return _registry
@@ -0,0 +1,152 @@
+"""
+Resource Blocking for Ticket Monitoring Bot
+Blocks non-essential requests per target (ServiceNow / Teams) through Chrome DevTools Protocol
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import config
+
+
+# URL patterns used to block a resource type (Network.setBlockedURLs matches URLs only);
+# the trailing * keeps matching when a cache-busting query string follows the extension
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.svg*", "*.ico*", "*.webp*", "*.bmp*"],
+    "Font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Media": ["*.mp3*", "*.mp4*", "*.wav*", "*.webm*", "*.ogg*"],
+}
+
+# Typical transfer size per resource type, used for the bytes-saved estimate
+# while no request of that type has loaded (every one of them was blocked)
+RESOURCE_TYPE_SIZES = {
+    "Image": 8 * 1024,
+    "Font": 40 * 1024,
+    "Media": 200 * 1024,
+}
+
+
+def build_block_patterns(profile):
+    """
+    Expand a blocking profile into CDP URL patterns
+    
+    Args:
+        profile: dict - profile with resource_types and url_patterns keys
+    
+    Returns:
+        list - URL patterns for Network.setBlockedURLs
+    """
+    patterns = []
+    for resource_type in profile.get("resource_types", []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    patterns.extend(profile.get("url_patterns", []))
+    return patterns
+
+
+class ResourceBlocker:
+    """Applies per-target blocking profiles and reports requests and bytes saved"""
+    
+    def __init__(self, profiles=None):
+        """
+        Initialize ResourceBlocker
+        
+        Args:
+            profiles: dict - target name -> blocking profile (default config.RESOURCE_BLOCKING["profiles"])
+        """
+        self.profiles = profiles or config.RESOURCE_BLOCKING["profiles"]
+        self.applied = {}
+        self.request_types = {}
+        self.type_sizes = {}
+        self.blocked = {}
+        self.bytes_loaded = 0
+        self.total_blocked = 0
+        self.total_bytes_saved = 0
+    
+    def apply(self, driver, target):
+        """
+        Apply the blocking profile of a target to the current tab (once per tab)
+        
+        Args:
+            driver: WebDriver - Selenium WebDriver instance
+            target: str - profile name ("servicenow" or "teams")
+        """
+        if target not in self.profiles:
+            return
+        try:
+            handle = driver.current_window_handle
+            if self.applied.get(handle) == target:
+                return
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs",
+                                   {"urls": build_block_patterns(self.profiles[target])})
+            self.applied[handle] = target
+        except Exception as e:
+            print(f"Error applying resource blocking for {target}: {e}")
+    
+    def reset(self):
+        """Forget applied tabs (after the browser session was replaced)"""
+        self.applied = {}
+        self.request_types = {}
+    
+    def handle_events(self, events):
+        """
+        Account blocked and loaded requests from performance log events
+        
+        Args:
+            events: list - CDP events (dicts with method and params keys)
+        """
+        for event in events:
+            method = event.get("method")
+            params = event.get("params", {})
+            
+            if method == "Network.requestWillBeSent":
+                self.request_types[params.get("requestId")] = params.get("type", "Other")
+            
+            elif method == "Network.loadingFailed":
+                resource_type = self.request_types.pop(params.get("requestId"), "Other")
+                if params.get("blockedReason"):
+                    resource_type = params.get("type") or resource_type
+                    self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+            
+            elif method == "Network.loadingFinished":
+                resource_type = self.request_types.pop(params.get("requestId"), "Other")
+                size = params.get("encodedDataLength", 0)
+                self.bytes_loaded += size
+                count, total = self.type_sizes.get(resource_type, (0, 0))
+                self.type_sizes[resource_type] = (count + 1, total + size)
+    
+    def report(self):
+        """
+        Print and reset the savings since the last report
+        
+        Bytes saved are estimated from the average size of loaded requests of the
+        same type, since blocked requests never reach the network. Types with no
+        loaded request use RESOURCE_TYPE_SIZES; other types count as 0, so the
+        estimate is a lower bound.
+        
+        Returns:
+            tuple - (requests_blocked, estimated_bytes_saved)
+        """
+        requests_blocked = sum(self.blocked.values())
+        bytes_saved = 0
+        for resource_type, count in self.blocked.items():
+            loaded, total = self.type_sizes.get(resource_type, (0, 0))
+            if loaded:
+                bytes_saved += count * total // loaded
+            else:
+                bytes_saved += count * RESOURCE_TYPE_SIZES.get(resource_type, 0)
+        
+        if requests_blocked:
+            by_type = ", ".join(f"{t} {c}" for t, c in sorted(self.blocked.items()))
+            print(f"Resource blocking: {requests_blocked} requests blocked ({by_type}), "
+                  f">= {bytes_saved / 1024:.0f} KB saved (estimate), "
+                  f"{self.bytes_loaded / 1024:.0f} KB transferred")
+        
+        self.total_blocked += requests_blocked
+        self.total_bytes_saved += bytes_saved
+        self.blocked = {}
+        self.bytes_loaded = 0
+        if len(self.request_types) > 5000:
+            # Requests that never finished (cached, cancelled) - do not keep them forever
+            self.request_types = {}
+        return requests_blocked, bytes_saved
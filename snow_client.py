@@ -0,0 +1,202 @@
+"""
+ServiceNow Client for Ticket Monitoring Bot
+Pooled HTTP client that reuses the browser's ServiceNow login for data fetches without rendering
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import re
+from urllib.parse import urlparse, parse_qs
+import requests
+from requests.adapters import HTTPAdapter
+import config
+from browser_manager import get_list_target
+from list_capture import decode_list_json
+
+
+# Session token embedded in ServiceNow pages (sent back as X-UserToken)
+G_CK_PATTERN = re.compile(r"g_ck\s*=\s*['\"]([^'\"]+)['\"]")
+
+
+class ServiceNowClient:
+    """Shared HTTP session per bot, authenticated with cookies exported from the browser"""
+    
+    def __init__(self, browser_manager, settings=None):
+        """
+        Initialize ServiceNowClient
+        
+        Args:
+            browser_manager: BrowserManager - browser holding the ServiceNow login
+            settings: dict - client settings (default config.SNOW_CLIENT)
+        """
+        self.browser = browser_manager
+        self.settings = settings or config.SNOW_CLIENT
+        self.tokens = {}
+        self.exported = {}
+        
+        # One keep-alive pool per instance host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.settings["pool_size"],
+                              pool_maxsize=self.settings["pool_size"])
+        self.session.mount("https://", adapter)
+        browser_manager.snow_client = self
+    
+    def export_session(self, host):
+        """
+        Copy the browser's login for an instance into the HTTP session
+        
+        Must run on the thread that drives the browser.
+        
+        Args:
+            host: str - instance host name
+        
+        Returns:
+            bool - True if login cookies were exported, False otherwise
+        """
+        login = self.browser.export_session(host)
+        for cookie in login["cookies"]:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain", host), path=cookie.get("path", "/"))
+        
+        self.tokens[host] = login["token"] or self.fetch_token(host)
+        driver = self.browser.get_driver()
+        self.exported[host] = driver.session_id if driver else None
+        
+        if login["cookies"]:
+            print(f"ServiceNow session exported for {host}")
+        return bool(login["cookies"])
+    
+    def fetch_token(self, host):
+        """
+        Read the session token from a ServiceNow page when no browser tab shows the instance
+        
+        Args:
+            host: str - instance host name
+        
+        Returns:
+            str - session token or None
+        """
+        try:
+            response = self.session.get(f"https://{host}{self.settings['token_page']}",
+                                        timeout=self.settings["timeout"])
+            match = G_CK_PATTERN.search(response.text)
+            return match.group(1) if match else None
+        except requests.RequestException as e:
+            print(f"Error reading ServiceNow session token for {host}: {e}")
+            return None
+    
+    def ensure_session(self, host):
+        """Export the login of an instance if it was never exported or the browser was restarted since"""
+        driver = self.browser.get_driver()
+        if driver and self.exported.get(host) != driver.session_id:
+            self.export_session(host)
+    
+    def get(self, host, path, params=None):
+        """
+        GET a JSON resource of an instance, re-exporting the login once on HTTP 401
+        
+        Args:
+            host: str - instance host name
+            path: str - resource path (e.g. /api/now/table/incident)
+            params: dict - query parameters
+        
+        Returns:
+            Response - successful response, or None if the request failed
+        """
+        self.ensure_session(host)
+        
+        for attempt in range(2):
+            headers = {"Accept": "application/json"}
+            if self.tokens.get(host):
+                headers["X-UserToken"] = self.tokens[host]
+            
+            try:
+                response = self.session.get(f"https://{host}{path}", params=params, headers=headers,
+                                            timeout=self.settings["timeout"])
+            except requests.RequestException as e:
+                print(f"ServiceNow request to {host} failed: {e}")
+                return None
+            
+            if response.status_code == 401 and attempt == 0:
+                # Browser re-authenticated (or the session timed out) - take its current login
+                print(f"ServiceNow API session for {host} expired - re-exporting browser login")
+                self.export_session(host)
+                continue
+            
+            if response.status_code >= 300:
+                print(f"ServiceNow request to {host} failed: HTTP {response.status_code}")
+                return None
+            return response
+        return None
+    
+    def get_records(self, host, table, query="", fields=None, limit=None):
+        """
+        Fetch records of a table through the Table API (display values)
+        
+        Args:
+            host: str - instance host name
+            table: str - table name (e.g. incident)
+            query: str - encoded query (sysparm_query)
+            fields: list - fields to return (default all)
+            limit: int - maximum records (default settings max_records)
+        
+        Returns:
+            tuple - (total_count, payload) or None if the request failed
+        """
+        params = {
+            "sysparm_query": query,
+            "sysparm_display_value": "true",
+            "sysparm_exclude_reference_link": "true",
+            "sysparm_limit": limit or self.settings["max_records"],
+        }
+        if fields:
+            params["sysparm_fields"] = ",".join(fields)
+        
+        response = self.get(host, f"/api/now/table/{table}", params)
+        if response is None:
+            return None
+        
+        try:
+            payload = response.json()
+        except ValueError:
+            print(f"ServiceNow returned a non-JSON response for {table} (login page?)")
+            return None
+        return response.headers.get("X-Total-Count"), payload
+    
+    def fetch_list(self, url):
+        """
+        Fetch the tickets of a ServiceNow list URL through the Table API
+        
+        Args:
+            url: str - Polaris list URL (as configured in config.py)
+        
+        Returns:
+            tuple - (total_count, tickets) or None if the URL is not a list or the fetch failed
+        """
+        target = get_list_target(url)
+        if target is None:
+            return None
+        
+        parsed = urlparse(target)
+        table = parsed.path.strip("/")
+        if not table.endswith("_list.do"):
+            return None
+        table = table[:-len("_list.do")]
+        query = parse_qs(parsed.query).get("sysparm_query", [""])[0]
+        
+        field_map = config.LIST_CAPTURE["json_fields"]
+        fetched = self.get_records(parsed.netloc, table, query, fields=list(field_map.values()))
+        if fetched is None:
+            return None
+        
+        total_count, payload = fetched
+        decoded = decode_list_json(payload, field_map)
+        if decoded is None:
+            return None
+        count, tickets = decoded
+        return total_count or count, tickets
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
@@ -0,0 +1,161 @@
+"""
+Team Manager for Ticket Monitoring Bot
+Serves several teams from one process - shared browser and scrapes, per-team alert routing
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import config
+from teams_messenger import TeamsMessenger
+from notification_queue import NotificationQueue
+from queue_registry import get_registry
+
+
+class Team:
+    """One team - its Teams destination, alert state and the queues it watches"""
+    
+    def __init__(self, name, messenger, queue_names=None):
+        """
+        Initialize Team
+        
+        Args:
+            name: str - team name (for output)
+            messenger: TeamsMessenger - delivers this team's alerts
+            queue_names: list - QUEUES names the team watches (None = all queues)
+        """
+        self.name = name
+        self.messenger = messenger
+        self.queue_names = set(queue_names) if queue_names else None
+        self.notification_queue = NotificationQueue(messenger) if config.COALESCE_ALERTS else None
+    
+    def watches(self, entry):
+        """
+        Check if the team watches a queue
+        
+        Args:
+            entry: QueueEntry - registry entry
+        
+        Returns:
+            bool - True if the queue's alerts go to this team
+        """
+        return self.queue_names is None or bool(self.queue_names & entry.names)
+
+
+class TeamManager:
+    """All teams served by this process and the routing of queues to teams"""
+    
+    def __init__(self, browser_manager, sound_notifier, team_configs=None):
+        """
+        Initialize TeamManager
+        
+        Args:
+            browser_manager: BrowserManager - browser shared by all teams
+            sound_notifier: SoundNotifier - shared notification sound
+            team_configs: list - team definitions (default config.TEAM_CONFIGS;
+                          empty = one team using the global Teams settings)
+        """
+        self.browser = browser_manager
+        self.registry = get_registry()
+        self.routes = {}
+        
+        team_configs = config.TEAM_CONFIGS if team_configs is None else team_configs
+        if not team_configs:
+            self.teams = [Team("default", TeamsMessenger(browser_manager, sound_notifier))]
+            return
+        
+        known = {name for entry in self.registry.entries for name in entry.names}
+        self.teams = []
+        for team_config in team_configs:
+            unknown = set(team_config.get("queues", [])) - known
+            if unknown:
+                print(f"Team {team_config['name']}: unknown queues {sorted(unknown)} ignored")
+            self.teams.append(Team(team_config["name"],
+                                   TeamsMessenger(browser_manager, sound_notifier, team_config),
+                                   team_config.get("queues")))
+    
+    def teams_for(self, url):
+        """
+        Get the teams that receive the alerts of a queue
+        
+        Args:
+            url: str - queue URL
+        
+        Returns:
+            list - Team objects (empty if no team watches the queue)
+        """
+        if url not in self.routes:
+            entry = self.registry.get(url)
+            if entry is None:
+                self.routes[url] = list(self.teams)
+            else:
+                self.routes[url] = [team for team in self.teams if team.watches(entry)]
+        return self.routes[url]
+    
+    def select(self, table, first_scan=False):
+        """
+        Get the due queues of a table that at least one team watches
+        
+        Queues shared by several teams appear once - they are scraped once and
+        their alerts are routed to every watching team.
+        
+        Args:
+            table: str - table name
+            first_scan: bool - True in the first monitoring cycle
+        
+        Returns:
+            list - QueueEntry objects in scan order
+        """
+        return [entry for entry in self.registry.select(table, first_scan) if self.teams_for(entry.url)]
+    
+    def steady_state_urls(self):
+        """
+        Get the URLs of watched queues scanned after the first cycle
+        
+        Returns:
+            list - queue URLs
+        """
+        return [url for url in self.registry.steady_state_urls() if self.teams_for(url)]
+    
+    def browser_messenger(self):
+        """
+        Get a messenger that delivers through the Teams web app
+        
+        Returns:
+            TeamsMessenger - first UI-delivery messenger, or None if all teams use HTTP delivery
+        """
+        return next((team.messenger for team in self.teams if team.messenger.uses_browser()), None)
+    
+    def refresh_drivers(self):
+        """Point every messenger at the current browser session (after a recycle)"""
+        for team in self.teams:
+            team.messenger.driver = self.browser.get_driver()
+            team.messenger.wait = self.browser.get_wait()
+    
+    def set_leader(self, election):
+        """
+        Let every messenger send only while this bot is the leader
+        
+        Args:
+            election: LeaderElection - leader lease of the active/standby pair
+        """
+        for team in self.teams:
+            team.messenger.leader = election
+    
+    def flush(self):
+        """
+        Hand every team's cycle digest to delivery
+        
+        Returns:
+            int - number of digest sections handed over
+        """
+        return sum(team.notification_queue.flush() for team in self.teams if team.notification_queue)
+    
+    def close(self):
+        """Deliver pending digests and close the notifier sinks and HTTP senders"""
+        for team in self.teams:
+            if team.notification_queue:
+                team.notification_queue.close()
+            team.messenger.dispatcher.close()
+            if team.messenger.sender:
+                team.messenger.sender.close()
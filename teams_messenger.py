@@ -16,23 +16,78 @@ from selenium.common.exceptions import (
 )
 import config
 from utils import SoundNotifier
+from alert_tracker import AlertTracker
+from teams_sender import create_sender, format_digest_html
+from notifier_sinks import create_dispatcher
+from metrics import metrics
+from tracing import traced
+
+
+# Insert HTML into the focused compose box as a single edit
+INSERT_HTML_SCRIPT = """
+const box = arguments[0];
+box.focus();
+if (document.execCommand('insertHTML', false, arguments[1])) {
+    return true;
+}
+box.innerHTML = arguments[1];
+box.dispatchEvent(new InputEvent('input', {bubbles: true}));
+return box.innerText.trim().length > 0;
+"""
 
 
 class TeamsMessenger:
     """Handles Microsoft Teams messaging operations"""
     
-    def __init__(self, browser_manager, sound_notifier):
+    def __init__(self, browser_manager, sound_notifier, team=None):
+        """
+        Initialize TeamsMessenger
+        
+        Args:
+            browser_manager: BrowserManager - browser used for UI delivery
+            sound_notifier: SoundNotifier - plays the alert sound
+            team: dict - team definition from TEAM_CONFIGS (default: global Teams settings)
+        """
         self.browser = browser_manager
         self.driver = browser_manager.get_driver()
         self.wait = browser_manager.get_wait()
         self.sound_notifier = sound_notifier
-        self.sent_messages = []
-        self.reminder_count = 1
+        self.sent_id = (team or {}).get("sent_id", config.TEAMS_SENT_ID)
+        self.alert_tracker = AlertTracker()
+        self.sender = create_sender(team=team)
+        self.leader = None
+        # Teams, sound and any email/webhook sinks of this team
+        self.dispatcher = create_dispatcher(self, team)
+    
+    def uses_browser(self):
+        """
+        Check if messages are delivered by typing into the Teams web app
+        
+        Returns:
+            bool - True for UI delivery, False for HTTP delivery
+        """
+        return self.sender is None
+    
+    def may_send(self):
+        """
+        Check that this bot may send (the current leader when HIGH_AVAILABILITY is enabled)
+        
+        Returns:
+            bool - True if messages may be sent
+        """
+        if self.leader is None or self.leader.confirm():
+            return True
+        print("Not the leader - message left to the active bot")
+        return False
     
-    def navigate_to_teams(self):
+    @traced("teams.navigate")
+    def navigate_to_teams(self, force_reload=False):
         """
         Navigate to Microsoft Teams with session validation
         
+        Args:
+            force_reload: bool - reload Teams even if the persistent tab is open
+        
         Returns:
             bool - True if successful, False otherwise
         """
@@ -49,6 +104,15 @@ class TeamsMessenger:
                     print("Failed to recover browser session")
                     return False
             
+            if config.TEAMS_PERSISTENT_TAB:
+                if not self.browser.switch_to_teams():
+                    return False
+                if not force_reload:
+                    return True
+            elif self.browser.queue_tabs:
+                # Keep the queue tabs' lists loaded - Teams borrows the ServiceNow tab
+                self.browser.switch_to_snow()
+            
             self.driver.get(config.TEAMS_URL)
             time.sleep(config.TIMEOUTS["teams_load"])
             return True
@@ -62,8 +126,11 @@ class TeamsMessenger:
                     self.driver = self.browser.get_driver()
                     self.wait = self.browser.get_wait()
                     try:
-                        self.driver.get(config.TEAMS_URL)
-                        time.sleep(config.TIMEOUTS["teams_load"])
+                        if config.TEAMS_PERSISTENT_TAB:
+                            self.browser.switch_to_teams()
+                        else:
+                            self.driver.get(config.TEAMS_URL)
+                            time.sleep(config.TIMEOUTS["teams_load"])
                         print("Successfully navigated to Teams after browser recovery")
                         return True
                     except Exception as e2:
@@ -83,6 +150,17 @@ class TeamsMessenger:
                     print(f"Failed to navigate after refresh: {e3}")
                     return False
     
+    def return_to_teams(self):
+        """
+        Park the browser on Teams after a queue visit
+        
+        Only needed when Teams shares the ServiceNow tab; the persistent tab
+        and HTTP delivery keep Teams ready without reloading it.
+        """
+        if self.uses_browser() and not config.TEAMS_PERSISTENT_TAB:
+            self.navigate_to_teams()
+    
+    @traced("teams.wait_load")
     def wait_for_teams_load(self):
         """
         Wait for Teams to fully load and verify send_id is available
@@ -91,7 +169,7 @@ class TeamsMessenger:
             bool - True if loaded, False otherwise
         """
         try:
-            send_id_xpath = config.TEAMS_XPATHS["send_id"].format(config.TEAMS_SENT_ID)
+            send_id_xpath = config.TEAMS_XPATHS["send_id"].format(self.sent_id)
             send_id = self.wait.until(EC.presence_of_element_located(
                 (By.XPATH, send_id_xpath))).text
             return send_id is not None
@@ -99,6 +177,27 @@ class TeamsMessenger:
             print(f"Error waiting for Teams to load: {e}")
             return False
     
+    def open_teams(self, timeout):
+        """
+        Navigate to Teams and reload it until it has loaded or the timeout passes
+        
+        Args:
+            timeout: float - seconds allowed for Teams to load
+        
+        Returns:
+            bool - True if Teams is loaded, False otherwise
+        """
+        deadline = time.time() + timeout
+        self.navigate_to_teams()
+        while not self.wait_for_teams_load():
+            if time.time() + 5 >= deadline:
+                print(f"Teams did not load within {timeout} s")
+                return False
+            time.sleep(5)
+            self.navigate_to_teams(force_reload=True)
+        return True
+    
+    @traced("teams.select_chat")
     def select_chat(self):
         """
         Select the configured Teams chat/channel
@@ -107,7 +206,7 @@ class TeamsMessenger:
             bool - True if successful, False otherwise
         """
         try:
-            send_id_xpath = config.TEAMS_XPATHS["send_id"].format(config.TEAMS_SENT_ID)
+            send_id_xpath = config.TEAMS_XPATHS["send_id"].format(self.sent_id)
             self.wait.until(EC.presence_of_element_located(
                 (By.XPATH, send_id_xpath))).click()
             time.sleep(2)
@@ -223,7 +322,6 @@ class TeamsMessenger:
             for ticket in ticket_list:
                 msg_box.send_keys(ticket)
                 msg_box.send_keys(Keys.ENTER)
-                self.sent_messages.append(ticket)
                 time.sleep(2)
             
             msg_box.send_keys(Keys.ENTER)
@@ -243,6 +341,69 @@ class TeamsMessenger:
         except Exception as e:
             print(f"Error sending formatted tickets: {e}")
     
+    def send_composed_message(self, message_html):
+        """
+        Insert a complete HTML message into the compose box and send it
+        
+        Args:
+            message_html: str - full message body
+            
+        Returns:
+            bool - True if sent, False if the caller should fall back to typing
+        """
+        try:
+            msg_box = self.get_message_box()
+            if not self.driver.execute_script(INSERT_HTML_SCRIPT, msg_box, message_html):
+                print("Compose box rejected inserted message")
+                return False
+            time.sleep(1)
+            
+            try:
+                send_button = self.wait.until(EC.presence_of_element_located(
+                    (By.XPATH, config.TEAMS_XPATHS["send_button"])))
+                send_button.click()
+            except Exception:
+                msg_box.send_keys(Keys.ENTER)
+            time.sleep(1)
+            print("Composed ticket message sent")
+            return True
+        except Exception as e:
+            print(f"Error sending composed message: {e}")
+            return False
+    
+    def send_typed_alert(self, greeting, important_list, normal_list, total_count):
+        """
+        Type the ticket alert into Teams line by line
+        
+        Args:
+            greeting: str - greeting message
+            important_list: list - list of high priority/critical tickets
+            normal_list: list - list of normal priority tickets
+            total_count: str - total ticket count
+        """
+        # Send greeting
+        self.send_simple_message(greeting)
+        
+        # Send important tickets with bold formatting
+        if important_list:
+            print("Sending important tickets...")
+            self.send_formatted_tickets(important_list, use_bold=True)
+        
+        # Send normal tickets
+        if normal_list:
+            print("Sending normal priority tickets...")
+            msg_box = self.get_message_box()
+            for ticket in normal_list:
+                msg_box.send_keys(ticket)
+                msg_box.send_keys(Keys.ALT, Keys.ENTER)
+                time.sleep(1)
+            msg_box.send_keys(Keys.ENTER)
+            time.sleep(1)
+        
+        # Send total count
+        total_message = f"Total active Tickets in queue: {total_count}"
+        self.send_simple_message(total_message)
+    
     def send_ticket_alert(self, greeting, important_list, normal_list, total_count):
         """
         Send complete ticket alert message to Teams
@@ -252,16 +413,59 @@ class TeamsMessenger:
             important_list: list - list of high priority/critical tickets
             normal_list: list - list of normal priority tickets
             total_count: str - total ticket count
+            
+        Returns:
+            bool - True if successful, False otherwise
+        """
+        return self.send_digest([{
+            "greeting": greeting,
+            "important": important_list,
+            "normal": normal_list,
+            "total_count": total_count,
+        }])
+    
+    @traced("teams.send_digest")
+    def send_digest(self, sections, on_late=None):
+        """
+        Send one message covering several alert sections to all notifier sinks
+        
+        Args:
+            sections: list - dicts with greeting, important, normal and total_count keys
+                      (one per instance/ticket type)
+            on_late: function - receives the outcome of primary sinks still sending
+                     after their timeout (see NotifierDispatcher.dispatch)
+            
+        Returns:
+            bool - True if the primary sinks (Teams) delivered it, False otherwise,
+                   None while a primary sink is still sending (outcome passed to on_late)
+        """
+        if not self.may_send():
+            return False
+        return self.dispatcher.dispatch("send_digest", sections, on_late=on_late)
+    
+    def deliver_digest(self, sections, timeout=config.NOTIFIER_TIMEOUT):
+        """
+        Deliver alert sections to the Teams chat (the "teams" notifier sink)
+        
+        Args:
+            sections: list - dicts with greeting, important, normal and total_count keys
+            timeout: float - seconds allowed for Teams to load (UI delivery)
+            
+        Returns:
+            bool - True if successful, False otherwise
         """
         try:
-            # Play notification sound
-            self.sound_notifier.play()
+            # Deliver as a single HTTP message when a sender is configured
+            if self.sender:
+                if not self.sender.send_digest(sections):
+                    print("Failed to deliver ticket alert")
+                    return False
+                print("New ticket message sent successfully")
+                return True
             
             # Navigate to Teams and wait for load
-            self.navigate_to_teams()
-            while not self.wait_for_teams_load():
-                time.sleep(5)
-                self.navigate_to_teams()
+            if not self.open_teams(timeout):
+                return False
             
             # Select chat
             if not self.select_chat():
@@ -270,32 +474,17 @@ class TeamsMessenger:
             # Clear any draft messages
             self.clear_draft_message()
             
-            # Send greeting
-            self.send_simple_message(greeting)
-            
-            # Send important tickets with bold formatting
-            if important_list:
-                print("Sending important tickets...")
-                self.send_formatted_tickets(important_list, use_bold=True)
-            
-            # Send normal tickets
-            if normal_list:
-                print("Sending normal priority tickets...")
-                msg_box = self.get_message_box()
-                for ticket in normal_list:
-                    msg_box.send_keys(ticket)
-                    msg_box.send_keys(Keys.ALT, Keys.ENTER)
-                    self.sent_messages.append(ticket)
-                    time.sleep(1)
-                msg_box.send_keys(Keys.ENTER)
-                time.sleep(1)
-            
-            # Send total count
-            total_message = f"Total active Tickets in queue: {total_count}"
-            self.send_simple_message(total_message)
+            # Compose the whole alert at once, typing line by line only as a fallback
+            composed = (config.TEAMS_COMPOSE_MODE == "oneshot" and
+                        self.send_composed_message(format_digest_html(sections)))
+            if not composed:
+                # A failed insert can leave part of the message as a draft - typing would append to it
+                if config.TEAMS_COMPOSE_MODE == "oneshot":
+                    self.clear_draft_message()
+                for section in sections:
+                    self.send_typed_alert(section["greeting"], section["important"],
+                                          section["normal"], section["total_count"])
             
-            # Reset reminder count after new message
-            self.reminder_count = 1
             print("New ticket message sent successfully")
             return True
             
@@ -304,39 +493,110 @@ class TeamsMessenger:
             self.driver.refresh()
             return False
     
-    def send_reminder(self, is_final=False):
+    def alert_new_tickets(self, sections):
+        """
+        Send the first alert for tracked tickets and record the delivery
+        
+        The tickets stay in flight (not alerted again) while a primary sink is
+        still sending after its timeout; the outcome is recorded when it finishes.
+        
+        Args:
+            sections: list - dicts with greeting, alerts (TicketAlert list) and total_count keys
+            
+        Returns:
+            bool - True if successful, False otherwise, None while delivery is still running
+        """
+        digest = [{
+            "greeting": section["greeting"],
+            "important": [a.formatted for a in section["alerts"] if a.important],
+            "normal": [a.formatted for a in section["alerts"] if not a.important],
+            "total_count": section["total_count"],
+        } for section in sections]
+        
+        alerts = [a for section in sections for a in section["alerts"]]
+        started = time.time()
+        
+        def record(delivered):
+            if delivered:
+                metrics.observe("bot_teams_send_seconds", time.time() - started, kind="alert")
+                self.alert_tracker.mark_alerted(alerts)
+            else:
+                metrics.inc("bot_teams_send_failures_total", kind="alert")
+                self.alert_tracker.mark_failed(alerts)
+        
+        self.alert_tracker.mark_sending(alerts)
+        delivered = self.send_digest(digest, on_late=record)
+        if delivered is None:
+            print("Ticket alert still being delivered - outcome recorded when it finishes")
+            return None
+        record(delivered)
+        return delivered
+    
+    @traced("teams.send_reminder")
+    def send_reminder(self, alerts):
+        """
+        Send reminder message for tickets that are still unassigned
+        
+        Args:
+            alerts: list - TicketAlert entries due for a reminder
+            
+        Returns:
+            bool - True if successful, False otherwise, None while delivery is still running
+        """
+        if not alerts or not self.may_send():
+            return False
+        
+        if self.alert_tracker.is_final_reminder(alerts):
+            message = config.MESSAGE_TEMPLATES["final_reminder"]
+        else:
+            message = config.MESSAGE_TEMPLATES["reminder"].format(
+                min(a.reminder_count for a in alerts) + 1)
+        message = f"{message}: {', '.join(a.number for a in alerts)}"
+        
+        started = time.time()
+        
+        def record(delivered):
+            if delivered:
+                metrics.observe("bot_teams_send_seconds", time.time() - started, kind="reminder")
+                self.alert_tracker.mark_reminded(alerts)
+                print(f"Reminder message sent: {message}")
+            else:
+                metrics.inc("bot_teams_send_failures_total", kind="reminder")
+        
+        delivered = self.dispatcher.dispatch("send_text", message, on_late=record)
+        if delivered is not None:
+            record(delivered)
+        return delivered
+    
+    def deliver_text(self, message, timeout=config.NOTIFIER_TIMEOUT):
         """
-        Send reminder message
+        Deliver a plain text message to the Teams chat (the "teams" notifier sink)
         
         Args:
-            is_final: bool - whether this is the final reminder
+            message: str - message text
+            timeout: float - seconds allowed for Teams to load (UI delivery)
             
         Returns:
             bool - True if successful, False otherwise
         """
         try:
-            self.sound_notifier.play()
-            self.navigate_to_teams()
-            time.sleep(15)
+            if self.sender:
+                if not self.sender.send_text(message):
+                    print("Failed to deliver reminder")
+                    return False
+                return True
+            
+            if not self.open_teams(timeout):
+                return False
             
             if not self.select_chat():
                 return False
             
             msg_box = self.get_message_box()
-            
-            if is_final:
-                message = config.MESSAGE_TEMPLATES["final_reminder"]
-                self.reminder_count += 1
-            else:
-                message = config.MESSAGE_TEMPLATES["reminder"].format(self.reminder_count)
-                self.reminder_count += 1
-            
             msg_box.send_keys(message)
             time.sleep(1)
             msg_box.send_keys(Keys.ENTER)
             time.sleep(2)
-            
-            print(f"Reminder message sent: {message}")
             return True
             
         except Exception as e:
@@ -347,46 +607,11 @@ class TeamsMessenger:
     def handle_auth_banner(self):
         """Handle Teams authentication banner if present"""
         try:
-            time.sleep(40)
+            if not config.TEAMS_PERSISTENT_TAB:
+                time.sleep(40)
             auth_banner = self.wait.until(EC.presence_of_element_located(
                 (By.XPATH, config.TEAMS_XPATHS["auth_banner"])))
             auth_banner.click()
             print("Auth success")
         except (ElementClickInterceptedException, NoSuchElementException, TimeoutException):
             print("Skipped auth")
-    
-    def should_send_message(self, current_tickets):
-        """
-        Determine if a message should be sent based on ticket comparison
-        
-        Args:
-            current_tickets: list - current list of unassigned tickets
-            
-        Returns:
-            str - "new" for new message, "reminder" for reminder, "skip" to skip
-        """
-        if not current_tickets:
-            return "skip"
-        
-        # Compare with previously sent messages
-        if set(current_tickets) != set(self.sent_messages):
-            return "new"
-        
-        # Send reminders up to max count
-        if self.reminder_count <= config.MAX_REMINDER_COUNT:
-            return "reminder"
-        
-        return "skip"
-    
-    def reset_reminder_count(self):
-        """Reset the reminder counter"""
-        self.reminder_count = 1
-    
-    def get_sent_messages(self):
-        """
-        Get list of sent messages
-        
-        Returns:
-            list - list of sent ticket messages
-        """
-        return self.sent_messages
@@ -0,0 +1,272 @@
+"""
+Teams Senders for Ticket Monitoring Bot
+Pluggable HTTP delivery of alerts to Microsoft Teams (incoming webhook or Graph chat)
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import abc
+import html
+import time
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+
+# HTTP status codes that are worth retrying
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+def format_alert_html(greeting, important_list, normal_list, total_count):
+    """
+    Build the complete alert as one HTML message
+    
+    Args:
+        greeting: str - greeting message
+        important_list: list - Critical/High ticket strings (rendered bold)
+        normal_list: list - normal priority ticket strings
+        total_count: str - total ticket count
+    
+    Returns:
+        str - HTML message body
+    """
+    def line(text):
+        # Keep the column padding of the ticket strings
+        return html.escape(text.rstrip()).replace("  ", " &nbsp;")
+    
+    parts = [f"<p>{line(greeting)}</p>"]
+    if important_list:
+        parts.append("<p><b>" + "<br>".join(line(t) for t in important_list) + "</b></p>")
+    if normal_list:
+        parts.append("<p>" + "<br>".join(line(t) for t in normal_list) + "</p>")
+    parts.append(f"<p>{line(f'Total active Tickets in queue: {total_count}')}</p>")
+    return "".join(parts)
+
+
+def format_digest_html(sections):
+    """
+    Build one HTML message from several alert sections
+    
+    Args:
+        sections: list - dicts with greeting, important, normal and total_count keys
+    
+    Returns:
+        str - HTML message body
+    """
+    return "".join(format_alert_html(s["greeting"], s["important"], s["normal"], s["total_count"])
+                   for s in sections)
+
+
+def format_alert_markdown(greeting, important_list, normal_list, total_count):
+    """
+    Build the complete alert as one markdown message (webhook cards)
+    
+    Args:
+        greeting: str - greeting message
+        important_list: list - Critical/High ticket strings (rendered bold)
+        normal_list: list - normal priority ticket strings
+        total_count: str - total ticket count
+    
+    Returns:
+        str - markdown message body
+    """
+    parts = [greeting]
+    if important_list:
+        parts.append("\n\n".join(f"**{t.strip()}**" for t in important_list))
+    if normal_list:
+        parts.append("\n\n".join(t.strip() for t in normal_list))
+    parts.append(f"Total active Tickets in queue: {total_count}")
+    return "\n\n".join(parts)
+
+
+class TeamsSender(abc.ABC):
+    """Interface for delivering messages to the configured Teams channel"""
+    
+    def send_alert(self, greeting, important_list, normal_list, total_count):
+        """
+        Send a complete ticket alert as one message
+        
+        Returns:
+            bool - True if delivered, False otherwise
+        """
+        return self.send_digest([{
+            "greeting": greeting,
+            "important": important_list,
+            "normal": normal_list,
+            "total_count": total_count,
+        }])
+    
+    @abc.abstractmethod
+    def send_digest(self, sections):
+        """
+        Send several alert sections (one per instance/ticket type) as one message
+        
+        Args:
+            sections: list - dicts with greeting, important, normal and total_count keys
+        
+        Returns:
+            bool - True if delivered, False otherwise
+        """
+    
+    @abc.abstractmethod
+    def send_text(self, message):
+        """
+        Send a plain text message
+        
+        Returns:
+            bool - True if delivered, False otherwise
+        """
+    
+    def close(self):
+        """Release any held resources"""
+        pass
+
+
+class HttpSender(TeamsSender):
+    """Base for HTTP senders - pooled session with retry and backoff"""
+    
+    def __init__(self, url, settings=None):
+        self.url = url
+        self.settings = settings or config.HTTP_SENDER_SETTINGS
+        
+        # Reuse connections across alerts
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.settings["pool_size"])
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def build_headers(self):
+        """
+        Get request headers for the endpoint
+        
+        Returns:
+            dict - HTTP headers
+        """
+        return {"Content-Type": "application/json"}
+    
+    def post(self, payload):
+        """
+        POST a JSON payload, retrying transient failures with exponential backoff
+        
+        Args:
+            payload: dict - JSON body
+        
+        Returns:
+            bool - True if the endpoint accepted the payload, False otherwise
+        """
+        max_retries = self.settings["max_retries"]
+        
+        for attempt in range(max_retries + 1):
+            delay = self.settings["backoff_factor"] * (2 ** attempt)
+            try:
+                response = self.session.post(self.url, json=payload, headers=self.build_headers(),
+                                             timeout=self.settings["timeout"])
+                if response.status_code < 300:
+                    return True
+                if response.status_code not in RETRYABLE_STATUS:
+                    print(f"Teams endpoint rejected message: HTTP {response.status_code} {response.text[:200]}")
+                    return False
+                
+                # Honour server-provided throttling delay
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = int(retry_after)
+                print(f"Teams endpoint returned HTTP {response.status_code} (attempt {attempt + 1})")
+            except requests.RequestException as e:
+                print(f"Teams send attempt {attempt + 1} failed: {e}")
+            
+            if attempt < max_retries:
+                time.sleep(delay)
+        
+        return False
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+class WebhookSender(HttpSender):
+    """Posts alerts as cards to a Teams incoming webhook"""
+    
+    def build_payload(self, summary, text):
+        """
+        Build a MessageCard payload
+        
+        Args:
+            summary: str - card summary shown in notifications
+            text: str - markdown card body
+        
+        Returns:
+            dict - webhook payload
+        """
+        return {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "summary": summary,
+            "text": text,
+        }
+    
+    def send_digest(self, sections):
+        text = "\n\n".join(format_alert_markdown(s["greeting"], s["important"], s["normal"], s["total_count"])
+                           for s in sections)
+        return self.post(self.build_payload(sections[0]["greeting"], text))
+    
+    def send_text(self, message):
+        return self.post(self.build_payload(message, message))
+
+
+class GraphChatSender(HttpSender):
+    """Posts alerts to a Teams chat through Microsoft Graph"""
+    
+    def __init__(self, chat_id, access_token, settings=None):
+        super().__init__(f"{config.GRAPH_API_URL}/chats/{chat_id}/messages", settings)
+        self.access_token = access_token
+    
+    def build_headers(self):
+        headers = super().build_headers()
+        headers["Authorization"] = f"Bearer {self.access_token}"
+        return headers
+    
+    def build_payload(self, content):
+        """
+        Build a chatMessage payload
+        
+        Args:
+            content: str - HTML message body
+        
+        Returns:
+            dict - Graph chatMessage payload
+        """
+        return {"body": {"contentType": "html", "content": content}}
+    
+    def send_digest(self, sections):
+        return self.post(self.build_payload(format_digest_html(sections)))
+    
+    def send_text(self, message):
+        return self.post(self.build_payload(html.escape(message)))
+
+
+def create_sender(mode=None, team=None):
+    """
+    Create the HTTP sender for the configured delivery mode
+    
+    Args:
+        mode: str - "ui", "webhook" or "graph" (default config.TEAMS_DELIVERY_MODE)
+        team: dict - team definition from TEAM_CONFIGS whose destination overrides the global one
+    
+    Returns:
+        TeamsSender or None - None when alerts are delivered through the Teams UI
+    """
+    team = team or {}
+    if mode is None:
+        mode = team.get("delivery_mode", config.TEAMS_DELIVERY_MODE)
+    
+    if mode == "webhook":
+        return WebhookSender(team.get("webhook_url", config.TEAMS_WEBHOOK_URL))
+    if mode == "graph":
+        return GraphChatSender(team.get("graph_chat_id", config.GRAPH_CHAT_ID),
+                               team.get("graph_access_token", config.GRAPH_ACCESS_TOKEN))
+    if mode != "ui":
+        print(f"Unknown TEAMS_DELIVERY_MODE '{mode}' - falling back to Teams UI")
+    return None
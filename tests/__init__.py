@@ -0,0 +1,6 @@
+"""
+Unit tests for the Ticket Monitoring Bot modules that run without a browser
+
+Run from the project directory:
+    python -m unittest discover tests
+"""
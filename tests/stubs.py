@@ -0,0 +1,99 @@
+"""
+Local stand-ins for the endpoints the bot talks to (HTTP webhooks, SMTP)
+"""
+
+import http.server
+import json
+import socketserver
+import threading
+
+
+class HttpStub:
+    """
+    HTTP server on 127.0.0.1 that answers POSTs with scripted responses
+    
+    Each response is (status, headers); the last one repeats once the script runs out.
+    Received requests are kept as dicts with path, headers and the decoded JSON body.
+    """
+    
+    def __init__(self, responses=None):
+        self.responses = list(responses or [(200, {})])
+        self.requests = []
+        stub = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append({"path": self.path, "headers": dict(self.headers),
+                                      "body": json.loads(body) if body else None})
+                status, headers = stub.responses.pop(0) if len(stub.responses) > 1 else stub.responses[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SmtpStub:
+    """Minimal SMTP server on 127.0.0.1 that accepts every message and keeps it"""
+    
+    def __init__(self):
+        self.messages = []
+        stub = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                envelope = {"from": None, "to": [], "data": []}
+                in_data = False
+                self.reply("220 stub ready")
+                for raw in self.rfile:
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    if in_data:
+                        if line == ".":
+                            in_data = False
+                            stub.messages.append(dict(envelope, data="\n".join(envelope["data"])))
+                            envelope = {"from": None, "to": [], "data": []}
+                            self.reply("250 queued")
+                        else:
+                            envelope["data"].append(line[1:] if line.startswith("..") else line)
+                        continue
+                    command = line[:4].upper()
+                    if command in ("EHLO", "HELO"):
+                        self.reply("250 stub")
+                    elif command == "MAIL":
+                        envelope["from"] = line.split(":", 1)[1].strip()
+                        self.reply("250 ok")
+                    elif command == "RCPT":
+                        envelope["to"].append(line.split(":", 1)[1].strip())
+                        self.reply("250 ok")
+                    elif command == "DATA":
+                        in_data = True
+                        self.reply("354 end with .")
+                    elif command == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("250 ok")
+            
+            def reply(self, text):
+                self.wfile.write((text + "\r\n").encode("ascii"))
+        
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,113 @@
+"""
+Tests for alert_tracker - per-ticket alert state, reminders and eviction
+"""
+
+import unittest
+from alert_tracker import (AlertTracker, TicketAlert, STATE_PENDING, STATE_SENDING,
+                           STATE_ALERTED, STATE_EXHAUSTED, STATE_KNOWN)
+
+
+QUEUE = "https://instance/queue_a"
+
+
+def ticket(number, logged=False, important=False):
+    return {"number": number, "formatted": f"{number} formatted", "important": important, "logged": logged}
+
+
+class AlertTrackerTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tracker = AlertTracker(max_reminders=2, reminder_interval=60)
+    
+    def test_new_ticket_is_pending_until_alerted(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.assertEqual([a.number for a in pending], ["INC1"])
+        self.tracker.mark_alerted(pending, now=0)
+        self.assertEqual(self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=10), [])
+    
+    def test_logged_ticket_gets_no_alert_and_no_reminder(self):
+        self.assertEqual(self.tracker.sync_queue(QUEUE, [ticket("INC1", logged=True)], now=0), [])
+        self.assertEqual(self.tracker.alerts["INC1"].state, STATE_KNOWN)
+        self.assertEqual(self.tracker.due_reminders(now=1000), [])
+        self.assertEqual(self.tracker.sync_queue(QUEUE, [ticket("INC1", logged=True)], now=1000), [])
+    
+    def test_partial_scrape_keeps_pending_ticket(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1"), ticket("INC2")], now=0)
+        self.tracker.mark_sending(pending)
+        self.tracker.mark_failed(pending)
+        # The page broke off after INC2; INC1 is meanwhile in the Excel log
+        self.tracker.sync_queue(QUEUE, [ticket("INC2", logged=True)], now=10, complete=False)
+        self.assertEqual(self.tracker.alerts["INC1"].state, STATE_PENDING)
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1", logged=True), ticket("INC2", logged=True)], now=20)
+        self.assertEqual(sorted(a.number for a in pending), ["INC1", "INC2"])
+    
+    def test_partial_scrape_keeps_alerted_ticket(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.mark_alerted(pending, now=0)
+        self.tracker.sync_queue(QUEUE, [], now=10, complete=False)
+        self.tracker.sync_queue(QUEUE, [ticket("INC1", logged=True)], now=20)
+        self.assertEqual(self.tracker.alerts["INC1"].state, STATE_ALERTED)
+        self.assertEqual([a.number for a in self.tracker.due_reminders(now=60)], ["INC1"])
+    
+    def test_returning_ticket_logged_by_this_run_is_alerted_again(self):
+        self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.sync_queue(QUEUE, [], now=10)
+        self.assertNotIn("INC1", self.tracker.alerts)
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1", logged=True)], now=20)
+        self.assertEqual([a.number for a in pending], ["INC1"])
+    
+    def test_ticket_in_delivery_is_not_handed_over_again(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.mark_sending(pending)
+        self.assertEqual(pending[0].state, STATE_SENDING)
+        self.assertEqual(self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=10), [])
+        self.assertEqual(self.tracker.due_reminders(now=1000), [])
+    
+    def test_failed_delivery_is_retried(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.mark_sending(pending)
+        self.tracker.mark_failed(pending)
+        self.assertEqual([a.number for a in self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=10)],
+                         ["INC1"])
+    
+    def test_interrupted_delivery_is_pending_after_restore(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.mark_sending(pending)
+        restored = AlertTracker()
+        restored.restore(self.tracker.snapshot())
+        self.assertEqual(restored.alerts["INC1"].state, STATE_PENDING)
+    
+    def test_reminders_until_exhausted(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.mark_alerted(pending, now=0)
+        self.assertEqual(self.tracker.due_reminders(now=30), [])
+        due = self.tracker.due_reminders(now=60)
+        self.assertEqual([a.number for a in due], ["INC1"])
+        self.assertFalse(self.tracker.is_final_reminder(due))
+        self.tracker.mark_reminded(due, now=60)
+        due = self.tracker.due_reminders(now=120)
+        self.assertTrue(self.tracker.is_final_reminder(due))
+        self.tracker.mark_reminded(due, now=120)
+        self.assertEqual(due[0].state, STATE_EXHAUSTED)
+        self.assertEqual(self.tracker.due_reminders(now=1000), [])
+    
+    def test_ticket_evicted_when_no_queue_lists_it(self):
+        other = "https://instance/queue_b"
+        self.tracker.sync_queue(QUEUE, [ticket("INC1")], now=0)
+        self.tracker.sync_queue(other, [ticket("INC1")], now=0)
+        self.tracker.sync_queue(QUEUE, [], now=10)
+        self.assertIn("INC1", self.tracker.alerts)
+        self.tracker.sync_queue(other, [], now=20)
+        self.assertNotIn("INC1", self.tracker.alerts)
+    
+    def test_snapshot_round_trip(self):
+        pending = self.tracker.sync_queue(QUEUE, [ticket("INC1", important=True)], now=5)
+        self.tracker.mark_alerted(pending, now=7)
+        data = self.tracker.snapshot()
+        alert = TicketAlert.from_dict(data[0])
+        self.assertEqual((alert.number, alert.important, alert.state, alert.last_alert, alert.queues),
+                         ("INC1", True, STATE_ALERTED, 7, {QUEUE}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for checkpoint - atomic checkpoint writes and resuming from them
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from alert_tracker import AlertTracker, STATE_ALERTED
+from checkpoint import Checkpoint, write_atomic, CHECKPOINT_VERSION
+
+
+QUEUE = "https://instance/incident_list.do?sysparm_query=a"
+
+
+class FakeRegistry:
+    """Queue registry with the attributes the checkpoint uses"""
+    
+    def __init__(self, urls):
+        self.entries = [SimpleNamespace(url=url, last_scan=None, fingerprint=None, ticket_count=None)
+                        for url in urls]
+    
+    def get(self, url):
+        return next((entry for entry in self.entries if entry.url == url), None)
+
+
+def team_manager(*team_names):
+    teams = [SimpleNamespace(name=name, messenger=SimpleNamespace(alert_tracker=AlertTracker()))
+             for name in team_names]
+    return SimpleNamespace(teams=teams, registry=FakeRegistry([QUEUE]))
+
+
+class WriteAtomicTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "state", "checkpoint.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_writes_and_replaces(self):
+        write_atomic(self.path, {"cycle": 1})
+        write_atomic(self.path, {"cycle": 2})
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"cycle": 2})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["checkpoint.json"])
+    
+    def test_failed_write_keeps_old_file_and_removes_temp_file(self):
+        write_atomic(self.path, {"cycle": 1})
+        with self.assertRaises(TypeError):
+            write_atomic(self.path, {"cycle": object()})
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"cycle": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["checkpoint.json"])
+    
+    def test_interrupted_replace_keeps_old_file(self):
+        write_atomic(self.path, {"cycle": 1})
+        with mock.patch("checkpoint.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_atomic(self.path, {"cycle": 2})
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"cycle": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["checkpoint.json"])
+
+
+class CheckpointTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings = {"enabled": True, "file": os.path.join(self.directory, "checkpoint.json"),
+                         "max_age_hours": 12}
+        self.checkpoint = Checkpoint(self.settings)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def saved_manager(self):
+        manager = team_manager("Team A", "Team B")
+        tracker = manager.teams[0].messenger.alert_tracker
+        pending = tracker.sync_queue(QUEUE, [{"number": "INC1", "formatted": "INC1 text",
+                                              "important": True, "logged": False}], now=100)
+        tracker.mark_alerted(pending, now=110)
+        entry = manager.registry.entries[0]
+        entry.last_scan, entry.fingerprint, entry.ticket_count = 120.0, "abc", "3"
+        self.assertTrue(self.checkpoint.save(manager, cycle=7))
+        return manager
+    
+    def test_restore_resumes_trackers_and_queue_state(self):
+        self.saved_manager()
+        restored = team_manager("Team A", "Team B", "Team C")
+        self.assertEqual(Checkpoint(self.settings).restore(restored), 7)
+        alert = restored.teams[0].messenger.alert_tracker.alerts["INC1"]
+        self.assertEqual((alert.state, alert.last_alert, alert.important), (STATE_ALERTED, 110, True))
+        self.assertEqual(len(restored.teams[1].messenger.alert_tracker), 0)
+        self.assertEqual(len(restored.teams[2].messenger.alert_tracker), 0)
+        entry = restored.registry.entries[0]
+        self.assertEqual((entry.last_scan, entry.fingerprint, entry.ticket_count), (120.0, "abc", "3"))
+    
+    def test_missing_checkpoint(self):
+        self.assertIsNone(self.checkpoint.restore(team_manager("Team A")))
+    
+    def test_unreadable_checkpoint_is_ignored(self):
+        with open(self.settings["file"], "w", encoding="utf-8") as f:
+            f.write('{"version": 1, "saved"')
+        self.assertIsNone(self.checkpoint.load())
+    
+    def test_other_version_is_ignored(self):
+        write_atomic(self.settings["file"], {"version": CHECKPOINT_VERSION + 1, "saved": time.time()})
+        self.assertIsNone(self.checkpoint.load())
+    
+    def test_old_checkpoint_is_ignored(self):
+        self.saved_manager()
+        with mock.patch("checkpoint.time.time", return_value=time.time() + 13 * 3600):
+            self.assertIsNone(self.checkpoint.load())
+    
+    def test_unsaveable_state_reports_failure(self):
+        manager = team_manager("Team A")
+        manager.registry.entries[0].last_scan = object()
+        self.assertFalse(self.checkpoint.save(manager, cycle=1))
+        self.assertFalse(os.path.exists(self.settings["file"]))
+    
+    def test_changed_after_rewrite(self):
+        self.saved_manager()
+        self.checkpoint.load()
+        self.assertFalse(self.checkpoint.changed())
+        os.utime(self.settings["file"], (time.time() + 5, time.time() + 5))
+        self.assertTrue(self.checkpoint.changed())
+
+
+if __name__ == "__main__":
+    unittest.main()
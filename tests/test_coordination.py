@@ -0,0 +1,155 @@
+"""
+Tests for coordination - SQLite lease store and sharing queues between nodes
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from coordination import SQLiteLeaseStore, QueueCoordinator
+
+
+class Clock:
+    """Settable time.time replacement"""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class StoreTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "leases.db")
+        self.clock = Clock()
+        patcher = mock.patch("coordination.time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stores = []
+    
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.directory)
+    
+    def store(self):
+        store = SQLiteLeaseStore(self.path)
+        self.stores.append(store)
+        return store
+
+
+class SQLiteLeaseStoreTest(StoreTestCase):
+    
+    def test_lease_has_one_owner_until_it_expires(self):
+        a, b = self.store(), self.store()
+        self.assertEqual(a.acquire("queue:x", "a", 60), 1)
+        self.assertIsNone(b.acquire("queue:x", "b", 60))
+        self.assertEqual(a.acquire("queue:x", "a", 60), 1)
+        self.clock.now += 61
+        self.assertEqual(b.acquire("queue:x", "b", 60), 2)
+        self.assertIsNone(a.acquire("queue:x", "a", 60))
+    
+    def test_renew_only_while_held(self):
+        a, b = self.store(), self.store()
+        a.acquire("queue:x", "a", 60)
+        self.clock.now += 50
+        self.assertTrue(a.renew("queue:x", "a", 60))
+        self.assertFalse(b.renew("queue:x", "b", 60))
+        self.clock.now += 61
+        self.assertFalse(a.renew("queue:x", "a", 60))
+    
+    def test_release_hands_over_with_a_new_token(self):
+        a, b = self.store(), self.store()
+        a.acquire("queue:x", "a", 60)
+        b.release("queue:x", "b")
+        self.assertIsNone(b.acquire("queue:x", "b", 60))
+        a.release("queue:x", "a")
+        self.assertEqual(b.acquire("queue:x", "b", 60), 2)
+    
+    def test_holders_lists_unexpired_leases_by_prefix(self):
+        a = self.store()
+        a.acquire("node:a", "a", 60)
+        a.acquire("node:b", "b", 10)
+        a.acquire("queue:x", "a", 60)
+        self.assertEqual(a.holders("node:"), {"node:a": "a", "node:b": "b"})
+        self.clock.now += 11
+        self.assertEqual(a.holders("node:"), {"node:a": "a"})
+
+
+def entry(name):
+    return SimpleNamespace(url=f"https://instance/{name}", name=name, instance_name="Instance 1")
+
+
+class QueueCoordinatorTest(StoreTestCase):
+    
+    def coordinator(self, node_id, entries):
+        return QueueCoordinator(self.store(), [e.url for e in entries],
+                                {"node_id": node_id, "lease_seconds": 60, "renew_seconds": 10})
+    
+    def test_nodes_split_the_shared_queues(self):
+        entries = [entry(f"q{i}") for i in range(4)]
+        a, b = self.coordinator("a", entries), self.coordinator("b", entries)
+        a.store.acquire("node:a", "a", 60)
+        b.store.acquire("node:b", "b", 60)
+        claimed_a = a.claim(entries)
+        claimed_b = b.claim(entries)
+        self.assertEqual([e.name for e in claimed_a], ["q0", "q1"])
+        self.assertEqual([e.name for e in claimed_b], ["q2", "q3"])
+        self.assertEqual([e.name for e in a.claim(entries)], ["q0", "q1"])
+    
+    def test_rebalance_releases_surplus_after_a_node_joins(self):
+        entries = [entry(f"q{i}") for i in range(4)]
+        a, b = self.coordinator("a", entries), self.coordinator("b", entries)
+        a.store.acquire("node:a", "a", 60)
+        self.assertEqual(len(a.claim(entries)), 4)
+        b.store.acquire("node:b", "b", 60)
+        a.rebalance()
+        self.assertEqual(sorted(a.held), ["queue:https://instance/q0", "queue:https://instance/q1"])
+        self.assertEqual([e.name for e in b.claim(entries)], ["q2", "q3"])
+    
+    def test_first_scan_queue_is_leased_for_one_cycle_only(self):
+        shared = [entry("q0"), entry("q1")]
+        first_scan = entry("first")
+        a = self.coordinator("a", shared)
+        a.store.acquire("node:a", "a", 60)
+        self.assertEqual(a.share(), 2)
+        claimed = a.claim(shared + [first_scan])
+        self.assertEqual([e.name for e in claimed], ["q0", "q1", "first"])
+        a.rebalance()
+        self.assertNotIn("queue:https://instance/first", a.held)
+        self.assertEqual(len(a.held), 2)
+        other = self.store()
+        self.assertEqual(other.acquire("queue:https://instance/first", "b", 60), 2)
+    
+    def test_lease_taken_over_is_dropped(self):
+        entries = [entry("q0")]
+        a = self.coordinator("a", entries)
+        a.store.acquire("node:a", "a", 60)
+        a.claim(entries)
+        self.clock.now += 61
+        self.store().acquire("queue:https://instance/q0", "b", 60)
+        a.last_claim = self.clock.now
+        a.renew()
+        self.assertEqual(a.held, {})
+    
+    def test_stalled_loop_stops_renewing_queue_leases(self):
+        entries = [entry("q0")]
+        a = self.coordinator("a", entries)
+        a.store.acquire("node:a", "a", 60)
+        a.claim(entries)
+        self.clock.now += 59
+        a.renew()
+        self.assertIsNone(self.store().acquire("queue:https://instance/q0", "b", 60))
+        self.clock.now += 59
+        a.renew()
+        self.clock.now += 2
+        self.assertEqual(self.store().acquire("queue:https://instance/q0", "b", 60), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
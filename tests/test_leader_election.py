@@ -0,0 +1,105 @@
+"""
+Tests for leader_election - one leader per group, fenced sends after a failover
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from coordination import SQLiteLeaseStore
+from leader_election import LeaderElection
+
+
+class Clock:
+    """Settable time.time replacement"""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class LeaderElectionTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "leader.db")
+        self.clock = Clock()
+        self.alive = True
+        for patcher in (mock.patch("coordination.time.time", self.clock),
+                        mock.patch("leader_election.time.time", self.clock),
+                        mock.patch("leader_election.metrics.is_alive", lambda stall_seconds: self.alive)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.elections = []
+    
+    def tearDown(self):
+        for election in self.elections:
+            election.store.close()
+        shutil.rmtree(self.directory)
+    
+    def election(self, node_id):
+        settings = {"group": "test", "node_id": node_id, "lease_seconds": 15, "renew_seconds": 3}
+        election = LeaderElection(SQLiteLeaseStore(self.path), settings)
+        self.elections.append(election)
+        return election
+    
+    def test_one_leader_per_group(self):
+        a, b = self.election("a"), self.election("b")
+        a.campaign()
+        b.campaign()
+        self.assertTrue(a.is_leader())
+        self.assertTrue(a.elected.is_set())
+        self.assertFalse(b.is_leader())
+        self.assertTrue(a.confirm())
+        self.assertFalse(b.confirm())
+    
+    def test_stalled_leader_is_fenced_after_failover(self):
+        a, b = self.election("a"), self.election("b")
+        a.campaign()
+        first_token = a.token
+        # a stalls: no renewal until its lease has run out, then b takes over
+        self.clock.now += 16
+        b.campaign()
+        self.assertTrue(b.is_leader())
+        self.assertGreater(b.token, first_token)
+        self.assertFalse(a.is_leader())
+        self.assertFalse(a.confirm())
+        self.assertTrue(b.confirm())
+    
+    def test_fencing_token_checked_in_store_before_local_expiry(self):
+        a, b = self.election("a"), self.election("b")
+        a.campaign()
+        # The lease is gone from the store while a still believes it leads
+        a.store.release(a.key, "a")
+        b.campaign()
+        self.assertTrue(a.is_leader())
+        self.assertFalse(a.confirm())
+        a.campaign()
+        self.assertFalse(a.is_leader())
+        self.assertFalse(a.elected.is_set())
+    
+    def test_stalled_monitoring_loop_steps_down(self):
+        a, b = self.election("a"), self.election("b")
+        a.campaign()
+        self.alive = False
+        a.campaign()
+        self.assertFalse(a.is_leader())
+        self.alive = True
+        b.campaign()
+        self.assertTrue(b.is_leader())
+        self.assertEqual(b.token, 2)
+    
+    def test_standby_takes_over_at_once_when_leader_stops(self):
+        a, b = self.election("a"), self.election("b")
+        a.campaign()
+        a.step_down("shutting down")
+        b.campaign()
+        self.assertTrue(b.is_leader())
+        self.assertFalse(a.confirm())
+
+
+if __name__ == "__main__":
+    unittest.main()
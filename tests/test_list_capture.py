@@ -0,0 +1,142 @@
+"""
+Tests for list_capture - decoding recorded ServiceNow list pages and Table API payloads
+"""
+
+import base64
+import json
+import os
+import unittest
+import config
+from list_capture import ListCapture, decode_list_html, decode_list_json
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class DecodeListHtmlTest(unittest.TestCase):
+    
+    def test_rows_decoded_with_column_mapping(self):
+        total, tickets = decode_list_html(fixture("incident_list.html"), config.INCIDENT_COLUMNS)
+        self.assertEqual(total, "2")
+        self.assertEqual([t["number"] for t in tickets], ["INC0012345", "INC0012346"])
+        self.assertEqual(tickets[0], {
+            "number": "INC0012345",
+            "short_description": "Outlook crashes on start",
+            "affected_user": "Jane Doe",
+            "priority": "3 - Moderate",
+            "state": "New",
+            "assignment_group": "Service Desk",
+            "assigned_to": "(empty)",
+            "type": "Software",
+            "updated": "2026-10-19 08:15:02",
+        })
+        self.assertEqual(tickets[1]["short_description"], "VPN & Wi-Fi down")
+    
+    def test_empty_list(self):
+        self.assertEqual(decode_list_html(fixture("incident_list_empty.html"), config.INCIDENT_COLUMNS),
+                         ("0", []))
+    
+    def test_rows_missing_columns_are_skipped(self):
+        total, tickets = decode_list_html(fixture("incident_list_missing_columns.html"), config.INCIDENT_COLUMNS)
+        self.assertEqual(total, "2")
+        self.assertEqual([t["number"] for t in tickets], ["INC0012345"])
+    
+    def test_paged_list_reports_full_total(self):
+        total, tickets = decode_list_html(fixture("incident_list_paged.html"), config.INCIDENT_COLUMNS)
+        self.assertEqual(total, "57")
+        self.assertEqual(len(tickets), 2)
+    
+    def test_page_without_list(self):
+        self.assertIsNone(decode_list_html("<html><body><p>Logged out</p></body></html>",
+                                           config.INCIDENT_COLUMNS))
+
+
+class DecodeListJsonTest(unittest.TestCase):
+    
+    def test_records_decoded_with_display_values(self):
+        total, tickets = decode_list_json(json.loads(fixture("table_api.json")))
+        self.assertEqual(total, "2")
+        self.assertEqual(tickets[0]["affected_user"], "Jane Doe")
+        self.assertEqual(tickets[0]["short_description"], "Outlook crashes on start")
+        self.assertEqual(tickets[0]["assigned_to"], "(empty)")
+        self.assertEqual(tickets[1]["assigned_to"], "Ann Lee")
+        self.assertEqual(tickets[1]["type"], "Network")
+    
+    def test_empty_result(self):
+        self.assertEqual(decode_list_json(json.loads(fixture("table_api_empty.json"))), ("0", []))
+    
+    def test_missing_fields_are_blank(self):
+        _, tickets = decode_list_json(json.loads(fixture("table_api_missing_fields.json")))
+        self.assertEqual(tickets[0]["affected_user"], "")
+        self.assertEqual(tickets[0]["type"], "")
+        self.assertEqual(tickets[0]["assignment_group"], "")
+        self.assertEqual(tickets[0]["assigned_to"], "(empty)")
+    
+    def test_paged_result_uses_header_total(self):
+        total, tickets = decode_list_json(json.loads(fixture("table_api.json")), total_count="57")
+        self.assertEqual((total, len(tickets)), ("57", 2))
+    
+    def test_payload_without_records(self):
+        self.assertIsNone(decode_list_json({"error": {"message": "User Not Authenticated"}}))
+        self.assertIsNone(decode_list_json([]))
+
+
+class FakeDriver:
+    """Answers Network.getResponseBody from recorded bodies"""
+    
+    def __init__(self, bodies):
+        self.bodies = bodies
+    
+    def execute_cdp_cmd(self, command, params):
+        return self.bodies[params["requestId"]]
+
+
+def response_events(request_id, url, mime_type, headers=None):
+    return [
+        {"method": "Network.responseReceived",
+         "params": {"requestId": request_id,
+                    "response": {"url": url, "mimeType": mime_type, "headers": headers or {}}}},
+        {"method": "Network.loadingFinished", "params": {"requestId": request_id}},
+    ]
+
+
+class ListCaptureTest(unittest.TestCase):
+    
+    def test_latest_html_response_is_decoded(self):
+        capture = ListCapture(["_list.do"])
+        capture.handle_events(response_events("1", "https://instance/incident_list.do?sysparm_query=a",
+                                              "text/html")
+                              + response_events("2", "https://instance/styles.css", "text/css")
+                              + response_events("3", "https://instance/incident_list.do?sysparm_query=b",
+                                                "text/html"))
+        body = base64.b64encode(fixture("incident_list_paged.html").encode()).decode()
+        driver = FakeDriver({"1": {"body": fixture("incident_list_empty.html")},
+                             "3": {"body": body, "base64Encoded": True}})
+        total, tickets = capture.collect(driver, config.INCIDENT_COLUMNS)
+        self.assertEqual((total, len(tickets)), ("57", 2))
+    
+    def test_paged_json_response_uses_total_count_header(self):
+        capture = ListCapture(["/api/now/table/"])
+        capture.handle_events(response_events("1", "https://instance/api/now/table/incident?sysparm_limit=2",
+                                              "application/json", {"X-Total-Count": "57"}))
+        driver = FakeDriver({"1": {"body": fixture("table_api.json")}})
+        total, tickets = capture.collect(driver, config.INCIDENT_COLUMNS)
+        self.assertEqual((total, len(tickets)), ("57", 2))
+    
+    def test_unreadable_response_falls_back_to_older_one(self):
+        capture = ListCapture(["/api/now/table/"])
+        capture.handle_events(response_events("1", "https://instance/api/now/table/incident", "application/json")
+                              + response_events("2", "https://instance/api/now/table/incident",
+                                                "application/json"))
+        driver = FakeDriver({"1": {"body": fixture("table_api.json")}, "2": {"body": "{truncated"}})
+        total, _ = capture.collect(driver, config.INCIDENT_COLUMNS)
+        self.assertEqual(total, "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Tests for notifier_sinks - dispatching to several sinks with per-sink timeouts
+"""
+
+import email
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+from notifier_sinks import NotifierDispatcher, NotifierSink, EmailSink, WebhookSink, create_dispatcher
+from tests.stubs import HttpStub, SmtpStub
+
+
+SECTIONS = [
+    {"greeting": "Hi Team, We Have Unassigned Tickets", "important": ["INC0012346 - VPN <down>"],
+     "normal": ["INC0012345 - Outlook crashes"], "total_count": "2"},
+]
+
+
+class FakeSink(NotifierSink):
+    """Sink that records messages and can be held until released"""
+    
+    def __init__(self, name, primary=False, timeout=1, result=True, hold=False, caller_thread=False):
+        super().__init__({"name": name, "primary": primary, "timeout": timeout}, None)
+        self.result = result
+        self.caller_thread = caller_thread
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+        self.received = []
+    
+    def send_digest(self, sections):
+        self.release.wait(10)
+        self.received.append(sections)
+        return self.result
+    
+    def send_text(self, message):
+        return self.send_digest(message)
+
+
+class NotifierDispatcherTest(unittest.TestCase):
+    
+    def dispatcher(self, *sinks):
+        dispatcher = NotifierDispatcher(list(sinks))
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+    
+    def test_all_primary_sinks_must_deliver(self):
+        teams, email = FakeSink("teams", primary=True), FakeSink("email", result=False)
+        self.assertTrue(self.dispatcher(teams, email).dispatch("send_text", "hello"))
+        failing = FakeSink("webhook", primary=True, result=False)
+        self.assertFalse(self.dispatcher(FakeSink("teams", primary=True), failing).dispatch("send_text", "x"))
+    
+    def test_slow_secondary_sink_does_not_delay_the_caller(self):
+        slow = FakeSink("email", timeout=5, hold=True)
+        started = time.time()
+        self.assertTrue(self.dispatcher(FakeSink("teams", primary=True), slow).dispatch("send_text", "x"))
+        self.assertLess(time.time() - started, 1)
+        slow.release.set()
+    
+    def test_background_sinks_run_while_the_caller_thread_sink_sends(self):
+        class SlowUiSink(FakeSink):
+            def send_digest(self, sections):
+                time.sleep(0.5)
+                return True
+        
+        ui = SlowUiSink("teams", primary=True, caller_thread=True)
+        webhook = FakeSink("webhook", primary=True, timeout=0.3, hold=True)
+        threading.Timer(0.1, webhook.release.set).start()
+        # The webhook finished within its timeout while the UI sink was still sending
+        self.assertTrue(self.dispatcher(ui, webhook).dispatch("send_text", "x"))
+    
+    def test_late_primary_sink_reports_its_outcome(self):
+        webhook = FakeSink("webhook", primary=True, timeout=0.1, hold=True)
+        outcomes = []
+        finished = threading.Event()
+        
+        def on_late(delivered):
+            outcomes.append(delivered)
+            finished.set()
+        
+        self.assertIsNone(self.dispatcher(webhook).dispatch("send_text", "x", on_late=on_late))
+        self.assertEqual(outcomes, [])
+        webhook.release.set()
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(outcomes, [True])
+        self.assertEqual(webhook.received, ["x"])
+    
+    def test_late_primary_sink_without_callback_counts_as_failed(self):
+        webhook = FakeSink("webhook", primary=True, timeout=0.1, hold=True)
+        self.assertFalse(self.dispatcher(webhook).dispatch("send_text", "x"))
+        webhook.release.set()
+    
+    def test_late_outcome_waits_for_every_late_sink(self):
+        first = FakeSink("first", primary=True, timeout=0.1, hold=True)
+        second = FakeSink("second", primary=True, timeout=0.1, hold=True, result=False)
+        outcomes = []
+        finished = threading.Event()
+        dispatcher = self.dispatcher(first, second)
+        self.assertIsNone(dispatcher.dispatch("send_text", "x",
+                                              on_late=lambda d: (outcomes.append(d), finished.set())))
+        first.release.set()
+        time.sleep(0.1)
+        self.assertEqual(outcomes, [])
+        second.release.set()
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(outcomes, [False])
+
+
+
+class EmailSinkTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.smtp = SmtpStub()
+        self.addCleanup(self.smtp.close)
+        self.settings = {"type": "email", "host": "127.0.0.1", "port": self.smtp.port, "starttls": False,
+                         "username": "", "password": "", "sender": "ticket-bot@example.com",
+                         "recipients": ["noc@example.com", "oncall@example.com"], "timeout": 5}
+    
+    def test_digest_sent_as_text_and_html(self):
+        self.assertTrue(EmailSink(self.settings, None).send_digest(SECTIONS))
+        self.assertEqual(len(self.smtp.messages), 1)
+        envelope = self.smtp.messages[0]
+        self.assertEqual(envelope["from"], "<ticket-bot@example.com>")
+        self.assertEqual(envelope["to"], ["<noc@example.com>", "<oncall@example.com>"])
+        message = email.message_from_string(envelope["data"])
+        self.assertEqual(message["Subject"], "Hi Team, We Have Unassigned Tickets")
+        self.assertEqual(message["To"], "noc@example.com, oncall@example.com")
+        parts = {part.get_content_type(): part.get_payload(decode=True).decode()
+                 for part in message.walk() if not part.is_multipart()}
+        self.assertIn("INC0012345 - Outlook crashes", parts["text/plain"])
+        self.assertIn("VPN &lt;down&gt;", parts["text/html"])
+    
+    def test_reminder_sent_as_plain_text(self):
+        self.assertTrue(EmailSink(self.settings, None).send_text("Reminder: INC0012345"))
+        message = email.message_from_string(self.smtp.messages[0]["data"])
+        self.assertEqual(message["Subject"], "Reminder: INC0012345")
+        self.assertFalse(message.is_multipart())
+    
+    def test_unreachable_server_is_a_failed_send(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            free_port = s.getsockname()[1]
+        self.settings["port"] = free_port
+        self.assertFalse(EmailSink(self.settings, None).send_text("Reminder"))
+
+
+class WebhookSinkTest(unittest.TestCase):
+    
+    def sink(self, stub, max_retries=1):
+        sink = WebhookSink({"type": "webhook", "url": stub.url, "timeout": 5, "max_retries": max_retries}, None)
+        self.addCleanup(sink.close)
+        return sink
+    
+    def test_digest_posted_as_json_event(self):
+        stub = HttpStub()
+        self.addCleanup(stub.close)
+        self.assertTrue(self.sink(stub).send_digest(SECTIONS))
+        body = stub.requests[0]["body"]
+        self.assertEqual(body["event"], "ticket_alert")
+        self.assertEqual(body["sections"], SECTIONS)
+        self.assertIn("INC0012346 - VPN <down>", body["text"])
+        self.assertEqual(stub.requests[0]["headers"]["Content-Type"], "application/json")
+    
+    def test_reminder_posted_as_json_event(self):
+        stub = HttpStub()
+        self.addCleanup(stub.close)
+        self.assertTrue(self.sink(stub).send_text("Reminder: INC0012345"))
+        self.assertEqual(stub.requests[0]["body"], {"event": "reminder", "text": "Reminder: INC0012345"})
+    
+    def test_transient_failure_retried_up_to_max_retries(self):
+        stub = HttpStub([(503, {}), (503, {}), (200, {})])
+        self.addCleanup(stub.close)
+        with mock.patch("teams_sender.time.sleep"):
+            self.assertFalse(self.sink(stub, max_retries=1).send_text("x"))
+            self.assertEqual(len(stub.requests), 2)
+            self.assertTrue(self.sink(stub, max_retries=1).send_text("x"))
+        self.assertEqual(len(stub.requests), 3)
+
+
+class CreateDispatcherTest(unittest.TestCase):
+    
+    def test_enabled_known_sinks_are_created(self):
+        stub = HttpStub()
+        self.addCleanup(stub.close)
+        team = {"sinks": [
+            {"type": "webhook", "url": stub.url, "primary": True},
+            {"type": "email", "enabled": False},
+            {"type": "pager"},
+        ]}
+        dispatcher = create_dispatcher(None, team)
+        self.addCleanup(dispatcher.close)
+        self.assertEqual([sink.name for sink in dispatcher.sinks], ["webhook"])
+        self.assertTrue(dispatcher.dispatch("send_digest", SECTIONS))
+        self.assertEqual(stub.requests[0]["body"]["event"], "ticket_alert")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for pipeline - staged processing with bounded queues
+"""
+
+import threading
+import time
+import unittest
+from pipeline import Pipeline, Stage
+
+
+THREADED = {"enabled": True, "queue_size": 2}
+INLINE = {"enabled": False, "queue_size": 2}
+
+
+def slow_double(item):
+    # Later items finish first, so ordering depends on the sequence numbers
+    time.sleep(0.002 * (10 - item % 10))
+    return item * 2
+
+
+def odd_only(item):
+    return item if item % 2 else None
+
+
+class PipelineTest(unittest.TestCase):
+    
+    def run_pipeline(self, settings, items, stages):
+        pipeline = Pipeline("test", stages, settings).start()
+        for item in items:
+            pipeline.put(item)
+        return pipeline, pipeline.close()
+    
+    def test_results_in_source_order_with_parallel_workers(self):
+        _, results = self.run_pipeline(THREADED, range(30),
+                                       [Stage("add", lambda i: i + 1, workers=3), Stage("odd", odd_only),
+                                        Stage("double", slow_double, workers=3)])
+        self.assertEqual(results, [i * 2 for i in range(1, 31, 2)])
+    
+    def test_inline_and_threaded_give_the_same_results(self):
+        stages = lambda: [Stage("add", lambda i: i + 1, workers=2), Stage("double", slow_double, workers=3)]
+        _, inline = self.run_pipeline(INLINE, range(25), stages())
+        _, threaded = self.run_pipeline(THREADED, range(25), stages())
+        self.assertEqual(inline, [(i + 1) * 2 for i in range(25)])
+        self.assertEqual(threaded, inline)
+    
+    def test_close_drains_every_stage(self):
+        pipeline, results = self.run_pipeline(THREADED, range(50),
+                                               [Stage("first", lambda i: i, workers=2),
+                                                Stage("second", slow_double, workers=2),
+                                                Stage("third", lambda i: i + 1)])
+        self.assertEqual(results, [i * 2 + 1 for i in range(50)])
+        self.assertEqual([stats["processed"] for stats in pipeline.stats().values()], [50, 50, 50])
+        self.assertTrue(all(not stage.threads for stage in pipeline.stages))
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("test-")])
+    
+    def test_dropped_and_failed_items_are_counted(self):
+        def fail_on_seven(item):
+            if item == 7:
+                raise ValueError("bad row")
+            return item
+        
+        pipeline, results = self.run_pipeline(THREADED, range(10),
+                                              [Stage("parse", fail_on_seven), Stage("odd", odd_only)])
+        self.assertEqual(results, [1, 3, 5, 9])
+        stats = pipeline.stats()
+        self.assertEqual((stats["parse"]["processed"], stats["parse"]["dropped"]), (10, 1))
+        self.assertEqual((stats["odd"]["processed"], stats["odd"]["dropped"]), (9, 5))
+    
+    def test_full_queue_blocks_the_source(self):
+        release = threading.Event()
+        
+        def wait(item):
+            release.wait(5)
+            return item
+        
+        pipeline = Pipeline("test", [Stage("wait", wait)], THREADED).start()
+        source = threading.Thread(target=lambda: [pipeline.put(i) for i in range(6)])
+        source.start()
+        source.join(0.2)
+        # One item in the worker and queue_size items queued - the source waits
+        self.assertTrue(source.is_alive())
+        release.set()
+        source.join(5)
+        self.assertEqual(pipeline.close(), list(range(6)))
+        self.assertGreater(pipeline.blocked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for utils.ScopeDetector - scope matching and its description cache
+"""
+
+import threading
+import unittest
+from unittest import mock
+import config
+
+try:
+    import pandas as pd
+    import utils
+except ImportError:
+    # utils plays sounds through winsound, which exists on Windows only
+    utils = None
+
+
+SCOPES = {
+    "DNS": ["dns-server-01", "dns-resolver-02"],
+    "PROXY": ["proxy-gateway-01"],
+}
+
+
+@unittest.skipIf(utils is None, "utils needs winsound (Windows), pandas and fuzzywuzzy")
+class ScopeDetectorTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.detector = utils.ScopeDetector({name: pd.Series(nodes) for name, nodes in SCOPES.items()})
+    
+    def test_scope_detected_and_cached(self):
+        self.assertEqual(self.detector.detect_scope("dns-server-01"), "DNS SCOPE")
+        self.assertEqual(self.detector.detect_scope("dns-server-01"), "DNS SCOPE")
+        self.assertEqual(self.detector.detect_scope("printer on floor 3"), "Unknown SCOPE")
+        self.assertEqual((self.detector.cache_hits, self.detector.cache_misses), (1, 2))
+    
+    def test_least_recently_used_description_is_evicted(self):
+        with mock.patch.object(config, "SCOPE_CACHE_SIZE", 2):
+            self.detector.detect_scope("dns-server-01")
+            self.detector.detect_scope("proxy-gateway-01")
+            self.detector.detect_scope("dns-server-01")
+            self.detector.detect_scope("printer on floor 3")
+        self.assertEqual(list(self.detector.cache), ["dns-server-01", "printer on floor 3"])
+    
+    def test_concurrent_lookups_while_evicting(self):
+        descriptions = [f"dns-server-0{i % 10}" for i in range(400)]
+        results = []
+        
+        def detect(chunk):
+            results.extend(self.detector.detect_scope(d) for d in chunk)
+        
+        with mock.patch.object(config, "SCOPE_CACHE_SIZE", 3):
+            threads = [threading.Thread(target=detect, args=(descriptions[i::4],)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(results), 400)
+        self.assertEqual(self.detector.cache_hits + self.detector.cache_misses, 400)
+        self.assertLessEqual(len(self.detector.cache), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
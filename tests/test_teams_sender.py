@@ -0,0 +1,95 @@
+"""
+Tests for teams_sender - HTTP delivery with retry, backoff and Retry-After
+"""
+
+import unittest
+from unittest import mock
+from teams_sender import WebhookSender, GraphChatSender, format_alert_html
+from tests.stubs import HttpStub
+
+
+SETTINGS = {"timeout": 5, "max_retries": 2, "backoff_factor": 0, "pool_size": 1}
+
+SECTIONS = [{"greeting": "Hi Team", "important": ["INC0001  : 1 - Critical"],
+             "normal": ["INC0002  : 4 - Low"], "total_count": "2"}]
+
+
+class HttpSenderTest(unittest.TestCase):
+    
+    def sender(self, responses, settings=SETTINGS):
+        self.stub = HttpStub(responses)
+        self.addCleanup(self.stub.close)
+        sender = WebhookSender(self.stub.url, settings)
+        self.addCleanup(sender.close)
+        return sender
+    
+    def test_delivers_digest_as_one_card(self):
+        sender = self.sender([(200, {})])
+        self.assertTrue(sender.send_digest(SECTIONS))
+        self.assertEqual(len(self.stub.requests), 1)
+        card = self.stub.requests[0]["body"]
+        self.assertEqual(card["@type"], "MessageCard")
+        self.assertIn("**INC0001  : 1 - Critical**", card["text"])
+        self.assertIn("INC0002", card["text"])
+    
+    def test_retries_server_errors(self):
+        sender = self.sender([(503, {}), (502, {}), (200, {})])
+        self.assertTrue(sender.send_text("reminder"))
+        self.assertEqual(len(self.stub.requests), 3)
+    
+    def test_gives_up_after_max_retries(self):
+        sender = self.sender([(500, {})])
+        self.assertFalse(sender.send_text("reminder"))
+        self.assertEqual(len(self.stub.requests), SETTINGS["max_retries"] + 1)
+    
+    def test_does_not_retry_client_errors(self):
+        sender = self.sender([(400, {}), (200, {})])
+        self.assertFalse(sender.send_text("reminder"))
+        self.assertEqual(len(self.stub.requests), 1)
+    
+    def test_backoff_doubles_between_attempts(self):
+        sender = self.sender([(500, {})], dict(SETTINGS, backoff_factor=1))
+        with mock.patch("teams_sender.time.sleep") as sleep:
+            self.assertFalse(sender.send_text("reminder"))
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1, 2])
+    
+    def test_honours_retry_after_on_429(self):
+        sender = self.sender([(429, {"Retry-After": "7"}), (200, {})], dict(SETTINGS, backoff_factor=1))
+        with mock.patch("teams_sender.time.sleep") as sleep:
+            self.assertTrue(sender.send_text("reminder"))
+        sleep.assert_called_once_with(7)
+        self.assertEqual(len(self.stub.requests), 2)
+    
+    def test_unreachable_endpoint_fails_after_retries(self):
+        stub = HttpStub()
+        url = stub.url
+        stub.close()
+        sender = WebhookSender(url, SETTINGS)
+        self.addCleanup(sender.close)
+        self.assertFalse(sender.send_text("reminder"))
+    
+    def test_graph_sender_posts_html_with_token(self):
+        self.stub = HttpStub([(201, {})])
+        self.addCleanup(self.stub.close)
+        base = self.stub.url.rsplit("/", 1)[0]
+        with mock.patch("config.GRAPH_API_URL", base):
+            sender = GraphChatSender("chat-1", "secret", SETTINGS)
+        self.addCleanup(sender.close)
+        self.assertTrue(sender.send_digest(SECTIONS))
+        request = self.stub.requests[0]
+        self.assertEqual(request["path"], "/chats/chat-1/messages")
+        self.assertEqual(request["headers"]["Authorization"], "Bearer secret")
+        self.assertEqual(request["body"]["body"]["contentType"], "html")
+        self.assertIn("<b>", request["body"]["body"]["content"])
+
+
+class FormatTest(unittest.TestCase):
+    
+    def test_alert_html_escapes_and_keeps_padding(self):
+        text = format_alert_html("Hi <team>", [], ["INC1  : a&b"], 1)
+        self.assertIn("Hi &lt;team&gt;", text)
+        self.assertIn("INC1 &nbsp;: a&amp;b", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
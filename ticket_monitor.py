@@ -6,6 +6,7 @@ Developer: Prasob G Nath
 GitHub: github.com/Prasobgnath
 """
 
+import logging
 import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,19 +20,30 @@ from utils import (
     LogManager, ScopeDetector, get_instance_name, 
     format_ticket_display, format_ticket_for_teams, get_greeting_message
 )
+from queue_registry import get_registry, fingerprint_tickets
+from metrics import metrics
+from tracing import tracer, traced
+from event_log import log_event
+from pipeline import Pipeline, Stage
 
 
 class TicketMonitor:
     """Monitors ServiceNow tickets and manages data collection"""
     
-    def __init__(self, browser_manager, log_manager, scope_detector, teams_messenger):
+    def __init__(self, browser_manager, log_manager, scope_detector, teams):
         self.browser = browser_manager
         self.driver = browser_manager.get_driver()
         self.wait = browser_manager.get_wait()
         self.log_manager = log_manager
         self.scope_detector = scope_detector
-        self.teams_messenger = teams_messenger
-        self.scraped_tickets = []
+        self.teams = teams
+        self.pages = 0
+        self.labels = {}
+        self.ticket_fields = {}
+        
+        # Any messenger can park the shared browser on Teams; prefer one that delivers through it
+        self.teams_messenger = next(
+            (team.messenger for team in teams if team.messenger.uses_browser()), teams[0].messenger)
     
     def check_if_empty(self):
         """
@@ -48,6 +60,7 @@ class TicketMonitor:
         except (NoSuchElementException, AttributeError):
             return False
     
+    @traced("snow.total_count")
     def get_total_count(self):
         """
         Get total count of tickets in queue
@@ -60,7 +73,7 @@ class TicketMonitor:
                 (By.CSS_SELECTOR, config.CSS_SELECTORS["total_rows"])))
             return self.driver.execute_script("return arguments[0].textContent;", total_element)
         except Exception as e:
-            print(f"Error getting total count: {e}")
+            log_event("error", f"Error getting total count: {e}", logging.WARNING, step="total_count")
             return "0"
     
     def navigate_to_first_page(self):
@@ -73,7 +86,118 @@ class TicketMonitor:
         except ElementClickInterceptedException:
             pass
         except Exception as e:
-            print(f"Error navigating to first page: {e}")
+            log_event("error", f"Error navigating to first page: {e}", logging.WARNING, step="first_page")
+    
+    def build_pipeline(self, url):
+        """
+        Build the ticket pipeline: normalise, detect scope, write the log, aggregate alerts
+        
+        The caller is the source and puts extracted tickets in; the stages run on
+        their own threads (PIPELINE), so scope matching and Excel writes overlap
+        with reading the next rows.
+        
+        Args:
+            url: str - current URL for instance detection
+        
+        Returns:
+            Pipeline - started pipeline, finish it with collect_tickets()
+        """
+        instance = get_instance_name(url)
+        log_unique_ids = self.log_manager.get_unique_ids()
+        
+        def normalise(ticket):
+            ticket = {key: value.strip() if isinstance(value, str) else value
+                      for key, value in ticket.items()}
+            if not ticket['number']:
+                return None
+            ticket['logged'] = ticket['number'] in log_unique_ids
+            return ticket
+        
+        def detect_scope(ticket):
+            ticket['scope'] = self.scope_detector.detect_scope(ticket['short_description'])
+            return ticket
+        
+        def write_log(ticket):
+            # Log ticket if not already logged
+            if not ticket['logged']:
+                self.log_manager.log_ticket(ticket, instance)
+            return ticket
+        
+        def aggregate(ticket):
+            fields = {
+                'number': ticket['number'],
+                'priority': ticket['priority'],
+                'state': ticket['state'],
+                'assignment_group': ticket['assignment_group'],
+                'assigned_to': ticket['assigned_to'],
+                'scope': ticket['scope'],
+                'logged': ticket['logged'],
+            }
+            alert = None
+            # Process unassigned tickets (check assignment_group)
+            if "(empty)" in ticket['assigned_to']:
+                alert = {
+                    'number': ticket['number'],
+                    'formatted': format_ticket_for_teams(ticket, ticket['scope']),
+                    # Critical/High tickets are sent in bold
+                    'important': ("1 - Critical" in ticket['priority'] or
+                                  "2 - High" in ticket['priority']),
+                    'logged': ticket['logged'],
+                }
+            return format_ticket_display(ticket, ticket['scope']), fields, alert
+        
+        settings = config.PIPELINE
+        return Pipeline("tickets", [
+            Stage("normalise", normalise),
+            Stage("scope", detect_scope, settings["scope_workers"]),
+            # One writer - the Excel log is rewritten as a whole on every append
+            Stage("log", write_log),
+            Stage("aggregate", aggregate),
+        ]).start()
+    
+    def collect_tickets(self, pipeline, rows):
+        """
+        Finish a ticket pipeline and categorise its output
+        
+        Args:
+            pipeline: Pipeline - pipeline from build_pipeline()
+            rows: int - rows fed into the pipeline
+        
+        Returns:
+            tuple - (ticket_data_list, unassigned_list) where unassigned_list holds dicts
+                    with number, formatted, important and logged keys
+        """
+        ticket_data = []
+        unassigned = []
+        seen = set()
+        for display_string, fields, alert in pipeline.close():
+            # Skip if already in data
+            if display_string in seen:
+                continue
+            seen.add(display_string)
+            ticket_data.append(display_string)
+            self.ticket_fields[display_string] = fields
+            if alert:
+                unassigned.append(alert)
+        
+        metrics.inc("bot_rows_parsed_total", rows)
+        return ticket_data, unassigned
+    
+    def process_tickets(self, url, tickets):
+        """
+        Detect scope, log and categorise extracted tickets
+        
+        Args:
+            url: str - current URL for instance detection
+            tickets: list - ticket dicts (number, short_description, priority, ...)
+            
+        Returns:
+            tuple - see collect_tickets
+        """
+        pipeline = self.build_pipeline(url)
+        for ticket in tickets:
+            pipeline.put(ticket)
+        return self.collect_tickets(pipeline, len(tickets))
     
     def read_table_rows(self, url, column_config):
         """
@@ -84,11 +208,13 @@ class TicketMonitor:
             column_config: dict - column mappings for data extraction
             
         Returns:
-            tuple - (ticket_data_list, important_list, normal_list)
+            tuple - (ticket_data_list, unassigned_list, complete) - see process_tickets;
+                    complete is False if the page could not be read in full
         """
-        ticket_data = []
-        important_list = []
-        normal_list = []
+        # Rows are processed by the pipeline while the next ones are read
+        pipeline = self.build_pipeline(url)
+        count = 0
+        complete = True
         
         try:
             tbody = self.wait.until(EC.presence_of_element_located(
@@ -96,70 +222,52 @@ class TicketMonitor:
             rows = tbody.find_elements(By.TAG_NAME, "tr")
             time.sleep(3)
             
-            instance = get_instance_name(url)
-            log_unique_ids = self.log_manager.get_unique_ids()
-            
             for row in rows:
                 try:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    
-                    # Extract ticket data based on column configuration
-                    ticket = {
-                        'number': cells[column_config['chg_number'] if 'chg_number' in column_config 
-                                       else column_config['inc_number']].text.strip(),
-                        'short_description': cells[column_config['short_description']].text.strip(),
-                        'affected_user': cells[column_config['affected_user']].text.strip(),
-                        'priority': cells[column_config['priority']].text.strip(),
-                        'state': cells[column_config['state']].text.strip(),
-                        'assignment_group': cells[column_config['assignment_group']].text.strip(),
-                        'assigned_to': cells[column_config['assigned_to']].text.strip(),
-                        'type': cells[column_config['type']].text.strip(),
-                        'updated': cells[column_config['updated']].text.strip(),
-                    }
-                    
-                    # Detect scope for this ticket
-                    scope = self.scope_detector.detect_scope(ticket['short_description'])
-                    
-                    # Log ticket if not already logged
-                    if ticket['number'] not in log_unique_ids:
-                        self.log_manager.log_ticket(ticket, instance)
-                    
-                    # Format display string with scope
-                    display_string = format_ticket_display(ticket, scope)
-                    
-                    # Skip if already in data
-                    if display_string in ticket_data:
-                        continue
-                    
-                    ticket_data.append(display_string)
-                    
-                    # Process unassigned tickets (check assignment_group)
-                    if "(empty)" in ticket['assigned_to']:
-                        formatted = format_ticket_for_teams(ticket, scope)
-                        
-                        # Categorize by priority
-                        if "1 - Critical" in ticket['priority'] and ticket['number'] not in log_unique_ids:
-                            if formatted not in important_list:
-                                important_list.append(formatted)
-                        elif "2 - High" in ticket['priority'] and ticket['number'] not in log_unique_ids:
-                            if formatted not in important_list:
-                                important_list.append(formatted)
-                        else:
-                            if ticket['number'] not in log_unique_ids and formatted not in normal_list:
-                                if formatted not in important_list:
-                                    normal_list.append(formatted)
+                    pipeline.put(self.read_row(row, column_config))
+                    count += 1
                 
                 except IndexError:
                     # Skip rows with insufficient columns
                     continue
                 except Exception as e:
-                    print(f"Error processing row: {e}")
+                    log_event("error", f"Error processing row: {e}", logging.WARNING, step="row")
+                    complete = False
                     continue
             
         except Exception as e:
-            print(f"Error reading table rows: {e}")
+            log_event("error", f"Error reading table rows: {e}", logging.WARNING, step="rows")
+            complete = False
+        
+        return self.collect_tickets(pipeline, count) + (complete,)
+    
+    @traced("snow.row")
+    def read_row(self, row, column_config):
+        """
+        Extract one ticket from a list row
+        
+        Args:
+            row: WebElement - table row
+            column_config: dict - column mappings for data extraction
+            
+        Returns:
+            dict - ticket fields (raises IndexError for rows with insufficient columns)
+        """
+        cells = row.find_elements(By.TAG_NAME, "td")
         
-        return ticket_data, important_list, normal_list
+        # Extract ticket data based on column configuration
+        return {
+            'number': cells[column_config['chg_number'] if 'chg_number' in column_config 
+                           else column_config['inc_number']].text.strip(),
+            'short_description': cells[column_config['short_description']].text.strip(),
+            'affected_user': cells[column_config['affected_user']].text.strip(),
+            'priority': cells[column_config['priority']].text.strip(),
+            'state': cells[column_config['state']].text.strip(),
+            'assignment_group': cells[column_config['assignment_group']].text.strip(),
+            'assigned_to': cells[column_config['assigned_to']].text.strip(),
+            'type': cells[column_config['type']].text.strip(),
+            'updated': cells[column_config['updated']].text.strip(),
+        }
     
     def paginate_and_collect(self, url, column_config):
         """
@@ -170,11 +278,14 @@ class TicketMonitor:
             column_config: dict - column mappings
             
         Returns:
-            tuple - (all_ticket_data, all_important, all_normal)
+            tuple - (all_ticket_data, all_unassigned, complete) - complete is False if a page
+                    failed or pagination stopped early (the tickets are only part of the queue)
         """
         all_ticket_data = []
-        all_important = []
-        all_normal = []
+        all_unassigned = []
+        seen_numbers = set()
+        complete = False
+        pages_complete = True
         
         try:
             # Get pagination elements
@@ -186,23 +297,24 @@ class TicketMonitor:
                     time.sleep(5)
                     
                     # Read current page
-                    tickets, important, normal = self.read_table_rows(url, column_config)
+                    with tracer.span("snow.page", page=self.pages + 1):
+                        tickets, unassigned, page_complete = self.read_table_rows(url, column_config)
+                    self.pages += 1
+                    pages_complete = pages_complete and page_complete
                     
                     # Merge results
                     for t in tickets:
                         if t not in all_ticket_data:
                             all_ticket_data.append(t)
                     
-                    for i in important:
-                        if i not in all_important:
-                            all_important.append(i)
-                    
-                    for n in normal:
-                        if n not in all_normal:
-                            all_normal.append(n)
+                    for u in unassigned:
+                        if u['number'] not in seen_numbers:
+                            seen_numbers.add(u['number'])
+                            all_unassigned.append(u)
                     
                     # Check if next button is enabled
                     if not next_button.is_enabled():
+                        complete = pages_complete
                         break
                     
                     next_button.click()
@@ -213,120 +325,299 @@ class TicketMonitor:
                         (By.XPATH, config.SNOW_XPATHS["next_page"])))
                     
                 except StaleElementReferenceException:
-                    print("Stale element exception - refreshing page")
+                    log_event("error", "Stale element exception - refreshing page", logging.WARNING, step="pagination")
                     self.driver.refresh()
                     time.sleep(10)
                     break
                 except Exception as e:
-                    print(f"Error during pagination: {e}")
+                    log_event("error", f"Error during pagination: {e}", logging.WARNING, step="pagination")
                     break
         
         except Exception as e:
-            print(f"Error in pagination setup: {e}")
+            log_event("error", f"Error in pagination setup: {e}", logging.WARNING, step="pagination")
         
-        return all_ticket_data, all_important, all_normal
+        if not complete:
+            log_event("queue.partial", "Queue not read in full - tracked tickets are kept this cycle",
+                      logging.WARNING, **self.labels)
+        return all_ticket_data, all_unassigned, complete
     
-    def monitor_tickets(self, url, column_config):
+    def handle_empty_queue(self, url):
         """
-        Main monitoring function for tickets
+        Record that a queue has no tickets
         
         Args:
-            url: str - ServiceNow URL to monitor
-            column_config: dict - column mappings (INCIDENT_COLUMNS or CHANGE_COLUMNS)
+            url: str - ServiceNow URL of the queue
+        """
+        log_event("queue.empty", "No tickets in queue", **self.labels)
+        metrics.set("bot_queue_tickets", 0, **self.labels)
+        metrics.set("bot_queue_unassigned", 0, **self.labels)
+        queue = get_registry().get(url)
+        if queue:
+            queue.record_contents(fingerprint_tickets([]), 0)
+        for team in self.teams:
+            team.messenger.alert_tracker.sync_queue(url, [])
+        self.teams_messenger.return_to_teams()
+    
+    @traced("snow.api_fetch")
+    def fetch_from_api(self, url):
         """
+        Collect tickets through the ServiceNow Table API using the browser's exported login
+        
+        Args:
+            url: str - ServiceNow URL of the queue
+            
+        Returns:
+            tuple - (total_count, all_ticket_data, all_unassigned), or None to use the browser
+                    (client disabled, request failed or more records than one fetch returns)
+        """
+        client = self.browser.snow_client
+        if not client:
+            return None
+        
+        fetched = client.fetch_list(url)
+        if fetched is None:
+            log_event("queue.fallback", "Table API fetch failed - loading the list in the browser instead")
+            return None
+        
+        total_count, tickets = fetched
         try:
-            # Navigate to URL with retry
-            retry_count = 0
-            while retry_count < 3:
+            if int(str(total_count).replace(",", "")) > len(tickets):
+                log_event("queue.fallback", "Table API result is truncated - loading the list in the browser instead")
+                return None
+        except ValueError:
+            pass
+        
+        ticket_data, unassigned = self.process_tickets(url, tickets)
+        return total_count, ticket_data, unassigned
+    
+    @traced("snow.capture")
+    def collect_from_capture(self, url, column_config):
+        """
+        Collect tickets from the list response captured during page load
+        
+        Args:
+            url: str - current URL
+            column_config: dict - column mappings
+            
+        Returns:
+            tuple - (total_count, all_ticket_data, all_unassigned), or None to fall back to
+                    DOM scraping (capture disabled, nothing captured or more than one page)
+        """
+        capture = self.browser.list_capture
+        if not capture:
+            return None
+        
+        self.browser.poll_performance_log()
+        decoded = capture.collect(self.driver, column_config)
+        if decoded is None:
+            log_event("queue.fallback", "No list response captured - reading the page instead")
+            return None
+        
+        total_count, tickets = decoded
+        try:
+            if int(str(total_count).replace(",", "")) > len(tickets):
+                log_event("queue.fallback", "Captured list is paginated - reading the page instead")
+                return None
+        except ValueError:
+            pass
+        
+        ticket_data, unassigned = self.process_tickets(url, tickets)
+        return total_count, ticket_data, unassigned
+    
+    def load_list(self, url):
+        """
+        Show a queue's list in the browser (in place when possible, otherwise by full navigation)
+        
+        Args:
+            url: str - ServiceNow URL to load
+            
+        Returns:
+            bool - True if the list was refreshed in place (the Polaris shell was already loaded)
+        """
+        # Use the queue's own tab if it has one, otherwise the ServiceNow tab
+        tab = self.browser.switch_to_queue(url)
+        if tab is None:
+            self.browser.switch_to_snow()
+        
+        # Start capturing list responses for this visit only
+        if self.browser.list_capture:
+            self.browser.poll_performance_log()
+            self.browser.list_capture.reset()
+        
+        # Reload only the list iframe when this instance's shell is already open
+        in_place = (tab is None or tab["ready"]) and self.browser.refresh_list_in_place(url)
+        loaded = in_place
+        
+        # Navigate to URL with retry
+        retry_count = 0
+        while not loaded and retry_count < 3:
+            with tracer.span("snow.load", attempt=retry_count + 1):
                 try:
                     self.driver.get(url)
                     time.sleep(config.TIMEOUTS["page_load"])
                     
                     # Verify shadow root is accessible
                     self.driver.execute_script(config.SNOW_XPATHS["shadow_root"])
-                    break
+                    loaded = True
                 except JavascriptException:
-                    print("Network error - refreshing window")
+                    log_event("error", "Network error - refreshing window", logging.WARNING, step="load")
                     self.driver.refresh()
                     retry_count += 1
                     time.sleep(5)
+        
+        if tab is not None:
+            tab["ready"] = loaded
+        
+        return in_place
+    
+    def route_alerts(self, team, url, unassigned, total_count, complete=True):
+        """
+        Update one team's alert state for a queue and send or queue its alerts
+        
+        Args:
+            team: Team - team watching the queue
+            url: str - ServiceNow URL of the queue
+            unassigned: list - unassigned ticket dicts from process_tickets
+            total_count: str - total tickets in the queue
+            complete: bool - False after a partial scrape (tracked tickets are not evicted)
+        """
+        messenger = team.messenger
+        tracker = messenger.alert_tracker
+        new_alerts = tracker.sync_queue(url, unassigned, complete=complete)
+        if new_alerts:
+            metrics.inc("bot_new_tickets_total", len(new_alerts), team=team.name)
+        
+        if not config.ENABLE_TEAMS_MESSAGING:
+            if new_alerts:
+                log_event("alerts.disabled", "Teams messaging disabled - alerts logged but not sent to Teams",
+                          team=team.name, count=len(new_alerts))
+            messenger.return_to_teams()
+        
+        # Queue for the end-of-cycle digest instead of sending right away
+        elif team.notification_queue:
+            if new_alerts:
+                team.notification_queue.add(url, new_alerts, total_count)
+                log_event("alerts.queued",
+                          f"{len(new_alerts)} new unassigned ticket(s) queued for the cycle digest ({team.name})",
+                          team=team.name, count=len(new_alerts))
+        
+        # Send message for new tickets, otherwise remind about this queue's open ones
+        elif new_alerts:
+            messenger.alert_new_tickets([{
+                "greeting": get_greeting_message(url),
+                "alerts": new_alerts,
+                "total_count": total_count,
+            }])
+        else:
+            due = tracker.due_reminders(queue=url)
+            if due:
+                messenger.send_reminder(due)
+            else:
+                messenger.return_to_teams()
+    
+    def monitor_tickets(self, url, column_config):
+        """
+        Main monitoring function for tickets
+        
+        Args:
+            url: str - ServiceNow URL to monitor
+            column_config: dict - column mappings (INCIDENT_COLUMNS or CHANGE_COLUMNS)
+        """
+        queue = get_registry().get(url)
+        labels = self.labels = {"queue": queue.name if queue else url, "instance": get_instance_name(url)}
+        started = time.time()
+        try:
+            # Read the queue over the Table API when enabled - nothing is rendered
+            captured = self.fetch_from_api(url)
+            in_place = False
+            if not captured:
+                in_place = self.load_list(url)
+                
+                # Decode the list from the captured network response when possible
+                captured = self.collect_from_capture(url, column_config)
+            complete = True
+            if captured:
+                # API and captured responses hold the whole queue in one page
+                self.pages = 1
+                total_count, all_tickets, unassigned = captured
+                if not all_tickets:
+                    self.handle_empty_queue(url)
+                    return
+            else:
+                # Switch to iframe
+                if not self.browser.switch_to_snow_iframe(wait_for_shell=not in_place):
+                    log_event("error", "Failed to switch to iframe", logging.WARNING, step="iframe", **labels)
+                    return
+                
+                # Check if queue is empty
+                if self.check_if_empty():
+                    self.handle_empty_queue(url)
+                    return
+                
+                # Get total count
+                total_count = self.get_total_count()
+                
+                # Navigate to first page
+                self.navigate_to_first_page()
+                
+                # Collect all ticket data
+                all_tickets, unassigned, complete = self.paginate_and_collect(url, column_config)
+                
+                # Navigate back to first page
+                self.navigate_to_first_page()
             
-            # Switch to iframe
-            if not self.browser.switch_to_snow_iframe():
-                print("Failed to switch to iframe")
-                return
-            
-            # Check if queue is empty
-            if self.check_if_empty():
-                print("No tickets in queue")
-                self.teams_messenger.navigate_to_teams()
-                return
-            
-            # Get total count
-            total_count = self.get_total_count()
-            print(f"Total Tickets Open: {total_count}\n")
-            
-            # Print header
-            print("{:<11} : {:<15} : {:<15} : {:<20} : {:<20} : {:<15} : {} ".format(
-                "Number", "Priority", "State", "Assignment Group", "Assigned_to", "Scope", "Short Description"))
-            
-            # Navigate to first page
-            self.navigate_to_first_page()
-            
-            # Collect all ticket data
-            all_tickets, important_list, normal_list = self.paginate_and_collect(url, column_config)
+            metrics.set("bot_queue_pages", self.pages, **labels)
+            metrics.set("bot_queue_tickets", len(all_tickets), **labels)
+            metrics.set("bot_queue_unassigned", len(unassigned), **labels)
+            log_event("queue.total", f"Total Tickets Open: {total_count}\n", total=total_count, **labels)
             
-            # Navigate back to first page
-            self.navigate_to_first_page()
+            # An unchanged queue (also across a restart, via the checkpoint) is not listed again;
+            # a partial scrape is listed but does not replace the recorded contents
+            fields = [self.ticket_fields[ticket] for ticket in all_tickets if ticket in self.ticket_fields]
+            changed = True
+            if queue and complete:
+                changed = queue.record_contents(fingerprint_tickets(fields), len(all_tickets))
+            if changed:
+                log_event("queue.header", "{:<11} : {:<15} : {:<15} : {:<20} : {:<20} : {:<15} : {} ".format(
+                    "Number", "Priority", "State", "Assignment Group", "Assigned_to", "Scope", "Short Description"))
+            else:
+                log_event("queue.unchanged", f"Queue unchanged since last scan ({len(all_tickets)} tickets)",
+                          fingerprint=queue.fingerprint, **labels)
             
-            # Print collected tickets
+            # Collected tickets
             hold_count = 0
             assigned_count = 0
             
             for ticket in all_tickets:
-                print(ticket)
+                if changed:
+                    log_event("ticket", ticket, queue=labels["queue"], **self.ticket_fields.get(ticket, {}))
                 if "On Hold" in ticket:
                     hold_count += 1
                 if "Assigned" in ticket:
                     assigned_count += 1
             
-            not_assigned_count = len(important_list) + len(normal_list)
-            print(f"Total INC Captured = {len(all_tickets)}, On Hold = {hold_count}, "
-                  f"Assigned = {assigned_count}, Not Assigned = {not_assigned_count}")
-            print(" ")
+            log_event("queue.summary",
+                      f"Total INC Captured = {len(all_tickets)}, On Hold = {hold_count}, "
+                      f"Assigned = {assigned_count}, Not Assigned = {len(unassigned)}\n",
+                      captured=len(all_tickets), on_hold=hold_count, assigned=assigned_count,
+                      unassigned=len(unassigned), pages=self.pages, **labels)
             
-            # Add to scraped list
-            for ticket in important_list + normal_list:
-                if ticket not in self.scraped_tickets:
-                    self.scraped_tickets.append(ticket)
-            
-            # Send message if there are unassigned tickets
-            if important_list or normal_list:
-                action = self.teams_messenger.should_send_message(self.scraped_tickets)
-                greeting = get_greeting_message(url)
-                
-                if config.ENABLE_TEAMS_MESSAGING:
-                    if action == "new":
-                        self.teams_messenger.send_ticket_alert(
-                            greeting, important_list, normal_list, total_count)
-                    elif action == "reminder":
-                        is_final = (self.teams_messenger.reminder_count == config.MAX_REMINDER_COUNT)
-                        self.teams_messenger.send_reminder(is_final)
-                    else:
-                        print("Reminder limit reached - no message sent")
-                else:
-                    print("Teams messaging disabled - alerts logged but not sent to Teams")
-                    self.teams_messenger.navigate_to_teams()
-            else:
-                self.teams_messenger.navigate_to_teams()
+            # Update each watching team's alert state; assigned/resolved tickets drop out here
+            for team in self.teams:
+                self.route_alerts(team, url, unassigned, total_count, complete)
         
         except (JavascriptException, TimeoutException, NameError, 
                 WebDriverException, UnicodeDecodeError, UnicodeEncodeError) as e:
-            print(f"Error in ticket monitoring: {e}")
+            log_event("error", f"Error in ticket monitoring: {e}", logging.ERROR, step="monitor", **labels)
+            metrics.inc("bot_scrape_errors_total", **labels)
             time.sleep(3)
+        
+        finally:
+            metrics.observe("bot_queue_scrape_seconds", time.time() - started, **labels)
+            metrics.heartbeat()
 
 
-def monitor_incident(browser_manager, log_manager, scope_detector, teams_messenger, url):
+def monitor_incident(browser_manager, log_manager, scope_detector, teams, url):
     """
     Monitor incidents using INCIDENT_COLUMNS configuration
     
@@ -334,14 +625,17 @@ def monitor_incident(browser_manager, log_manager, scope_detector, teams_messeng
         browser_manager: BrowserManager instance
         log_manager: LogManager instance
         scope_detector: ScopeDetector instance
-        teams_messenger: TeamsMessenger instance
+        teams: list - Team instances that receive this queue's alerts
         url: str - incident URL to monitor
     """
-    monitor = TicketMonitor(browser_manager, log_manager, scope_detector, teams_messenger)
-    monitor.monitor_tickets(url, config.INCIDENT_COLUMNS)
+    monitor = TicketMonitor(browser_manager, log_manager, scope_detector, teams)
+    queue = get_registry().get(url)
+    with tracer.span("queue", queue=queue.name if queue else url):
+        monitor.monitor_tickets(url, queue.columns if queue else config.INCIDENT_COLUMNS)
+    browser_manager.report_resource_savings()
 
 
-def monitor_change(browser_manager, log_manager, scope_detector, teams_messenger, url):
+def monitor_change(browser_manager, log_manager, scope_detector, teams, url):
     """
     Monitor changes/change tasks using CHANGE_COLUMNS configuration
     
@@ -349,8 +643,11 @@ def monitor_change(browser_manager, log_manager, scope_detector, teams_messenger
         browser_manager: BrowserManager instance
         log_manager: LogManager instance
         scope_detector: ScopeDetector instance
-        teams_messenger: TeamsMessenger instance
+        teams: list - Team instances that receive this queue's alerts
         url: str - change URL to monitor
     """
-    monitor = TicketMonitor(browser_manager, log_manager, scope_detector, teams_messenger)
-    monitor.monitor_tickets(url, config.CHANGE_COLUMNS)
+    monitor = TicketMonitor(browser_manager, log_manager, scope_detector, teams)
+    queue = get_registry().get(url)
+    with tracer.span("queue", queue=queue.name if queue else url):
+        monitor.monitor_tickets(url, queue.columns if queue else config.CHANGE_COLUMNS)
+    browser_manager.report_resource_savings()
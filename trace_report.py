@@ -0,0 +1,173 @@
+"""
+Trace Report for Ticket Monitoring Bot
+Summarises the cycle traces written by tracing.py: critical path and top time sinks
+
+Usage:
+    python trace_report.py                 # last 20 cycles in config.TRACING["directory"]
+    python trace_report.py -n 50           # last 50 cycles
+    python trace_report.py -d path\\to\\traces -t 15
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import argparse
+import json
+import os
+from collections import Counter, defaultdict
+import config
+
+
+def load_traces(directory, cycles):
+    """
+    Load the newest cycle traces
+    
+    Args:
+        directory: str - trace directory
+        cycles: int - number of cycles to load
+    
+    Returns:
+        list - trace dicts, oldest first
+    """
+    files = sorted(f for f in os.listdir(directory) if f.startswith("cycle_") and f.endswith(".json"))
+    traces = []
+    for name in files[-cycles:]:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                traces.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Skipping {name}: {e}")
+    return traces
+
+
+def self_times(spans):
+    """
+    Compute each span's self time (duration minus time spent in its children)
+    
+    Args:
+        spans: list - span dicts of one cycle
+    
+    Returns:
+        dict - span id -> self time in seconds
+    """
+    child_time = defaultdict(float)
+    for span in spans:
+        if span["parent"] is not None:
+            child_time[span["parent"]] += span["duration"]
+    return {span["id"]: max(span["duration"] - child_time[span["id"]], 0.0) for span in spans}
+
+
+def critical_path(spans):
+    """
+    Follow the longest child from the cycle span down to a leaf
+    
+    Args:
+        spans: list - span dicts of one cycle
+    
+    Returns:
+        list - spans on the path, root first
+    """
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        if span["parent"] is None:
+            roots.append(span)
+        else:
+            children[span["parent"]].append(span)
+    if not roots:
+        return []
+    
+    path = [max(roots, key=lambda s: s["duration"])]
+    while children[path[-1]["id"]]:
+        path.append(max(children[path[-1]["id"]], key=lambda s: s["duration"]))
+    return path
+
+
+def span_label(span):
+    """Span name with its queue (if any) for display"""
+    queue = span.get("attrs", {}).get("queue")
+    return f"{span['name']} [{queue}]" if queue else span["name"]
+
+
+def report(traces, top):
+    """
+    Print the critical path and the top time sinks over the given cycles
+    
+    Args:
+        traces: list - trace dicts
+        top: int - number of time sinks to show
+    """
+    total_cycle_time = 0.0
+    totals = defaultdict(lambda: {"count": 0, "total": 0.0, "self": 0.0})
+    paths = Counter()
+    path_times = defaultdict(lambda: defaultdict(float))
+    slowest = None
+    
+    for trace in traces:
+        spans = trace["spans"]
+        selfs = self_times(spans)
+        for span in spans:
+            if span["name"] == "cycle":
+                total_cycle_time += span["duration"]
+                if slowest is None or span["duration"] > slowest[1]:
+                    slowest = (trace["cycle"], span["duration"], spans)
+                continue
+            entry = totals[span["name"]]
+            entry["count"] += 1
+            entry["total"] += span["duration"]
+            entry["self"] += selfs[span["id"]]
+        
+        path = critical_path(spans)
+        key = tuple(span_label(s) for s in path)
+        paths[key] += 1
+        for label, span in zip(key, path):
+            path_times[key][label] += span["duration"]
+    
+    print(f"Cycles analysed: {len(traces)}   total cycle time: {total_cycle_time:.1f} s\n")
+    
+    if paths:
+        key, count = paths.most_common(1)[0]
+        print(f"Most common critical path ({count}/{len(traces)} cycles, mean seconds):")
+        for depth, label in enumerate(key):
+            print(f"  {'  ' * depth}{label:<{60 - 2 * depth}} {path_times[key][label] / count:>9.3f}")
+        print()
+    
+    if slowest:
+        cycle, duration, spans = slowest
+        print(f"Slowest cycle #{cycle} ({duration:.1f} s) critical path:")
+        for depth, span in enumerate(critical_path(spans)):
+            print(f"  {'  ' * depth}{span_label(span):<{60 - 2 * depth}} {span['duration']:>9.3f}")
+        print()
+    
+    print(f"Top {top} time sinks by self time:")
+    print("{:<28} {:>8} {:>11} {:>11} {:>10} {:>7}".format(
+        "Span", "Count", "Self (s)", "Total (s)", "Mean (ms)", "Share"))
+    ranked = sorted(totals.items(), key=lambda item: item[1]["self"], reverse=True)[:top]
+    for name, entry in ranked:
+        share = entry["self"] / total_cycle_time * 100 if total_cycle_time else 0
+        print("{:<28} {:>8} {:>11.2f} {:>11.2f} {:>10.1f} {:>6.1f}%".format(
+            name, entry["count"], entry["self"], entry["total"],
+            entry["total"] / entry["count"] * 1000, share))
+
+
+def main():
+    """Parse arguments and print the report"""
+    parser = argparse.ArgumentParser(description="Summarise Ticket Monitoring Bot cycle traces")
+    parser.add_argument("-d", "--directory", default=config.TRACING["directory"], help="trace directory")
+    parser.add_argument("-n", "--cycles", type=int, default=20, help="number of newest cycles to analyse")
+    parser.add_argument("-t", "--top", type=int, default=10, help="number of time sinks to show")
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.directory):
+        print(f"No trace directory {args.directory} - enable TRACING in config.py and run the bot")
+        return
+    
+    traces = load_traces(args.directory, args.cycles)
+    if not traces:
+        print(f"No cycle traces in {args.directory}")
+        return
+    report(traces, args.top)
+
+
+if __name__ == "__main__":
+    main()
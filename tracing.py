@@ -0,0 +1,211 @@
+"""
+Tracing for Ticket Monitoring Bot
+Lightweight per-phase spans written as one JSON file per monitoring cycle
+
+Developer: Prasob G Nath
+GitHub: github.com/Prasobgnath
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import config
+
+
+class NullSpan:
+    """Shared no-op span returned while tracing is disabled"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """One timed phase; nested spans on the same thread become its children"""
+    
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.id = None
+        self.parent = None
+        self.start = None
+    
+    def __enter__(self):
+        self.id, self.parent = self.tracer.push(self)
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.pop(self, duration)
+        return False
+    
+    def set(self, **attrs):
+        """Add attributes known only after the span started (e.g. row counts)"""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Collects the spans of the current cycle and writes them to the trace directory"""
+    
+    def __init__(self, settings=None):
+        """
+        Initialize Tracer
+        
+        Args:
+            settings: dict - tracing settings (default config.TRACING)
+        """
+        self.settings = settings or config.TRACING
+        self.enabled = self.settings["enabled"]
+        self.directory = self.settings["directory"]
+        self.ids = itertools.count(1)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.spans = []
+        self.cycle = None
+        self.cycle_span = None
+        self.origin = time.perf_counter()
+    
+    def span(self, name, **attrs):
+        """
+        Time a block as a span (no-op while tracing is disabled)
+        
+        Args:
+            name: str - phase name (e.g. "snow.page")
+            **attrs: values recorded with the span (queue, page number, ...)
+        
+        Returns:
+            Span - context manager
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+    
+    def push(self, span):
+        """Enter a span on the current thread; returns (span id, parent id)"""
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        parent = stack[-1].id if stack else None
+        # Spans of worker threads hang under the cycle span
+        if parent is None and self.cycle_span is not None and span is not self.cycle_span:
+            parent = self.cycle_span.id
+        stack.append(span)
+        return next(self.ids), parent
+    
+    def pop(self, span, duration):
+        """Leave a span on the current thread and record it"""
+        stack = self.local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        record = {
+            "id": span.id,
+            "parent": span.parent,
+            "name": span.name,
+            "start": round(span.start - self.origin, 6),
+            "duration": round(duration, 6),
+            "thread": threading.current_thread().name,
+        }
+        if span.attrs:
+            record["attrs"] = span.attrs
+        with self.lock:
+            self.spans.append(record)
+    
+    def start_cycle(self, number):
+        """
+        Start collecting the spans of a monitoring cycle
+        
+        Args:
+            number: int - cycle number
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.spans = []
+        self.cycle = number
+        self.origin = time.perf_counter()
+        self.cycle_span = Span(self, "cycle", {"cycle": number})
+        self.cycle_span.__enter__()
+    
+    def end_cycle(self):
+        """
+        Close the cycle span and write the cycle's spans as JSON
+        
+        Returns:
+            str - path of the trace file, or None if nothing was written
+        """
+        if not self.enabled or self.cycle_span is None:
+            return None
+        self.cycle_span.__exit__(None, None, None)
+        self.cycle_span = None
+        
+        with self.lock:
+            spans, self.spans = self.spans, []
+        
+        trace = {
+            "cycle": self.cycle,
+            "started": time.time() - (time.perf_counter() - self.origin),
+            "spans": sorted(spans, key=lambda s: s["start"]),
+        }
+        path = os.path.join(self.directory, f"cycle_{self.cycle:06d}.json")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+            self.prune()
+        except OSError as e:
+            print(f"Error writing trace file: {e}")
+            return None
+        return path
+    
+    def prune(self):
+        """Delete the oldest trace files beyond settings keep_cycles"""
+        keep = self.settings["keep_cycles"]
+        if not keep:
+            return
+        files = sorted(f for f in os.listdir(self.directory)
+                       if f.startswith("cycle_") and f.endswith(".json"))
+        for name in files[:-keep]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+# Shared tracer - modules open spans on it, main starts and ends the cycles
+tracer = Tracer()
+
+
+def traced(name):
+    """
+    Decorator that runs a function inside a span
+    
+    Args:
+        name: str - span name
+    
+    Returns:
+        function - decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -7,11 +7,17 @@ GitHub: github.com/Prasobgnath
 """
 
 import datetime
+import logging
+import os
+import threading
+import time
 import winsound
-import pandas as pd
-from openpyxl import load_workbook
-from fuzzywuzzy import process
+from collections import OrderedDict
 import config
+from queue_registry import get_registry
+from metrics import metrics
+from tracing import traced
+from event_log import log_event
 
 
 class LogManager:
@@ -19,16 +25,47 @@ class LogManager:
     
     def __init__(self, log_excel_path):
         self.log_excel_path = log_excel_path
-        
-    def get_unique_ids(self):
-        """Get list of unique IDs from log file"""
+        self.unique_ids = None
+        self.mtime = None
+        self.lock = threading.Lock()
+    
+    def get_mtime(self):
+        """Get the log file's modification time (None if it cannot be read)"""
         try:
-            log_file = pd.read_excel(self.log_excel_path, sheet_name="log")
-            return log_file['Unique ID'].values
-        except Exception as e:
-            print(f"Error reading log file: {e}")
-            return []
+            return os.path.getmtime(self.log_excel_path)
+        except OSError:
+            return None
+    
+    def warm_up(self):
+        """Read the logged ticket numbers once (can run in the background at startup)"""
+        with self.lock:
+            # pandas is only needed here - imported on first use to keep startup fast
+            import pandas as pd
+            mtime = self.get_mtime()
+            try:
+                log_file = pd.read_excel(self.log_excel_path, sheet_name="log")
+                self.unique_ids = set(log_file['Unique ID'].values)
+                self.mtime = mtime
+            except Exception as e:
+                log_event("error", f"Error reading log file: {e}", logging.WARNING, step="log_read")
+                self.unique_ids = set()
+                self.mtime = None
+    
+    def get_unique_ids(self):
+        """
+        Get the unique IDs already in the log file
+        
+        The file is read once and kept in memory; it is read again only if
+        it was changed outside the bot (e.g. edited by hand).
+        
+        Returns:
+            set - logged ticket numbers
+        """
+        if self.unique_ids is None or self.get_mtime() != self.mtime:
+            self.warm_up()
+        return self.unique_ids
     
+    @traced("log.write")
     def log_ticket(self, ticket_data, instance):
         """
         Log ticket data to Excel file
@@ -37,7 +74,10 @@ class LogManager:
             ticket_data: dict containing ticket information
             instance: str - SNOW Instance 1, SNOW Instance 2, or other
         """
+        from openpyxl import load_workbook
+        
         try:
+            started = time.time()
             wb = load_workbook(self.log_excel_path)
             log = wb.active
             
@@ -57,9 +97,15 @@ class LogManager:
             log.append(log_data)
             wb.save(self.log_excel_path)
             wb.close()
-            print(f"Logged ticket: {ticket_data['number']}")
+            with self.lock:
+                if self.unique_ids is not None:
+                    self.unique_ids.add(ticket_data['number'])
+                    self.mtime = self.get_mtime()
+            metrics.observe("bot_log_write_seconds", time.time() - started)
+            log_event("ticket.logged", f"Logged ticket: {ticket_data['number']}",
+                      number=ticket_data['number'], instance=instance)
         except Exception as e:
-            print(f"Error logging ticket: {e}")
+            log_event("error", f"Error logging ticket: {e}", logging.WARNING, step="log_write")
 
 
 class ScopeDetector:
@@ -77,7 +123,20 @@ class ScopeDetector:
         self.scope_data = scope_data_dict
         self.threshold = threshold
         self.scope_names = list(scope_data_dict.keys())
+        
+        # fuzzywuzzy is imported here rather than at module load (startup runs this in the background)
+        from fuzzywuzzy import process
+        self.extract_one = process.extractOne
+        
+        # The same tickets are seen every cycle - remember each description's scope,
+        # least recently used first (evicted when the cache is full)
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # The pipeline's scope stage runs on several threads
+        self.lock = threading.Lock()
     
+    @traced("scope.detect")
     def detect_scope(self, description):
         """
         Detect scope from Short Description field using fuzzy matching
@@ -88,6 +147,14 @@ class ScopeDetector:
         Returns:
             str - "<SCOPE_NAME> SCOPE" or "Unknown SCOPE"
         """
+        with self.lock:
+            cached = self.cache.get(description)
+            if cached is not None:
+                self.cache.move_to_end(description)
+        if cached is not None:
+            self.record_cache_result("hit")
+            return cached
+        
         best_match_score = 0
         best_scope = "Unknown SCOPE"
         
@@ -96,12 +163,30 @@ class ScopeDetector:
             if nodes.empty:
                 continue
                 
-            match = process.extractOne(description, nodes)
+            match = self.extract_one(description, nodes)
             if match and match[1] > best_match_score and match[1] >= self.threshold:
                 best_match_score = match[1]
                 best_scope = f"{scope_name} SCOPE"
         
+        # Matching runs outside the lock; a description matched on two threads at once is stored again
+        with self.lock:
+            self.cache[description] = best_scope
+            self.cache.move_to_end(description)
+            if len(self.cache) > config.SCOPE_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        self.record_cache_result("miss")
         return best_scope
+    
+    def record_cache_result(self, result):
+        """Count a scope cache lookup ("hit" or "miss") in the counters and the metrics"""
+        with self.lock:
+            if result == "hit":
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            ratio = round(self.cache_hits / (self.cache_hits + self.cache_misses), 4)
+        metrics.inc("bot_scope_cache_requests_total", result=result)
+        metrics.set("bot_scope_cache_hit_ratio", ratio)
 
 
 class SoundNotifier:
@@ -113,7 +198,8 @@ class SoundNotifier:
     def play(self):
         """Play notification sound"""
         try:
-            winsound.PlaySound(self.sound_file, 0)
+            # Asynchronous - returns immediately instead of blocking until the sound ends
+            winsound.PlaySound(self.sound_file, winsound.SND_FILENAME | winsound.SND_ASYNC)
         except Exception as e:
             print(f"Error playing sound: {e}")
 
@@ -128,12 +214,10 @@ def get_instance_name(url):
     Returns:
         str - Instance name (SNOW Instance 1, SNOW Instance 2, or other)
     """
-    if "instance1" in url.lower():
-        return "SNOW Instance 1"
-    elif "instance2" in url.lower():
-        return "SNOW Instance 2"
-    else:
-        return "Unknown"
+    instance_key = get_registry().get_instance_key(url)
+    if instance_key:
+        return config.SNOW_INSTANCES[instance_key]["name"]
+    return "Unknown"
 
 
 def get_ticket_type(url):
@@ -146,6 +230,10 @@ def get_ticket_type(url):
     Returns:
         str - Ticket type (incident, change_request, change_task)
     """
+    entry = get_registry().get(url)
+    if entry:
+        return entry.table
+    
     if "incident" in url.lower():
         return "incident"
     elif "change_request" in url.lower():
@@ -232,6 +320,8 @@ def load_inventory_data(inventory_excel_path, scope_columns=None):
         dict - Dictionary mapping scope names to pandas Series
                Example: {'DNS': pd.Series([...]), 'PROXY': pd.Series([...])}
     """
+    import pandas as pd
+    
     if scope_columns is None:
         scope_columns = config.SCOPE_COLUMNS
     
@@ -302,11 +392,19 @@ def get_greeting_message(url):
     Returns:
         str - appropriate greeting message
     """
-    instance = get_instance_name(url)
-    ticket_type = get_ticket_type(url)
+    entry = get_registry().get(url)
+    if entry:
+        return entry.greeting
     
-    key = f"{ticket_type}_{instance.lower()}"
-    return config.MESSAGE_TEMPLATES.get(key, f"Hi Team, We Have Unassigned Tickets in {instance} Queue")
+    # URL that is not a registered queue - route by host and table
+    instance = get_instance_name(url)
+    table_config = config.TICKET_TABLES.get(get_ticket_type(url))
+    instance_key = get_registry().get_instance_key(url)
+    if table_config and instance_key:
+        key = f"{table_config['template']}_{instance_key}"
+        if key in config.MESSAGE_TEMPLATES:
+            return config.MESSAGE_TEMPLATES[key]
+    return f"Hi Team, We Have Unassigned Tickets in {instance} Queue"
 
 
 def print_ticket_summary(total_count, captured_count, hold_count, assigned_count, not_assigned_count):